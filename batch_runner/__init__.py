@@ -0,0 +1,24 @@
+import importlib
+
+# Public names and the submodules defining them. They are imported on first access, so
+# importing the package does not pull in pandas or the database driver.
+_EXPORTS = {
+    "BatchTaskRunner": ".main",
+    "read_tasks": ".main",
+    "task_id": ".main",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
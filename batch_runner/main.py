@@ -0,0 +1,204 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from db_read_agent.result_cache import normalize_sql
+
+logger = logging.getLogger(__name__)
+
+
+def task_id(task):
+    """
+    Return a task's id: its "id" field, or a hash of its content so that the same task
+    gets the same id in every run.
+    """
+    if task.get("id") is not None:
+        return str(task["id"])
+    content = json.dumps(task, sort_keys=True, default=str)
+    return "task-" + hashlib.sha1(content.encode("utf-8")).hexdigest()[:16]
+
+
+def read_tasks(path):
+    """
+    Stream task specs from a JSONL file, one JSON object per line. Blank lines are skipped.
+
+    :return: Generator of (line_number, task dict or None, error message or None).
+    """
+    with open(path) as file:
+        for line_number, line in enumerate(file, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                task = json.loads(line)
+            except ValueError as e:
+                yield line_number, None, f"Invalid JSON: {e}"
+                continue
+            if not isinstance(task, dict):
+                yield line_number, None, "Task must be a JSON object"
+                continue
+            yield line_number, task, None
+
+
+def completed_task_ids(results_path):
+    """
+    Return the ids of tasks recorded as successful in a results file. A partly written
+    last line (e.g. after a crash) is ignored.
+    """
+    completed = set()
+    if not os.path.exists(results_path):
+        return completed
+    with open(results_path) as file:
+        for line in file:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get("status") == "success":
+                completed.add(record.get("id"))
+    return completed
+
+
+class BatchTaskRunner:
+    """
+    Run a JSONL file of SQLAgent tasks (as produced by ``generate_task``) concurrently.
+
+    Tasks are read as a stream and processed in windows of ``window`` tasks. Within a
+    window, the SQL of every task is generated with ``SQLAgent.generate_sql_query`` and
+    tasks producing the same (normalized) SQL are collapsed: the query runs once and its
+    result is fanned out to every task's export target. At most ``max_workers`` queries
+    run at the same time.
+
+    Every task gets one line in the results JSONL file, written as soon as it finishes.
+    Tasks whose id is already recorded as successful are skipped, so a crashed or
+    interrupted run can simply be started again. Tasks without an "id" field are
+    identified by a hash of their content.
+
+    Tasks with ``stream_export`` are run one by one through ``SQLAgent.execute_task``,
+    since their rows are never held in memory to be shared.
+
+    :param sql_agent: SQLAgent running the queries (a pooled agent lets queries run concurrently).
+    :param results_path: JSONL file the per-task status is appended to.
+    :param max_workers: Maximum number of queries running concurrently.
+    :param window: Number of tasks read, deduplicated and scheduled together.
+    """
+
+    def __init__(self, sql_agent, results_path, max_workers=4, window=1000):
+        self.sql_agent = sql_agent
+        self.results_path = results_path
+        self.max_workers = max_workers
+        self.window = window
+
+    def run(self, tasks_path):
+        """
+        Run every task of a JSONL file that has not completed successfully before.
+
+        :param tasks_path: Path of the task file.
+        :return: Summary dictionary (total, skipped, succeeded, failed, unique queries, seconds).
+        """
+        started = time.perf_counter()
+        completed = completed_task_ids(self.results_path)
+        summary = {"total": 0, "skipped": 0, "succeeded": 0, "failed": 0, "queries": 0}
+
+        directory = os.path.dirname(self.results_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.results_path, "a") as results, \
+                ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="batch-task") as executor:
+            batch = []
+            for line_number, task, error in read_tasks(tasks_path):
+                summary["total"] += 1
+                if error is not None:
+                    self._write(results, summary, {"id": f"line-{line_number}", "status": "error", "message": error})
+                    continue
+                identifier = task_id(task)
+                if identifier in completed:
+                    summary["skipped"] += 1
+                    continue
+                # Later copies of the same id in this file are skipped too.
+                completed.add(identifier)
+                batch.append((identifier, task))
+                if len(batch) >= self.window:
+                    self._run_window(batch, executor, results, summary)
+                    batch = []
+            if batch:
+                self._run_window(batch, executor, results, summary)
+
+        summary["seconds"] = time.perf_counter() - started
+        logger.info("Batch finished: %d succeeded, %d failed, %d skipped, %d queries for %d tasks in %.2fs",
+                    summary["succeeded"], summary["failed"], summary["skipped"], summary["queries"], summary["total"],
+                    summary["seconds"])
+        return summary
+
+    def _run_window(self, batch, executor, results, summary):
+        """Deduplicate one window of tasks and run its queries, writing results as they finish."""
+        groups = {}
+        separate = []
+        for identifier, task in batch:
+            if task.get("args", {}).get("stream_export"):
+                separate.append((identifier, task))
+                continue
+            try:
+                query = self.sql_agent.generate_sql_query(task)
+            except Exception as e:
+                self._write(results, summary, {"id": identifier, "status": "error", "message": str(e)})
+                continue
+            groups.setdefault(normalize_sql(query), (query, []))[1].append((identifier, task))
+
+        futures = [executor.submit(self._run_group, query, members) for query, members in groups.values()]
+        futures += [executor.submit(self._run_single, identifier, task) for identifier, task in separate]
+        summary["queries"] += len(futures)
+
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                for record in future.result():
+                    self._write(results, summary, record)
+
+    def _run_group(self, query, members):
+        """Run one query and export its result for every task that asked for it."""
+        started = time.perf_counter()
+        try:
+            df = self.sql_agent.execute_sql(query)
+        except Exception as e:
+            return [{"id": identifier, "status": "error", "query": query, "message": str(e),
+                     "seconds": time.perf_counter() - started} for identifier, _ in members]
+
+        records = []
+        for identifier, task in members:
+            args = task.get("args", {})
+            record = {"id": identifier, "status": "success", "query": query, "rows": len(df),
+                      "shared_with": len(members) - 1}
+            try:
+                if args.get("export_data"):
+                    if not self.sql_agent.export_dataframe(df, args):
+                        raise ValueError(f"Unsupported export format '{args.get('export_format', 'csv')}'")
+                    record["message"] = f"Data exported to {args.get('export_path')}"
+                else:
+                    record["message"] = "Query executed successfully"
+            except Exception as e:
+                record.update(status="error", message=str(e))
+            record["seconds"] = time.perf_counter() - started
+            records.append(record)
+        return records
+
+    def _run_single(self, identifier, task):
+        started = time.perf_counter()
+        response = self.sql_agent.execute_task(task)
+        record = {"id": identifier, "status": response["status"], "query": response.get("query"),
+                  "message": response.get("message"), "seconds": time.perf_counter() - started}
+        if "export_stats" in response:
+            record["rows"] = response["export_stats"]["rows"]
+        return [record]
+
+    @staticmethod
+    def _write(results, summary, record):
+        """Append a task record and flush it, so finished tasks survive a crash."""
+        record["finished_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+        results.write(json.dumps(record, default=str) + "\n")
+        results.flush()
+        summary["succeeded" if record["status"] == "success" else "failed"] += 1
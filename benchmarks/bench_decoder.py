@@ -0,0 +1,117 @@
+"""
+Compare building result DataFrames from row tuples (``pd.DataFrame(rows, columns=...)``)
+with the column-wise, typed ``ResultDecoder``.
+
+Usage: python -m benchmarks.bench_decoder [--rows 200000] [--repeat 3]
+"""
+import argparse
+import datetime
+import random
+import time
+
+import pandas as pd
+from mysql.connector import FieldType
+
+from db_read_agent.decoder import ResultDecoder
+
+
+def make_numeric_result(rows, width=40):
+    """Synthetic wide numeric result set: alternating BIGINT and DOUBLE columns with some NULLs."""
+    random.seed(0)
+    description = []
+    for i in range(width):
+        type_code = FieldType.LONGLONG if i % 2 == 0 else FieldType.DOUBLE
+        description.append((f"c{i}", type_code, None, None, None, None, 1, 0))
+    data = [
+        tuple(
+            None if (r + c) % 13 == 0 else (r * c if c % 2 == 0 else r / (c + 1))
+            for c in range(width)
+        )
+        for r in range(rows)
+    ]
+    return data, description
+
+
+def make_result(rows):
+    """Synthetic result set shaped like a wide-ish booking table."""
+    random.seed(0)
+    codes = ["web", "app", "agent", "partner", "kiosk"]
+    start = datetime.datetime(2024, 1, 1)
+    description = [
+        ("id", FieldType.LONGLONG, None, None, None, None, 0, 0),
+        ("customer_id", FieldType.LONG, None, None, None, None, 1, 0),
+        ("amount", FieldType.DOUBLE, None, None, None, None, 1, 0),
+        ("fee", FieldType.DOUBLE, None, None, None, None, 1, 0),
+        ("code", FieldType.VAR_STRING, None, None, None, None, 1, 0),
+        ("status", FieldType.VAR_STRING, None, None, None, None, 1, 0),
+        ("created_at", FieldType.DATETIME, None, None, None, None, 1, 0),
+        ("note", FieldType.VAR_STRING, None, None, None, None, 1, 0),
+    ]
+    data = [
+        (
+            i,
+            None if i % 10 == 0 else random.randint(1, 50000),
+            random.random() * 500,
+            None if i % 7 == 0 else random.random() * 10,
+            random.choice(codes),
+            random.choice(("new", "paid", "cancelled")),
+            start + datetime.timedelta(seconds=i),
+            f"note {i}",
+        )
+        for i in range(rows)
+    ]
+    return data, description
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def run(rows=200000, repeat=3, kind="mixed"):
+    data, description = make_result(rows) if kind == "mixed" else make_numeric_result(rows)
+    columns = [desc[0] for desc in description]
+    decoder = ResultDecoder()
+
+    tuple_time, tuple_df = best_of(repeat, lambda: pd.DataFrame(data, columns=columns))
+    typed_time, typed_df = best_of(repeat, lambda: decoder.decode(data, description))
+    tuple_bytes = int(tuple_df.memory_usage(index=True, deep=True).sum())
+    typed_bytes = int(typed_df.memory_usage(index=True, deep=True).sum())
+
+    return {
+        "kind": kind,
+        "rows": rows,
+        "tuple_seconds": tuple_time,
+        "typed_seconds": typed_time,
+        "speedup": tuple_time / typed_time if typed_time else None,
+        "tuple_bytes": tuple_bytes,
+        "typed_bytes": typed_bytes,
+        "memory_ratio": tuple_bytes / typed_bytes if typed_bytes else None,
+        "tuple_dtypes": {col: str(dtype) for col, dtype in tuple_df.dtypes.items()},
+        "typed_dtypes": {col: str(dtype) for col, dtype in typed_df.dtypes.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--kind", choices=["mixed", "numeric"], default="mixed")
+    options = parser.parse_args()
+
+    result = run(options.rows, options.repeat, options.kind)
+    print(f"{result['kind']} result, {result['rows']} rows")
+    print(f"row tuples : {result['tuple_seconds']:.3f}s  {result['tuple_bytes'] / 1e6:.1f} MB")
+    print(f"typed      : {result['typed_seconds']:.3f}s  {result['typed_bytes'] / 1e6:.1f} MB")
+    print(f"speedup {result['speedup']:.2f}x, memory {result['memory_ratio']:.2f}x smaller")
+    changed = [col for col in result["typed_dtypes"] if result["typed_dtypes"][col] != result["tuple_dtypes"][col]]
+    for col in changed[:20]:
+        print(f"  {col:<12} {result['tuple_dtypes'][col]:<16} -> {result['typed_dtypes'][col]}")
+
+
+if __name__ == "__main__":
+    main()
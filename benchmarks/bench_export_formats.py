@@ -0,0 +1,102 @@
+"""
+Compare file size and write/read throughput of the ExporterAgent formats:
+the text writers (CSV, JSON lines) against Parquet, Feather and Arrow IPC with
+each supported compression codec.
+
+Usage: python -m benchmarks.bench_export_formats [--rows 500000] [--output-dir /tmp/export_bench]
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from exporter_agent import ExporterAgent
+from exporter_agent.columnar import read_columnar
+
+CASES = [
+    ("csv", None),
+    ("json", None),
+    ("parquet", None),
+    ("parquet", "snappy"),
+    ("parquet", "zstd"),
+    ("parquet", "lz4"),
+    ("feather", None),
+    ("feather", "zstd"),
+    ("feather", "lz4"),
+    ("arrow", None),
+    ("arrow", "zstd"),
+]
+
+
+def make_frame(rows):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "id": np.arange(rows, dtype=np.int64),
+        "customer_id": rng.integers(1, 50000, rows),
+        "amount": rng.random(rows) * 500,
+        "fee": np.where(rng.random(rows) < 0.1, np.nan, rng.random(rows) * 10),
+        "code": rng.choice(["web", "app", "agent", "partner", "kiosk"], rows),
+        "created_at": pd.Timestamp("2024-01-01") + pd.to_timedelta(np.arange(rows), unit="s"),
+    })
+
+
+def read_back(path, export_format):
+    if export_format == "csv":
+        return pd.read_csv(path)
+    if export_format == "json":
+        return pd.read_json(path, lines=True)
+    return read_columnar(path, export_format)
+
+
+def run(rows=500000, output_dir="/tmp/export_bench"):
+    os.makedirs(output_dir, exist_ok=True)
+    df = make_frame(rows)
+    results = []
+    for export_format, compression in CASES:
+        path = os.path.join(output_dir, f"bench_{compression or 'plain'}.{export_format}")
+        agent = ExporterAgent("Benchmark", export_path=path, export_format=export_format, compression=compression)
+
+        started = time.perf_counter()
+        response = agent.export_data(df)
+        write_seconds = time.perf_counter() - started
+        if response["status"] != "success":
+            results.append({"format": export_format, "compression": compression, "error": response["message"]})
+            continue
+
+        started = time.perf_counter()
+        read_back(path, export_format)
+        read_seconds = time.perf_counter() - started
+
+        results.append({
+            "format": export_format,
+            "compression": compression,
+            "bytes": os.path.getsize(path),
+            "write_seconds": write_seconds,
+            "read_seconds": read_seconds,
+            "write_rows_per_sec": rows / write_seconds,
+            "read_rows_per_sec": rows / read_seconds,
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500000)
+    parser.add_argument("--output-dir", default="/tmp/export_bench")
+    options = parser.parse_args()
+
+    results = run(options.rows, options.output_dir)
+    print(f"{'format':<9}{'codec':<8}{'size MB':>9}{'write s':>9}{'read s':>9}")
+    for result in results:
+        codec = result["compression"] or "-"
+        if "error" in result:
+            print(f"{result['format']:<9}{codec:<8} error: {result['error']}")
+            continue
+        print(f"{result['format']:<9}{codec:<8}{result['bytes'] / 1e6:>9.1f}"
+              f"{result['write_seconds']:>9.3f}{result['read_seconds']:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Load test for the resident agent server: many client threads send a mix of tasks over HTTP
+and the throughput and latency percentiles are reported. As a baseline, some of the same
+tasks are run the way the project used to run them: one fresh ``python driver.py query``
+process per task, which imports the agents and connects from scratch every time.
+
+Runs against the SQLite stand-in by default; pass --mysql to use the DB_* environment
+variables and a real server instead.
+
+Usage: python -m benchmarks.bench_server [--clients 16] [--requests 50] [--cold 10] [--rows 100000] [--mysql]
+"""
+import argparse
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+
+from benchmarks import sqlite_standin
+
+TASKS = [
+    {"operation": "count_records", "args": {"table_name": "booking_origins", "group_column": "id"}},
+    {"operation": "group_by_count", "args": {"table_name": "booking_origins", "group_column": "code",
+                                             "sort_column": "count", "sort_order": "DESC", "limit": 10}},
+    {"operation": "select_all", "args": {"table_name": "booking_origins", "group_column": "id"}},
+    {"operation": "select_with_condition", "args": {"table_name": "channels", "group_column": "id"}},
+]
+
+
+def make_tasks(count, seed=0):
+    """A reproducible mix of the TASKS, plus point lookups that are all different (cache misses)."""
+    rng = random.Random(seed)
+    tasks = []
+    for _ in range(count):
+        if rng.random() < 0.25:
+            tasks.append({"operation": "select_with_condition",
+                          "args": {"table_name": "booking_origins", "group_column": "id",
+                                   "condition": f"customer_id = {rng.randint(1, 5000)}"}})
+        else:
+            tasks.append(rng.choice(TASKS))
+    return tasks
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))] if values else 0.0
+
+
+def drive(clients, requests, handle):
+    """
+    Run ``requests`` tasks on each of ``clients`` threads with ``handle(task)``.
+
+    :return: Dictionary with throughput, latency percentiles and the error count.
+    """
+    latencies, errors = [], []
+    lock = threading.Lock()
+
+    def client(index):
+        local_latencies, local_errors = [], 0
+        for task in make_tasks(requests, seed=index):
+            started = time.perf_counter()
+            if handle(task)["status"] != "success":
+                local_errors += 1
+            local_latencies.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(local_latencies)
+            errors.append(local_errors)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - started
+    return {
+        "requests": len(latencies),
+        "seconds": seconds,
+        "per_sec": len(latencies) / seconds,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "errors": sum(errors),
+    }
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Runs driver.py in a fresh interpreter, against the stand-in unless the first argument is empty.
+COLD_SCRIPT = (
+    "import sys\n"
+    "if sys.argv[1]:\n"
+    "    from benchmarks import sqlite_standin\n"
+    "    sqlite_standin.install(sys.argv[1])\n"
+    "import driver\n"
+    "sys.exit(driver.main(sys.argv[2:]))\n"
+)
+
+
+def run_cold(count, standin_path):
+    """Run ``count`` tasks of the mix, each in its own ``driver.py query`` process, one after the other."""
+    from db_read_agent.executor_agent import SQLAgent
+
+    def handle(task):
+        query = SQLAgent({}).generate_sql_query(task)
+        completed = subprocess.run([sys.executable, "-c", COLD_SCRIPT, standin_path or "", "query", query],
+                                   cwd=ROOT, capture_output=True)
+        return {"status": "success" if completed.returncode == 0 else "error"}
+
+    return drive(1, count, handle)
+
+
+def run(clients=16, requests=50, cold=10, rows=100000, mysql=False):
+    from server_agent import AgentClient, AgentServer
+
+    if mysql:
+        from driver import load_config
+        config, standin_path = load_config(), None
+    else:
+        sqlite_standin.populate(rows)
+        config, standin_path = {}, sqlite_standin.DEFAULT_PATH
+
+    baseline = run_cold(cold, standin_path) if cold else None
+
+    server = AgentServer(config, port=0, pool_size=8).start()
+    try:
+        client = AgentClient(server.url)
+        client.inspect()
+        warm = drive(clients, requests, lambda task: client.execute_task(task, max_rows=1000))
+        stats = client.stats()
+    finally:
+        server.shutdown()
+    return baseline, warm, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=50, help="Requests per client.")
+    parser.add_argument("--cold", type=int, default=10, help="Tasks run as one driver.py process each (0 to skip).")
+    parser.add_argument("--rows", type=int, default=100000, help="Rows in the stand-in table.")
+    parser.add_argument("--mysql", action="store_true", help="Use the MySQL server from the DB_* variables.")
+    options = parser.parse_args()
+
+    baseline, warm, stats = run(options.clients, options.requests, options.cold, options.rows, options.mysql)
+    for name, result in (("process per task", baseline), ("agent server", warm)):
+        if result is None:
+            continue
+        print(f"{name:<17} {result['requests']:6d} requests in {result['seconds']:6.2f}s  "
+              f"{result['per_sec']:8.1f} req/s  p50 {result['p50_ms']:7.1f} ms  p95 {result['p95_ms']:7.1f} ms  "
+              f"p99 {result['p99_ms']:7.1f} ms  errors {result['errors']}")
+    if baseline is not None:
+        print(f"median latency: {baseline['p50_ms'] / warm['p50_ms']:.0f}x lower on the server")
+    cache, pool = stats["cache"] or {}, stats["pool"] or {}
+    print(f"server: max in flight {stats['max_in_flight']}, cache hits {cache.get('hits', 0)} / "
+          f"misses {cache.get('misses', 0)}, connections created {pool.get('created', 0)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Measure the start-up cost of the driver CLI: wall time of each subcommand's --help
+in a fresh interpreter, plus the import-time breakdown reported by ``python -X importtime``,
+and the time each subcommand then spends importing the agents it runs.
+
+Usage: python -m benchmarks.bench_startup [--repeat 5] [--top 5]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+DRIVER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "driver.py")
+COMMANDS = [
+    ["--help"],
+    ["inspect", "--help"],
+    ["query", "--help"],
+    ["export", "--help"],
+    ["visualize", "--help"],
+    ["batch", "--help"],
+    ["serve", "--help"],
+]
+# Modules each subcommand imports lazily before it starts working.
+COMMAND_MODULES = {
+    "inspect": ["db_inspector.main", "exporter_agent.main"],
+    "query": ["db_read_agent.executor_agent"],
+    "export": ["db_read_agent.executor_agent"],
+    "visualize": ["db_read_agent.executor_agent", "visualizer_agent.main"],
+    "batch": ["db_read_agent.executor_agent", "batch_runner.main"],
+    "serve": ["server_agent.main"],
+}
+
+
+def parse_importtime(stderr):
+    """
+    Parse ``-X importtime`` output.
+
+    :return: List of (module, self_us, cumulative_us) tuples.
+    """
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append((name.strip(), int(self_us), int(cumulative_us)))
+    return modules
+
+
+def measure(args, repeat):
+    """
+    Run ``python driver.py <args>`` ``repeat`` times.
+
+    :return: Dictionary with the best wall time, the number of imported modules, the summed
+             import time and the top-level imports by cumulative time.
+    """
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, DRIVER] + args, check=True, capture_output=True)
+        timings.append(time.perf_counter() - started)
+
+    completed = subprocess.run([sys.executable, "-X", "importtime", DRIVER] + args, check=True,
+                               capture_output=True, text=True)
+    modules = parse_importtime(completed.stderr)
+    # Top-level entries are the ones without indentation in the module column.
+    top_level = [(name, cumulative) for name, _, cumulative in modules if not name.startswith(" ")]
+    return {
+        "command": " ".join(args),
+        "seconds": min(timings),
+        "modules": len(modules),
+        "import_seconds": sum(self_us for _, self_us, _ in modules) / 1e6,
+        "heaviest": sorted(top_level, key=lambda item: item[1], reverse=True),
+    }
+
+
+def measure_agent_imports(command, repeat):
+    """Best wall time of a fresh interpreter importing the modules a subcommand needs."""
+    statement = "; ".join(f"import {module}" for module in COMMAND_MODULES[command])
+    root = os.path.dirname(DRIVER)
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], check=True, capture_output=True, cwd=root)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def run(repeat=5):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+    interpreter = (time.perf_counter() - started) / repeat
+    agents = {command: measure_agent_imports(command, repeat) for command in COMMAND_MODULES}
+    return interpreter, [measure(args, repeat) for args in COMMANDS], agents
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=5, help="Heaviest top-level imports to list per command.")
+    options = parser.parse_args()
+
+    interpreter, results, agents = run(options.repeat)
+    print(f"bare interpreter: {interpreter * 1000:.0f} ms")
+    for result in results:
+        print(f"driver.py {result['command']:<16} {result['seconds'] * 1000:6.0f} ms  "
+              f"{result['modules']:4d} modules  {result['import_seconds'] * 1000:6.0f} ms importing")
+        for name, cumulative in result["heaviest"][:options.top]:
+            print(f"    {name:<32} {cumulative / 1000:8.1f} ms")
+    print("agent imports per subcommand (paid only when the command runs):")
+    for command, seconds in agents.items():
+        print(f"    {command:<16} {seconds * 1000:6.0f} ms  ({', '.join(COMMAND_MODULES[command])})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""
+A SQLite stand-in for the MySQL server, for benchmarks that exercise the agents end to end
+without a database server.
+
+``install()`` replaces ``mysql.connector.connect`` with a factory returning connections to
+one SQLite database file, and ``populate()`` fills it with synthetic tables. Because the data
+lives in a file, other processes that call ``install()`` with the same path see it too. The
+stand-in understands what the agents send besides plain SELECTs: ``SHOW TABLES``,
+``DESCRIBE``, the ``information_schema.TABLES`` fingerprint query, optimizer hints, ``%s``
+placeholders, ``KILL QUERY`` and ``SET SESSION`` (recorded in the connection's
+``session_variables``, otherwise ignored; variables listed in ``UNKNOWN_VARIABLES`` are
+rejected like an older server would). Like mysql.connector, connections start with autocommit off
+and then read inside one snapshot (a SQLite read transaction on the WAL file) until
+``commit()`` or ``rollback()``, as InnoDB's REPEATABLE READ does. Timings are SQLite's, so
+compare runs against each other, not against a MySQL server.
+
+Usage:
+    from benchmarks import sqlite_standin
+    sqlite_standin.populate(rows=100000)  # also installs the stand-in
+    sqlite_standin.create_table("wide", rows=10000, width=50, null_density=0.3)
+"""
+import itertools
+import os
+import random
+import re
+import sqlite3
+import tempfile
+import threading
+
+import mysql.connector
+from mysql.connector import FieldType
+
+DEFAULT_PATH = os.path.join(tempfile.gettempdir(), "agent_standin.sqlite")
+# Column kinds cycled through by create_table, after the integer primary key.
+COLUMN_KINDS = ("int", "float", "category", "text", "timestamp")
+CATEGORIES = ["web", "app", "agent", "partner", "kiosk", "phone", "mail", "other"]
+# Distinct values of "text" columns; high enough that they are not treated as categorical.
+TEXT_CARDINALITY = 50000
+# Session variables SET SESSION rejects with "Unknown system variable", e.g. to mimic MySQL 5.7.
+UNKNOWN_VARIABLES = set()
+
+_connection_ids = itertools.count(1)
+_open_connections = {}
+_lock = threading.Lock()
+_path = DEFAULT_PATH
+
+
+def _sqlite_connection(isolation_level=""):
+    return sqlite3.connect(_path, check_same_thread=False, isolation_level=isolation_level)
+
+
+class StandInCursor:
+    """Cursor with the subset of the mysql.connector cursor API the agents use."""
+
+    def __init__(self, connection):
+        self._connection = connection
+        self._cursor = connection.sqlite.cursor()
+        self._rows = None
+        self.description = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def execute(self, query, params=None):
+        query = re.sub(r"/\*\+.*?\*/", "", query).strip().rstrip(";")
+        self._rows = None
+        kill = re.match(r"(?i)KILL\s+QUERY\s+(\d+)", query)
+        if kill:
+            with _lock:
+                target = _open_connections.get(int(kill.group(1)))
+            if target is not None:
+                target.sqlite.interrupt()
+            self.description = None
+            return
+        assignment = re.match(r"(?i)SET\s+(?:SESSION\s+)?(\w+)\s*=\s*(.+)", query)
+        if assignment:
+            name = assignment.group(1).lower()
+            if name in UNKNOWN_VARIABLES:
+                raise mysql.connector.Error(f"Unknown system variable '{name}'", errno=1193)
+            value = params[0] if params else assignment.group(2).strip()
+            if isinstance(value, str) and value.upper() == "DEFAULT":
+                self._connection.session_variables.pop(name, None)
+            else:
+                self._connection.session_variables[name] = value
+                self._connection.session_history.append((name, value))
+            self.description = None
+            return
+        if re.match(r"(?i)SHOW\s+TABLES", query):
+            query = "SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY name"
+        describe = re.match(r"(?i)DESCRIBE\s+`?(\w+)`?", query)
+        if describe:
+            query = f"SELECT name AS Field, type AS Type FROM pragma_table_info('{describe.group(1)}')"
+        if "information_schema.TABLES" in query:
+            names = [row[0] for row in self._connection.sqlite.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY name")]
+            self._rows = [(name, "2024-01-01 00:00:00", None, "2024-01-01 00:00:00") for name in names]
+            self.description = [(name, FieldType.VAR_STRING, None, None, None, None, 1, 0)
+                                for name in ("TABLE_NAME", "UPDATE_TIME", "TABLE_ROWS", "CREATE_TIME")]
+            return
+        self._connection._begin()
+        try:
+            self._cursor.execute(query.replace("%s", "?"), params or ())
+        except sqlite3.Error as e:
+            raise mysql.connector.Error(str(e))
+        self.description = ([(column[0], FieldType.VAR_STRING, None, None, None, None, 1, 0)
+                             for column in self._cursor.description] if self._cursor.description else None)
+
+    def fetchall(self):
+        if self._rows is not None:
+            rows, self._rows = self._rows, []
+            return rows
+        return self._cursor.fetchall()
+
+    def fetchmany(self, size):
+        if self._rows is not None:
+            rows, self._rows = self._rows[:size], self._rows[size:]
+            return rows
+        return self._cursor.fetchmany(size)
+
+    def fetchone(self):
+        rows = self.fetchmany(1)
+        return rows[0] if rows else None
+
+    def close(self):
+        self._cursor.close()
+
+
+class StandInConnection:
+    """Connection with the subset of the mysql.connector connection API the agents use."""
+
+    def __init__(self, autocommit=False, **config):
+        self.sqlite = _sqlite_connection(isolation_level=None)
+        self.autocommit = autocommit
+        self.connection_id = next(_connection_ids)
+        self.session_variables = {}
+        self.session_history = []
+        self._open = True
+        with _lock:
+            _open_connections[self.connection_id] = self
+
+    def cursor(self, **options):
+        return StandInCursor(self)
+
+    def is_connected(self):
+        return self._open
+
+    def ping(self, reconnect=False):
+        if not self._open:
+            raise mysql.connector.Error("Connection is closed.")
+
+    def _begin(self):
+        """Start the implicit transaction (and with it the read snapshot) of a non-autocommit connection."""
+        if not self.autocommit and not self.sqlite.in_transaction:
+            self.sqlite.execute("BEGIN")
+
+    def commit(self):
+        if self.sqlite.in_transaction:
+            self.sqlite.execute("COMMIT")
+
+    def rollback(self):
+        if self.sqlite.in_transaction:
+            self.sqlite.execute("ROLLBACK")
+
+    def close(self):
+        if self._open:
+            self._open = False
+            self.sqlite.close()
+            with _lock:
+                _open_connections.pop(self.connection_id, None)
+
+
+def install(path=DEFAULT_PATH):
+    """Route ``mysql.connector.connect`` to the SQLite database file at ``path``."""
+    global _path
+    _path = path
+    mysql.connector.connect = StandInConnection
+
+
+def populate(rows=100000, seed=0, path=DEFAULT_PATH):
+    """
+    Install the stand-in and create its synthetic tables: ``booking_origins`` with ``rows`` rows
+    (integer primary key, low-cardinality strings, floats, a mostly NULL column, timestamps) and
+    a small ``channels`` table.
+    """
+    install(path)
+    random.seed(seed)
+    codes = ["web", "app", "agent", "partner", "kiosk"]
+    connection = _sqlite_connection()
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.executescript("""
+        DROP TABLE IF EXISTS booking_origins;
+        CREATE TABLE booking_origins (id INTEGER PRIMARY KEY, customer_id INTEGER, code TEXT, amount REAL,
+                                      note TEXT, created_at TEXT);
+        DROP TABLE IF EXISTS channels;
+        CREATE TABLE channels (id INTEGER PRIMARY KEY, name TEXT);
+    """)
+    connection.executemany(
+        "INSERT INTO booking_origins VALUES (?, ?, ?, ?, ?, ?)",
+        ((i, random.randint(1, 5000), random.choice(codes), random.random() * 500, None if i % 4 else f"note {i}",
+          f"2024-01-{1 + i % 28:02d} 12:00:00") for i in range(1, rows + 1)),
+    )
+    connection.executemany("INSERT INTO channels VALUES (?, ?)", enumerate(codes, 1))
+    connection.commit()
+    connection.close()
+
+
+def _synthetic_value(kind, row, rng):
+    if kind == "int":
+        return rng.randint(0, 100000)
+    if kind == "float":
+        return rng.gauss(100, 25)
+    if kind == "category":
+        return rng.choice(CATEGORIES)
+    if kind == "text":
+        return f"value {rng.randint(0, TEXT_CARDINALITY)}"
+    return f"2024-{1 + row % 12:02d}-{1 + row % 28:02d} {row % 24:02d}:00:00"
+
+
+def create_table(name, rows=10000, width=10, null_density=0.1, seed=0, path=None):
+    """
+    Create (or replace) a synthetic table: an ``id`` primary key followed by ``width`` columns
+    cycling through integer, float, low-cardinality string, high-cardinality string and
+    timestamp columns. Each value is NULL with probability ``null_density``.
+
+    :return: List of the column kinds, in column order (without ``id``).
+    """
+    install(path or _path)
+    rng = random.Random(seed)
+    kinds = [COLUMN_KINDS[i % len(COLUMN_KINDS)] for i in range(width)]
+    types = {"int": "INTEGER", "float": "REAL", "category": "TEXT", "text": "TEXT", "timestamp": "TEXT"}
+    columns = ", ".join(f"c{i}_{kind} {types[kind]}" for i, kind in enumerate(kinds))
+    connection = _sqlite_connection()
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.executescript(f"DROP TABLE IF EXISTS {name}; CREATE TABLE {name} (id INTEGER PRIMARY KEY, {columns});")
+    placeholders = ", ".join("?" * (width + 1))
+    connection.executemany(
+        f"INSERT INTO {name} VALUES ({placeholders})",
+        ((row,) + tuple(None if rng.random() < null_density else _synthetic_value(kind, row, rng) for kind in kinds)
+         for row in range(1, rows + 1)),
+    )
+    connection.commit()
+    connection.close()
+    return kinds
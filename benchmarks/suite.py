@@ -0,0 +1,280 @@
+"""
+Reproducible benchmark suite for the agents, run against the SQLite stand-in (see
+``benchmarks.sqlite_standin``) on a synthetic table of configurable size, width and null density.
+
+Measured cases, each named "<group>.<name>":
+
+- ``sql.<operation>``: ``SQLAgent.execute_task`` for every operation in ``read_queries.sql_queries``
+- ``inspect.<mode>``: ``DatabaseInspector.inspect_database`` in "sample" and "pushdown" mode
+- ``transform.<step>``: every ``DataFrameAgent`` transform on the fetched table
+- ``export.<format>``: ``ExporterAgent.export_data`` for every supported format
+- ``visualize.plot_table`` / ``visualize.render_batch``: the visualizers, headless
+
+Every case runs ``--repeat`` times and its timings are written to a JSON file. With --baseline,
+the results are compared with a saved run and the exit code is 1 when a case got slower by more
+than --threshold (and by more than --min-seconds). Compare runs made on the same machine with
+the same table settings; a baseline with other settings is reported, not rejected.
+
+Usage: python -m benchmarks.suite [--rows 10000] [--width 10] [--null-density 0.1] [--repeat 5]
+                                  [--only transform.] [--output benchmark_results.json]
+                                  [--baseline FILE] [--save-baseline FILE] [--threshold 0.2]
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks import sqlite_standin
+
+TABLE = "bench_table"
+STANDIN_PATH = os.path.join(tempfile.gettempdir(), "agent_benchmark_suite.sqlite")
+
+# Arguments per operation of read_queries.sql_queries; every operation also gets table_name and group_column.
+OPERATION_ARGS = {
+    "select_with_condition": {"condition": "id % 2 = 0"},
+    "group_by_count": {"sort_column": "count", "sort_order": "DESC", "limit": 10},
+}
+
+
+def time_runs(repeat, func, setup=None):
+    """
+    Time ``repeat`` calls of ``func``; ``setup`` (untimed) produces its argument for every call.
+
+    :return: List of durations in seconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        argument = setup() if setup is not None else None
+        started = time.perf_counter()
+        func(argument) if setup is not None else func()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def _check(result):
+    """Fail the case instead of timing an error result."""
+    if isinstance(result, dict) and result.get("status") not in (None, "success"):
+        raise RuntimeError(result.get("message"))
+    if isinstance(result, list):
+        for item in result:
+            _check(item)
+    return result
+
+
+def sql_cases(agent):
+    from db_read_agent.read_queries import sql_queries
+
+    for operation in sql_queries:
+        task = {"operation": operation,
+                "args": dict(OPERATION_ARGS.get(operation, {}), table_name=TABLE, group_column="c2_category")}
+        yield f"sql.{operation}", None, lambda task=task: _check(agent.execute_task(task))
+
+
+def inspect_cases(agent):
+    from db_inspector.main import DatabaseInspector
+
+    for mode in ("sample", "pushdown"):
+        inspector = DatabaseInspector({}, agent=agent, validity_mode=mode)
+        yield f"inspect.{mode}", None, inspector.inspect_database
+
+
+def transform_cases(df):
+    from standardize_agent.main import DataFrameAgent
+
+    numerical = list(df.select_dtypes("number").columns.drop("id", errors="ignore"))
+    steps = [
+        ("handle_missing_data", {}),
+        ("remove_duplicates", {}),
+        ("remove_outliers", {}),
+        ("encode_categorical", {}),
+        ("normalize_numerical_columns", {}),
+        ("standardize_numerical_columns", {}),
+        ("filter_columns_by_valid_data", {}),
+        ("generate_feature_interaction", {"col1": numerical[0], "col2": numerical[-1], "new_col_name": "interaction"}),
+        ("compact", {}),
+    ]
+    for step, kwargs in steps:
+        yield (f"transform.{step}", lambda: DataFrameAgent(df.copy()),
+               lambda agent, step=step, kwargs=kwargs: getattr(agent, step)(**kwargs))
+
+    # handle_imbalance resamples on a "target" column and needs imbalanced-learn.
+    try:
+        import imblearn  # noqa: F401
+    except ImportError:
+        yield "transform.handle_imbalance", "imbalanced-learn is not installed", None
+        return
+    labelled = df[numerical].fillna(0).assign(target=(df["id"] % 10 == 0).astype(int))
+    yield ("transform.handle_imbalance", lambda: DataFrameAgent(labelled.copy()),
+           lambda agent: agent.handle_imbalance(method="undersample"))
+
+
+def export_cases(df, directory):
+    from exporter_agent.main import ExporterAgent, SUPPORTED_FORMATS
+
+    for export_format in SUPPORTED_FORMATS:
+        exporter = ExporterAgent("Benchmark", export_path=os.path.join(directory, f"bench.{export_format}"),
+                                 export_format=export_format)
+        yield f"export.{export_format}", None, lambda exporter=exporter: _check(exporter.export_data(df))
+
+
+def visualize_cases(agent, df, directory):
+    from visualizer_agent.batch import use_headless_backend
+    from visualizer_agent.main import SQLVisualizerAgent
+
+    use_headless_backend()
+    visualizer = SQLVisualizerAgent(agent)
+    path = os.path.join(directory, "table.png")
+    yield "visualize.plot_table", None, lambda: visualizer.plot_table(df, title="Benchmark", path=path, show=False)
+    items = [(f"chart_{i}", df) for i in range(4)]
+    yield ("visualize.render_batch", None,
+           lambda: _check(visualizer.render_batch(items, output_dir=os.path.join(directory, "charts"), workers=2)))
+
+
+def run(rows=10000, width=10, null_density=0.1, repeat=5, only=None, seed=0):
+    """
+    Create the synthetic table and run every case whose name contains ``only`` (all when None).
+
+    :return: Dictionary with "meta" (versions and table settings) and "results" (per case the
+             "min" and "median" seconds and all "runs", or "skipped"/"error" with a reason).
+    """
+    from db_read_agent.executor_agent import SQLAgent
+
+    if os.path.exists(STANDIN_PATH):
+        os.remove(STANDIN_PATH)
+    kinds = sqlite_standin.create_table(TABLE, rows=rows, width=width, null_density=null_density, seed=seed,
+                                        path=STANDIN_PATH)
+    agent = SQLAgent({})
+    df = agent.execute_sql(f"SELECT * FROM {TABLE}")
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="agent_benchmarks_") as directory:
+        cases = [sql_cases(agent), inspect_cases(agent), transform_cases(df), export_cases(df, directory),
+                 visualize_cases(agent, df, directory)]
+        for group in cases:
+            for name, setup, func in group:
+                if only and only not in name:
+                    continue
+                if func is None:
+                    results[name] = {"skipped": setup}
+                    continue
+                try:
+                    timings = time_runs(repeat, func, setup)
+                except Exception as e:
+                    results[name] = {"error": f"{type(e).__name__}: {e}"}
+                    continue
+                results[name] = {"min": min(timings), "median": statistics.median(timings), "runs": timings}
+        agent.close()
+
+    return {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+            "config": {"rows": rows, "width": width, "null_density": null_density, "repeat": repeat, "seed": seed,
+                       "column_kinds": sorted(set(kinds))},
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, threshold=0.2, min_seconds=0.001):
+    """
+    Compare the fastest run of every case with a baseline.
+
+    :param threshold: Relative slowdown (0.2 = 20%) above which a case counts as a regression.
+    :param min_seconds: Absolute slowdown a regression must also exceed, so that noise in very
+                        fast cases is not reported.
+    :return: List of (name, status, baseline seconds, current seconds, ratio) with status one of
+             "regression", "improvement", "ok", "new", "missing" or "skipped".
+    """
+    rows = []
+    old_results, new_results = baseline["results"], current["results"]
+    for name in list(new_results) + [name for name in old_results if name not in new_results]:
+        old, new = old_results.get(name), new_results.get(name)
+        if new is None:
+            rows.append((name, "missing", old.get("min"), None, None))
+            continue
+        if "min" not in new:
+            rows.append((name, "skipped" if "skipped" in new else "error", (old or {}).get("min"), None, None))
+            continue
+        if old is None or "min" not in old:
+            rows.append((name, "new", None, new["min"], None))
+            continue
+        ratio = new["min"] / old["min"] if old["min"] else None
+        change = new["min"] - old["min"]
+        if ratio is not None and ratio > 1 + threshold and change > min_seconds:
+            status = "regression"
+        elif ratio is not None and ratio < 1 / (1 + threshold) and -change > min_seconds:
+            status = "improvement"
+        else:
+            status = "ok"
+        rows.append((name, status, old["min"], new["min"], ratio))
+    return rows
+
+
+def _ms(seconds):
+    return f"{seconds * 1000:10.2f}" if seconds is not None else f"{'-':>10}"
+
+
+def main(argv=None):
+    from standardize_agent.serialization import write_json_atomic
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000, help="Rows of the synthetic table.")
+    parser.add_argument("--width", type=int, default=10, help="Columns of the synthetic table (besides id).")
+    parser.add_argument("--null-density", type=float, default=0.1, help="Fraction of NULL values.")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per case.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", help="Only run cases whose name contains this text (e.g. 'export.').")
+    parser.add_argument("--output", default="benchmark_results.json", help="Results file.")
+    parser.add_argument("--baseline", help="Results file of an earlier run to compare with.")
+    parser.add_argument("--save-baseline", help="Also write the results to this file, for later comparisons.")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative slowdown reported as a regression.")
+    parser.add_argument("--min-seconds", type=float, default=0.001,
+                        help="Absolute slowdown a regression must also exceed.")
+    options = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+
+    current = run(options.rows, options.width, options.null_density, options.repeat, options.only, options.seed)
+    write_json_atomic(options.output, current)
+    if options.save_baseline:
+        write_json_atomic(options.save_baseline, current)
+
+    if not options.baseline:
+        print(f"{'case':<42}{'min ms':>10}{'median ms':>11}")
+        for name, result in current["results"].items():
+            if "min" in result:
+                print(f"{name:<42}{_ms(result['min'])}{_ms(result['median']):>11}")
+            else:
+                print(f"{name:<42} {'skipped' if 'skipped' in result else 'error'}: "
+                      f"{result.get('skipped') or result.get('error')}")
+        print(f"results written to {options.output}")
+        return 0
+
+    with open(options.baseline) as file:
+        baseline = json.load(file)
+    if options.only:
+        # Cases left out on purpose are not "missing".
+        baseline["results"] = {name: result for name, result in baseline["results"].items() if options.only in name}
+    if baseline["meta"]["config"] != current["meta"]["config"]:
+        print(f"warning: baseline was made with other settings: {baseline['meta']['config']}")
+    rows = compare(current, baseline, options.threshold, options.min_seconds)
+    print(f"{'case':<42}{'base ms':>10}{'now ms':>10}{'ratio':>8}  status")
+    for name, status, old, new, ratio in rows:
+        print(f"{name:<42}{_ms(old)}{_ms(new)}{f'{ratio:.2f}' if ratio else '-':>8}  {status}")
+    regressions = [row[0] for row in rows if row[1] == "regression"]
+    print(f"{len(regressions)} regression(s) against {options.baseline}" + (f": {', '.join(regressions)}"
+                                                                            if regressions else ""))
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,41 @@
+from benchmarks.suite import compare, time_runs
+
+
+def results(**seconds):
+    return {"meta": {"config": {}}, "results": {name: ({"min": value} if value is not None else {"skipped": "no"})
+                                                for name, value in seconds.items()}}
+
+
+def test_compare_flags_regressions_beyond_threshold_and_noise_floor():
+    baseline = results(slow=0.100, fast=0.100, noise=0.0001, same=0.050, gone=0.010)
+    current = results(slow=0.150, fast=0.050, noise=0.0005, same=0.052, new=0.010)
+    statuses = {row[0]: row[1] for row in compare(current, baseline, threshold=0.2, min_seconds=0.001)}
+    assert statuses == {"slow": "regression", "fast": "improvement", "noise": "ok", "same": "ok", "new": "new",
+                        "gone": "missing"}
+
+
+def test_compare_reports_skipped_cases():
+    statuses = {row[0]: row[1] for row in compare(results(step=None), results(step=0.1))}
+    assert statuses == {"step": "skipped"}
+
+
+def test_time_runs_calls_setup_untimed_for_every_run():
+    made, used = [], []
+    timings = time_runs(3, used.append, setup=lambda: made.append(len(made)) or len(made))
+    assert len(timings) == 3 and used == [1, 2, 3]
+
+
+def test_standin_connections_read_in_a_snapshot_until_commit(standin, source):
+    import mysql.connector
+
+    connection = mysql.connector.connect()
+    cursor = connection.cursor()
+    cursor.execute("SELECT COUNT(*) FROM channels")
+    assert cursor.fetchall() == [(5,)]
+    source.execute("INSERT INTO channels VALUES (6, 'fax')")
+    cursor.execute("SELECT COUNT(*) FROM channels")
+    assert cursor.fetchall() == [(5,)]
+    connection.commit()
+    cursor.execute("SELECT COUNT(*) FROM channels")
+    assert cursor.fetchall() == [(6,)]
+    connection.close()
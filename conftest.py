@@ -0,0 +1,28 @@
+import mysql.connector
+import pytest
+
+
+@pytest.fixture
+def standin(tmp_path, monkeypatch):
+    """
+    Route mysql.connector to a SQLite stand-in populated with the benchmark tables
+    (``booking_origins`` with 200 rows and ``channels``); returns the database file.
+    """
+    from benchmarks import sqlite_standin
+
+    # Restored after the test: install() replaces connect for the whole process.
+    monkeypatch.setattr(mysql.connector, "connect", mysql.connector.connect)
+    monkeypatch.setattr(sqlite_standin, "_path", sqlite_standin._path)
+    path = str(tmp_path / "standin.sqlite")
+    sqlite_standin.populate(rows=200, path=path)
+    return path
+
+
+@pytest.fixture
+def source(standin):
+    """Autocommitting SQLite connection to the stand-in database, for changing data behind the agents' back."""
+    import sqlite3
+
+    connection = sqlite3.connect(standin, isolation_level=None)
+    yield connection
+    connection.close()
@@ -0,0 +1,103 @@
+import json
+import os
+import tempfile
+
+CACHE_VERSION = 1
+
+
+class InspectionCache:
+    """
+    On-disk cache of ``DatabaseInspector.inspect_database`` results.
+
+    Each table is stored with a change fingerprint (e.g. UPDATE_TIME, TABLE_ROWS and
+    CREATE_TIME from information_schema, or a CHECKSUM TABLE value). An entry is only
+    reused while the table's current fingerprint matches the stored one. The whole
+    cache is dropped when the inspection settings it was built with change.
+
+    :param path: Path of the JSON cache file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.settings = None
+        self.tables = {}
+        self.load()
+
+    def load(self):
+        """Load the cache file, starting empty when it is missing or unreadable."""
+        self.settings, self.tables = None, {}
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as file:
+                content = json.load(file)
+        except (OSError, ValueError):
+            return
+        if content.get("version") != CACHE_VERSION:
+            return
+        self.settings = content.get("settings")
+        self.tables = content.get("tables", {})
+
+    def save(self):
+        """Write the cache atomically, so an interrupted run never leaves a corrupt file."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".inspection_cache.", suffix=".part")
+        try:
+            with os.fdopen(fd, "w") as file:
+                json.dump({"version": CACHE_VERSION, "settings": self.settings, "tables": self.tables}, file, indent=2)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def use_settings(self, settings):
+        """
+        Bind the cache to a set of inspection settings, clearing it if they differ
+        from the ones the cached entries were computed with.
+
+        :param settings: JSON-serializable dictionary of inspection settings.
+        """
+        settings = json.loads(json.dumps(settings))
+        if settings != self.settings:
+            self.tables = {}
+        self.settings = settings
+
+    def get(self, table_name, fingerprint):
+        """
+        Return the cached columns of a table if its fingerprint is unchanged.
+
+        :param table_name: Table name.
+        :param fingerprint: Current change fingerprint of the table.
+        :return: Cached list of columns, or None on a miss.
+        """
+        entry = self.tables.get(table_name)
+        if entry is None or fingerprint is None or entry.get("fingerprint") != fingerprint:
+            return None
+        return entry["columns"]
+
+    def put(self, table_name, fingerprint, columns):
+        """
+        Store the inspection result of a table.
+
+        :param table_name: Table name.
+        :param fingerprint: Change fingerprint the result corresponds to.
+        :param columns: Valid columns of the table.
+        """
+        if fingerprint is None:
+            return
+        self.tables[table_name] = {"fingerprint": fingerprint, "columns": list(columns)}
+
+    def retain(self, table_names):
+        """
+        Drop entries of tables that no longer exist.
+
+        :param table_names: Names of the tables currently in the database.
+        :return: Number of entries removed.
+        """
+        keep = set(table_names)
+        dropped = [name for name in self.tables if name not in keep]
+        for name in dropped:
+            del self.tables[name]
+        return len(dropped)
@@ -1,19 +1,63 @@
+import asyncio
+import logging
 import pandas as pd
 from db_read_agent.executor_agent import SQLAgent
 from standardize_agent.main import DataFrameAgent
+from db_inspector.cache import InspectionCache
+from instrumentation.spans import span
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+DEFAULT_POSTFIXES = ['_id', '_at', '_ts', '_timestamp', '_ms', ]
+VALIDITY_MODES = ("sample", "pushdown")
+FINGERPRINT_MODES = ("metadata", "checksum")
+
+logger = logging.getLogger(__name__)
+
+
+def quote_identifier(name):
+    """Quote a MySQL identifier with backticks."""
+    return "`" + str(name).replace("`", "``") + "`"
 
 
 class DatabaseInspector:
-    def __init__(self, config, table_name=None):
+    def __init__(self, config, table_name=None, agent=None, validity_mode="sample",
+                 pushdown_sample_rows=None, null_threshold=0.2, cache=None, fingerprint="metadata"):
         """
         Initialize the DatabaseInspector with a SQLAgent instance and optionally a table name.
         :param config: Configuration for the SQLAgent, typically includes database connection details.
         :param table_name: Optional name of the table to inspect. If provided, it will fetch a sample of the table.
+        :param agent: Optional SQLAgent to reuse (e.g. a pooled agent shared with the visualizers).
+                      A new non-pooled SQLAgent is created from ``config`` when omitted.
+        :param validity_mode: How column validity is computed. "sample" fetches the first 1000 rows
+                              and filters them with DataFrameAgent; "pushdown" computes exact null
+                              counts in a single aggregate query on the server.
+        :param pushdown_sample_rows: In "pushdown" mode, only aggregate over this many rows
+                                     (None aggregates over the full table).
+        :param null_threshold: Maximum fraction of NULL values for a column to count as valid.
+        :param cache: Optional InspectionCache (or path to its JSON file). When set, inspect_database
+                      only re-inspects tables that are new or changed since the cached run.
+        :param fingerprint: How table changes are detected for the cache. "metadata" uses
+                            UPDATE_TIME, TABLE_ROWS and CREATE_TIME from information_schema.TABLES
+                            (one metadata query); "checksum" additionally runs CHECKSUM TABLE, which
+                            is exact but reads every table.
         """
+        if validity_mode not in VALIDITY_MODES:
+            raise ValueError(f"Unknown validity mode '{validity_mode}'. Supported modes are {VALIDITY_MODES}.")
+        if fingerprint not in FINGERPRINT_MODES:
+            raise ValueError(f"Unknown fingerprint mode '{fingerprint}'. Supported modes are {FINGERPRINT_MODES}.")
         self.config = config
         self.table_name = table_name
-        self.agent = SQLAgent(config)
+        self.agent = agent if agent is not None else SQLAgent(config)
+        self.validity_mode = validity_mode
+        self.pushdown_sample_rows = pushdown_sample_rows
+        self.null_threshold = null_threshold
+        self.cache = InspectionCache(cache) if isinstance(cache, str) else cache
+        self.fingerprint = fingerprint
+        self.failed_tables = {}
+        self.cache_stats = None
 
     def get_all_tables(self):
         """
@@ -23,15 +67,133 @@ class DatabaseInspector:
         response = self.agent.execute_sql(query)
         return sum(response.values.tolist(), [])
     
-    def get_table_columns(self):
+    def get_table_fingerprints(self):
+        """
+        Retrieve all table names together with a change fingerprint in one metadata query.
+
+        MySQL 8 caches UPDATE_TIME and TABLE_ROWS of information_schema.TABLES for
+        ``information_schema_stats_expiry`` seconds (a day by default), so the query runs with
+        the expiry set to 0 on its session to read current values.
+
+        :return: Dictionary mapping table names to fingerprint strings (None when the table
+                 carries no change information, e.g. views).
+        """
+        query = (
+            "SELECT TABLE_NAME, UPDATE_TIME, TABLE_ROWS, CREATE_TIME "
+            "FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() ORDER BY TABLE_NAME"
+        )
+        response = self.agent.execute_sql(query, session_variables={"information_schema_stats_expiry": 0})
+        fingerprints = {}
+        for table, update_time, table_rows, create_time in response.values.tolist():
+            if pd.isna(update_time) and pd.isna(create_time):
+                fingerprints[table] = None
+            else:
+                fingerprints[table] = f"{update_time}|{table_rows}|{create_time}"
+
+        if self.fingerprint == "checksum" and fingerprints:
+            tables = ", ".join(quote_identifier(table) for table in fingerprints)
+            response = self.agent.execute_sql(f"CHECKSUM TABLE {tables}")
+            for qualified_name, checksum in response.values.tolist():
+                table = qualified_name.split(".", 1)[-1]
+                if table in fingerprints:
+                    fingerprints[table] = None if pd.isna(checksum) else f"checksum:{checksum}"
+        return fingerprints
+
+    def _cache_settings(self):
+        """Settings that inspection results depend on; a change invalidates the whole cache."""
+        return {
+            "validity_mode": self.validity_mode,
+            "pushdown_sample_rows": self.pushdown_sample_rows,
+            "null_threshold": self.null_threshold,
+            "postfixes": DEFAULT_POSTFIXES,
+            "fingerprint": self.fingerprint,
+        }
+
+    def get_table_columns(self, table_name=None, agent=None):
         """
         Retrieve column names and types for a given table.
+
+        :param table_name: Table to describe (defaults to the inspector's table).
+        :param agent: SQLAgent to run the query with (defaults to the inspector's agent).
         """
-        query = f"DESCRIBE {self.table_name}"
-        response = self.agent.execute_sql(query)
-        columns_info = [{"column_name": row[0], "data_type": row[1]} for row in response]
+        table_name = table_name or self.table_name
+        agent = agent if agent is not None else self.agent
+        query = f"DESCRIBE {table_name}"
+        response = agent.execute_sql(query)
+        columns_info = [{"column_name": row[0], "data_type": row[1]} for row in response.values.tolist()]
         return columns_info
 
+    def build_null_count_query(self, table_name, columns, sample_rows=None, timeout=None):
+        """
+        Build one aggregate query returning the row count and the NULL count of every column.
+
+        :param table_name: Table to aggregate.
+        :param columns: Column names of the table.
+        :param sample_rows: Aggregate over at most this many rows (None for the full table).
+        :param timeout: Optional server-side execution limit, in seconds.
+        :return: SQL query string.
+        """
+        hint = f"/*+ MAX_EXECUTION_TIME({int(timeout * 1000)}) */ " if timeout else ""
+        aggregates = ", ".join(f"SUM({quote_identifier(col)} IS NULL)" for col in columns)
+        source = quote_identifier(table_name)
+        if sample_rows is not None:
+            source = f"(SELECT * FROM {source} LIMIT {int(sample_rows)}) AS sample_rows"
+        select_list = "COUNT(*)" + (f", {aggregates}" if aggregates else "")
+        return f"SELECT {hint}{select_list} FROM {source}"
+
+    def compute_null_ratios(self, table_name, timeout=None, agent=None):
+        """
+        Compute the exact fraction of NULL values per column with a single aggregate query,
+        so only one row per table travels over the wire.
+
+        :param table_name: Table to check.
+        :param timeout: Optional server-side execution limit, in seconds.
+        :param agent: SQLAgent to run the queries with (defaults to the inspector's agent).
+        :return: Dictionary mapping column names to NULL ratios (None for an empty table).
+        """
+        agent = agent if agent is not None else self.agent
+        columns = [info["column_name"] for info in self.get_table_columns(table_name, agent=agent)]
+        query = self.build_null_count_query(table_name, columns, sample_rows=self.pushdown_sample_rows, timeout=timeout)
+        counts = agent.execute_sql(query).values.tolist()[0]
+
+        row_count = int(counts[0] or 0)
+        if row_count == 0:
+            return {col: None for col in columns}
+        return {col: float(nulls or 0) / row_count for col, nulls in zip(columns, counts[1:])}
+
+    def _filtered_sample(self, table_name, timeout=None, agent=None):
+        """
+        Fetch a sample of the table and drop the columns with too many missing values.
+        :return: DataFrameAgent holding the filtered sample.
+        """
+        agent = agent if agent is not None else self.agent
+        hint = f"/*+ MAX_EXECUTION_TIME({int(timeout * 1000)}) */ " if timeout else ""
+        query = f"SELECT {hint}* FROM {table_name} LIMIT 1000"
+        response = agent.execute_sql(query)
+
+        dataframe_agent = DataFrameAgent(dataframe=response)
+        dataframe_agent.filter_columns_by_valid_data(threshold=self.null_threshold)
+        return dataframe_agent
+
+    def compute_valid_columns(self, table_name, timeout=None, agent=None):
+        """
+        Compute the columns of a table that have enough non-null values.
+        Unlike ``set_column_validity`` this keeps no state on the inspector, so it can
+        run for several tables at once.
+
+        :param table_name: Name of the table to check.
+        :param timeout: Optional server-side execution limit for the sample query, in seconds.
+        :param agent: SQLAgent to run the query with (defaults to the inspector's agent).
+        :return: List of valid column names.
+        """
+        if self.validity_mode == "pushdown":
+            # Empty tables have no valid columns, matching the sample mode.
+            ratios = self.compute_null_ratios(table_name, timeout=timeout, agent=agent)
+            return [col for col, ratio in ratios.items() if ratio is not None and ratio <= self.null_threshold]
+
+        dataframe_agent = self._filtered_sample(table_name, timeout=timeout, agent=agent)
+        return dataframe_agent.get_dataframe().columns.to_list()
+
     def set_column_validity(self, table_name=None):
         """
         Performs EDA for missing value.
@@ -41,16 +203,21 @@ class DatabaseInspector:
                 raise ValueError("No table name provided for column validity check.")
             table_name = self.table_name
 
-        query = f"SELECT * FROM {table_name} LIMIT 1000"
-        response = self.agent.execute_sql(query)
-        if response.empty:
-            pass
-            # raise ValueError(f"No data found in table: {self.table_name}")
-        
-        self.dataframe_agent = DataFrameAgent(dataframe=response)  
-        self.dataframe_agent.filter_columns_by_valid_data()
+        self.dataframe_agent = self._filtered_sample(table_name)
         self.valid_columns = self.dataframe_agent.get_dataframe().columns.to_list()
 
+    @staticmethod
+    def remove_postfixes(columns, postfixes=None):
+        """
+        Return the columns whose names do not end with one of the given postfixes.
+
+        :param columns: List of column names.
+        :param postfixes: List of postfix strings to exclude (default: ['_id', '_at', '_ts', '_timestamp', '_ms'])
+        """
+        if postfixes is None:
+            postfixes = DEFAULT_POSTFIXES
+        pattern = re.compile(rf"({'|'.join(re.escape(p) for p in postfixes)})$", re.IGNORECASE)
+        return [col for col in columns if not pattern.search(col)]
 
     def apply_remove_postfixes(self, postfixes=None):
         """
@@ -58,27 +225,157 @@ class DatabaseInspector:
         
         :param postfixes: List of postfix strings to exclude (default: ['_id', '_at', '_ts', '_timestamp', '_ms'])
         """
-        if postfixes is None:
-            postfixes = ['_id', '_at', '_ts', '_timestamp','_ms', ]
-
         columns = self.dataframe_agent.get_dataframe().columns.to_list()
-        pattern = re.compile(rf"({'|'.join(re.escape(p) for p in postfixes)})$", re.IGNORECASE)
 
         # Filter out columns that end with any of the postfixes
-        self.valid_columns = [col for col in columns if not pattern.search(col)]
+        self.valid_columns = self.remove_postfixes(columns, postfixes)
 
+    def inspect_table(self, table_name, timeout=None, agent=None):
+        """
+        Inspect a single table and return its valid columns without postfixed ones.
 
+        :param table_name: Name of the table to inspect.
+        :param timeout: Optional server-side execution limit for the sample query, in seconds.
+        :param agent: SQLAgent to run the query with (defaults to the inspector's agent).
+        :return: List of column names.
+        """
+        logger.info("Inspecting table: %s", table_name)
+        with span("inspect_table", table=table_name) as table_span:
+            columns = self.remove_postfixes(self.compute_valid_columns(table_name, timeout=timeout, agent=agent))
+            table_span.set(columns=len(columns))
+        return columns
 
-    def inspect_database(self):
+    def inspect_database(self, workers=1, table_timeout=None):
         """
         Inspect the entire database: Get all tables and columns with valid values.
+
+        Tables are inspected independently: a table that fails or exceeds ``table_timeout``
+        is recorded in ``self.failed_tables`` and left out of the summary instead of
+        aborting the run. The summary always lists tables in ``get_all_tables`` order,
+        whatever order the workers finish in.
+
+        With a cache configured, the table list and change fingerprints come from a single
+        metadata query and only new or changed tables are inspected; hit rates are stored
+        in ``self.cache_stats``.
+
+        :param workers: Number of tables inspected concurrently. With more than one worker
+                        a pooled SQLAgent is used (a temporary pool is created if needed).
+        :param table_timeout: Optional time limit per table, in seconds.
+        :return: Dictionary mapping table names to their valid columns.
         """
-        all_tables = self.get_all_tables()
-        tables_summary = {}
+        with span("inspect_database", workers=workers) as database_span:
+            summary = self._inspect_database(workers, table_timeout)
+            database_span.set(tables=len(summary), failed=len(self.failed_tables))
+        return summary
+
+    def _inspect_database(self, workers, table_timeout):
+        self.failed_tables = {}
+        if self.cache is None:
+            return self._inspect_tables(self.get_all_tables(), workers, table_timeout)
 
+        fingerprints = self.get_table_fingerprints()
+        all_tables = list(fingerprints)
+        self.cache.use_settings(self._cache_settings())
+
+        tables_summary = {}
+        to_inspect = []
         for table in all_tables:
-            print(f"\nInspecting table: {table}")
-            self.set_column_validity(table)
-            self.apply_remove_postfixes()
-            tables_summary[table] = self.valid_columns
-        return tables_summary
\ No newline at end of file
+            columns = self.cache.get(table, fingerprints[table])
+            if columns is None:
+                to_inspect.append(table)
+            else:
+                tables_summary[table] = columns
+
+        inspected = self._inspect_tables(to_inspect, workers, table_timeout)
+        for table, columns in inspected.items():
+            self.cache.put(table, fingerprints[table], columns)
+        dropped = self.cache.retain(all_tables)
+        self.cache.save()
+        tables_summary.update(inspected)
+
+        hits = len(all_tables) - len(to_inspect)
+        self.cache_stats = {
+            "tables": len(all_tables),
+            "hits": hits,
+            "misses": len(to_inspect),
+            "hit_rate": hits / len(all_tables) if all_tables else 0.0,
+            "dropped": dropped,
+        }
+        logger.info("Inspection cache: %d/%d tables reused (%.0f%% hit rate), %d inspected.", hits, len(all_tables),
+                    self.cache_stats["hit_rate"] * 100, len(to_inspect))
+
+        return {table: tables_summary[table] for table in all_tables if table in tables_summary}
+
+    async def inspect_database_async(self, workers=1, table_timeout=None, executor=None):
+        """
+        Awaitable version of ``inspect_database``: the inspection runs on ``executor`` (the event
+        loop's default executor when omitted), so the event loop is not blocked. Per-table time
+        limits still apply through ``table_timeout``; cancelling the awaiting task does not stop
+        tables that are already being inspected.
+
+        :return: Dictionary mapping table names to their valid columns.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, self.inspect_database, workers, table_timeout)
+
+    def _inspect_tables(self, all_tables, workers, table_timeout):
+        """
+        Inspect the given tables serially or on a thread pool, see ``inspect_database``.
+        """
+        if workers <= 1:
+            tables_summary = {}
+            for table in all_tables:
+                try:
+                    tables_summary[table] = self.inspect_table(table, timeout=table_timeout)
+                except Exception as e:
+                    self.failed_tables[table] = str(e)
+                    logger.warning("Failed to inspect table %s: %s", table, e)
+            return tables_summary
+
+        if not all_tables:
+            return {}
+
+        agent = self.agent
+        owns_pool = agent.pool is None
+        if owns_pool:
+            agent = SQLAgent.pooled(self.config, max_size=workers)
+
+        started = {}
+
+        def run(table):
+            started[table] = time.monotonic()
+            return self.inspect_table(table, timeout=table_timeout, agent=agent)
+
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="inspect")
+        try:
+            futures = {table: executor.submit(run, table) for table in all_tables}
+            results = {}
+            for table in all_tables:
+                try:
+                    results[table] = self._wait_for_table(futures[table], started, table, table_timeout)
+                except FutureTimeoutError:
+                    futures[table].cancel()
+                    self.failed_tables[table] = f"Timed out after {table_timeout} seconds"
+                    logger.warning("Inspection of table %s timed out after %s seconds", table, table_timeout)
+                except Exception as e:
+                    self.failed_tables[table] = str(e)
+                    logger.warning("Failed to inspect table %s: %s", table, e)
+        finally:
+            # Do not block on tables that timed out; their threads finish in the background.
+            executor.shutdown(wait=False, cancel_futures=True)
+            if owns_pool:
+                agent.close()
+
+        return {table: results[table] for table in all_tables if table in results}
+
+    @staticmethod
+    def _wait_for_table(future, started, table, table_timeout):
+        """Wait for a table's future, measuring the timeout from when its worker started."""
+        if table_timeout is None:
+            return future.result()
+        while table not in started and not future.done():
+            wait([future], timeout=0.05)
+        if future.done():
+            return future.result()
+        remaining = started[table] + table_timeout - time.monotonic()
+        return future.result(timeout=max(remaining, 0))
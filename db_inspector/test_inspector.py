@@ -0,0 +1,32 @@
+from benchmarks import sqlite_standin
+from db_inspector.main import DatabaseInspector
+from db_read_agent.executor_agent import SQLAgent
+from db_read_agent.result_cache import QueryResultCache
+
+
+def test_fingerprints_read_current_table_statistics(standin):
+    agent = SQLAgent.pooled({}, max_size=1, result_cache=QueryResultCache(sql_ttl=300))
+    inspector = DatabaseInspector({}, agent=agent)
+    fingerprints = inspector.get_table_fingerprints()
+    assert sorted(fingerprints) == ["booking_origins", "channels"]
+    with agent.pool.connection() as connection:
+        # MySQL 8 would otherwise serve UPDATE_TIME and TABLE_ROWS cached for up to a day.
+        assert connection.session_history == [("information_schema_stats_expiry", 0)]
+        # The pooled connection goes back with the server default, for the queries that reuse it.
+        assert connection.session_variables == {}
+    inspector.get_table_fingerprints()
+    assert agent.cache_stats()["hits"] == 0
+    agent.close()
+
+
+def test_servers_without_the_stats_expiry_variable_still_get_fingerprints(standin, tmp_path, monkeypatch):
+    # MySQL 5.7 and MariaDB reject the variable with "Unknown system variable".
+    monkeypatch.setattr(sqlite_standin, "UNKNOWN_VARIABLES", {"information_schema_stats_expiry"})
+    agent = SQLAgent.pooled({}, max_size=1)
+    inspector = DatabaseInspector({}, agent=agent, cache=str(tmp_path / "inspection.json"))
+    assert sorted(inspector.get_table_fingerprints()) == ["booking_origins", "channels"]
+    assert sorted(inspector.inspect_database()) == ["booking_origins", "channels"]
+    assert inspector.cache_stats["misses"] == 2
+    with agent.pool.connection() as connection:
+        assert connection.session_history == []
+    agent.close()
@@ -0,0 +1,312 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import mysql.connector
+
+from db_read_agent.executor_agent import SQLAgent
+from db_read_agent.result_cache import normalize_sql
+
+DEFAULT_CONCURRENCY = 4
+# Seconds to wait for a killed query's worker to hand its connection back.
+KILL_GRACE = 5
+
+logger = logging.getLogger(__name__)
+
+
+class QueryTimeoutError(TimeoutError):
+    """Raised when a query exceeds its timeout; the query has been killed on the server."""
+
+
+class _RunningQuery:
+    """Shared state between the awaiting coroutines of a query and the worker thread running it."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.connection_id = None
+        self.cancelled = False
+        self.waiters = 0
+
+
+class AsyncSQLAgent:
+    """
+    Asyncio front end for SQLAgent.
+
+    Queries are awaitable. The blocking MySQL calls run on a dedicated thread pool, and at most
+    ``max_concurrency`` queries are in flight at a time; the limit defaults to the size of the
+    agent's connection pool, so waiting happens on an asyncio semaphore rather than inside a
+    worker thread blocked on the pool.
+
+    Cancelling a query (or exceeding its ``timeout``) sends ``KILL QUERY`` for the server thread
+    running it over a separate short-lived connection, so the server stops working on it. The
+    worker's connection is then discarded by the pool. With a result cache, callers waiting for
+    the same query share one execution; it is only killed when the last of them gives up.
+
+    Rows are fetched on the I/O threads. Building the DataFrame (decoding and compaction),
+    copying cached results, replica queries and exports run on ``cpu_executor``, so the event
+    loop never does that work. Replica queries count against ``max_concurrency`` too.
+
+    :param sql_agent: SQLAgent running the queries. A pooled agent is recommended; without a
+                      pool every query opens its own connection.
+    :param max_concurrency: Maximum number of queries in flight (defaults to the pool size).
+    :param cpu_executor: Executor for DataFrame construction and exports (defaults to the
+                         event loop's default executor).
+    """
+
+    def __init__(self, sql_agent, max_concurrency=None, cpu_executor=None):
+        self.sql_agent = sql_agent
+        if max_concurrency is None:
+            max_concurrency = sql_agent.pool.max_size if sql_agent.pool is not None else DEFAULT_CONCURRENCY
+        self.max_concurrency = max_concurrency
+        self.cpu_executor = cpu_executor
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        # One extra thread so that a KILL QUERY can always run while every slot is busy.
+        self._io_executor = ThreadPoolExecutor(max_workers=max_concurrency + 1, thread_name_prefix="async-sql")
+        self._stats = {"queries": 0, "cancelled": 0, "timeouts": 0, "killed": 0}
+        # Queries in flight through the result cache, by normalized SQL; only touched on the event loop.
+        self._shared = {}
+
+    @classmethod
+    def pooled(cls, config, max_concurrency=None, cpu_executor=None, **agent_options):
+        """
+        Create an AsyncSQLAgent backed by a new pooled SQLAgent.
+
+        :param config: Dictionary containing database connection details
+        :param agent_options: Keyword arguments forwarded to ``SQLAgent.pooled`` (max_size, decoder, ...).
+        """
+        return cls(SQLAgent.pooled(config, **agent_options), max_concurrency=max_concurrency,
+                   cpu_executor=cpu_executor)
+
+    async def execute_sql(self, query, timeout=None):
+        """
+        Execute a SQL query and return the results as a pandas DataFrame.
+
+        :param query: SQL query string to be executed.
+        :param timeout: Optional limit in seconds; the query is killed when it is exceeded.
+        :return: DataFrame containing the results of the query.
+        """
+        df, _ = await self._query(query, timeout=timeout)
+        return df
+
+    async def execute_task(self, task, timeout=None):
+        """
+        Execute a given task, see ``SQLAgent.execute_task``.
+
+        Streaming and partitioned reads run as a whole on an I/O thread; they are not killed on
+        cancellation.
+
+        :param task: Dictionary containing the operation and its arguments.
+        :param timeout: Optional limit in seconds for the query.
+        :return: Result dictionary, as returned by ``SQLAgent.execute_task``.
+        """
+        operation = task.get("operation")
+        args = task.get("args", {})
+        try:
+            query = self.sql_agent.generate_sql_query(task)
+        except Exception as e:
+            return {"status": "error", "message": str(e)}
+
+        if args.get("stream_export") and args.get("export_data") or int(args.get("partitions", 1)) > 1:
+            async with self._semaphore:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._io_executor, self.sql_agent.execute_task, task)
+
+        table_name = args.get("table_name")
+        try:
+            df = await self._replica_query(query, table_name, operation)
+            if df is not None:
+                cache_hit, source = False, "replica"
+            else:
+                df, cache_hit = await self._query(query, timeout=timeout, operation=operation,
+                                                  tables=[table_name] if table_name else None)
+                source = "cache" if cache_hit else "database"
+            if args.get("export_data"):
+                export_path = args.get("export_path")
+                loop = asyncio.get_running_loop()
+                if not await loop.run_in_executor(self.cpu_executor, self.sql_agent.export_dataframe, df, args):
+                    return {"status": "error",
+                            "message": f"Unsupported export format '{args.get('export_format', 'csv').lower()}'"}
+                return {"status": "success", "query": query, "message": f"Data exported to {export_path}", "data": df,
+                        "cache_hit": cache_hit, "source": source}
+            return {"status": "success", "query": query, "data": df, "message": "Query executed successfully",
+                    "cache_hit": cache_hit, "source": source}
+        except QueryTimeoutError as e:
+            return {"status": "error", "query": query, "message": str(e)}
+        except mysql.connector.Error as err:
+            return {"status": "error", "message": f"MySQL Error: {err}"}
+        except Exception as e:
+            return {"status": "error", "message": str(e)}
+
+    async def _replica_query(self, query, table_name, operation):
+        """Answer a task query from the SQLAgent's local replica, or return None, see ``LocalReplica.query``."""
+        if self.sql_agent.replica is None:
+            return None
+        loop = asyncio.get_running_loop()
+        async with self._semaphore:
+            return await loop.run_in_executor(self.cpu_executor, self._replica_frame, query, table_name, operation)
+
+    def _replica_frame(self, query, table_name, operation):
+        df = self.sql_agent.replica.query(query, table_name, operation)
+        return self.sql_agent._compact(df) if df is not None else None
+
+    async def _query(self, query, timeout=None, operation=None, tables=None):
+        """
+        Run a query with bounded concurrency, killing it on cancellation or timeout.
+
+        :return: Tuple (DataFrame, cache_hit).
+        """
+        loop = asyncio.get_running_loop()
+        cache = self.sql_agent.result_cache
+        # Only queries the cache stores are shared between callers; uncached ones run once per caller.
+        shared = cache is not None and cache.ttl_for(operation) != 0
+        async with self._semaphore:
+            self._stats["queries"] += 1
+            if shared:
+                key = normalize_sql(query)
+                running = self._shared.get(key)
+                if running is None:
+                    running = self._shared[key] = _RunningQuery()
+            else:
+                running = _RunningQuery()
+            if cache is not None:
+                # The cache may make this call wait for an identical query of another caller,
+                # so the whole lookup runs off the event loop.
+                future = loop.run_in_executor(self._io_executor, cache.get_or_execute, query,
+                                              lambda q: self._fetch_and_build(loop, q, running), operation, tables)
+            else:
+                future = loop.run_in_executor(self._io_executor, self._fetch_rows, query, running)
+
+            running.waiters += 1
+            try:
+                result = await asyncio.wait_for(asyncio.shield(future), timeout)
+            except asyncio.TimeoutError:
+                self._stats["timeouts"] += 1
+                await self._cancel(running, future)
+                raise QueryTimeoutError(f"Query timed out after {timeout} seconds") from None
+            except asyncio.CancelledError:
+                self._stats["cancelled"] += 1
+                await self._cancel(running, future)
+                raise
+            finally:
+                running.waiters -= 1
+                if shared and not running.waiters and self._shared.get(key) is running:
+                    del self._shared[key]
+
+        if cache is not None:
+            df, hit = result
+            if shared:
+                # The cached DataFrame itself; callers get their own copy.
+                df = await loop.run_in_executor(self.cpu_executor, df.copy)
+            return df, hit
+        df = await loop.run_in_executor(self.cpu_executor, self._build, *result)
+        return df, False
+
+    def _build(self, rows, description):
+        return self.sql_agent._compact(self.sql_agent._build_dataframe(rows, description))
+
+    def _fetch_and_build(self, loop, query, running):
+        """Fetch rows on the calling I/O thread and build the DataFrame on ``cpu_executor``."""
+        rows, description = self._fetch_rows(query, running)
+
+        async def build():
+            return await loop.run_in_executor(self.cpu_executor, self._build, rows, description)
+
+        return asyncio.run_coroutine_threadsafe(build(), loop).result()
+
+    @contextmanager
+    def _checkout(self, running):
+        """Yield a connection used by one worker thread only; it is discarded when its query was cancelled."""
+        if self.sql_agent.pool is not None:
+            pool = self.sql_agent.pool
+            connection = pool.acquire()
+            discard = True
+            try:
+                yield connection
+                # A killed (or about to be killed) query leaves the connection in an unknown state.
+                discard = running.cancelled
+            finally:
+                pool.release(connection, discard=discard)
+        else:
+            connection = mysql.connector.connect(**self.sql_agent.config)
+            try:
+                yield connection
+            finally:
+                connection.close()
+
+    def _fetch_rows(self, query, running):
+        """Run a query on an I/O thread and return (rows, description)."""
+        with self._checkout(running) as connection:
+            with running.lock:
+                if running.cancelled:
+                    raise RuntimeError("Query cancelled before it started")
+                running.connection_id = connection.connection_id
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute(query)
+                    return cursor.fetchall(), cursor.description
+            finally:
+                with running.lock:
+                    running.connection_id = None
+
+    async def _cancel(self, running, future):
+        """
+        Stop a query on the server and wait briefly for its worker to give the connection back.
+        A query other callers still wait for is left running for them.
+        """
+        # The killed query's error is expected; retrieve it so that it is not reported as unhandled.
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        if running.waiters > 1:
+            return
+        with running.lock:
+            running.cancelled = True
+            started = running.connection_id is not None
+        if started:
+            loop = asyncio.get_running_loop()
+            try:
+                if await loop.run_in_executor(self._io_executor, self._kill_query, running):
+                    self._stats["killed"] += 1
+            except Exception as e:
+                logger.warning("Could not kill query on connection %s: %s", running.connection_id, e)
+        # Keep the slot until the worker is done, so cancelled queries cannot pile up on the server.
+        await asyncio.wait([future], timeout=KILL_GRACE)
+
+    def _kill_query(self, running):
+        """
+        Send ``KILL QUERY`` for a query that is still running.
+
+        :return: True when the KILL was sent, False when the query had already finished.
+        """
+        # A separate connection: the pool may be exhausted, and the query's own connection is busy.
+        connection = mysql.connector.connect(**self.sql_agent.config)
+        try:
+            # The worker clears connection_id under this lock before giving its connection back,
+            # so the KILL cannot reach a connection that is already serving another query.
+            with running.lock:
+                if running.connection_id is None:
+                    return False
+                with connection.cursor() as cursor:
+                    cursor.execute(f"KILL QUERY {int(running.connection_id)}")
+                return True
+        finally:
+            connection.close()
+
+    def stats(self):
+        """
+        Return query counters.
+
+        :return: Dictionary with the number of queries, cancellations, timeouts and kills.
+        """
+        return dict(self._stats, max_concurrency=self.max_concurrency)
+
+    def close(self):
+        """Stop the I/O threads and release the SQLAgent's database resources."""
+        self._io_executor.shutdown(wait=False, cancel_futures=True)
+        self.sql_agent.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
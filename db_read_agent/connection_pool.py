@@ -0,0 +1,256 @@
+import threading
+import time
+from contextlib import contextmanager
+
+import mysql.connector
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no pooled connection becomes available in time."""
+
+
+class _PooledConnection:
+    """Bookkeeping wrapper around a raw connection held by the pool."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+
+class ConnectionPool:
+    """
+    A bounded, thread-safe pool of MySQL connections.
+
+    Connections are health-checked when they are checked out, closed once they
+    have been idle for longer than ``max_idle`` seconds and recycled once they are
+    older than ``max_lifetime`` seconds.
+
+    Connections are opened with autocommit on (unless ``config`` sets ``autocommit``), so a
+    reused connection does not keep reading from the InnoDB snapshot of its first query;
+    with autocommit off, connections are rolled back before they go back to the pool.
+
+    :param config: Dictionary containing database connection details.
+    :param max_size: Maximum number of open connections (idle + in use).
+    :param timeout: Seconds to wait for a free connection before giving up.
+    :param max_idle: Seconds a connection may sit idle before it is evicted.
+    :param max_lifetime: Seconds after which a connection is recycled.
+    :param health_check: Ping connections on checkout and replace dead ones.
+    """
+
+    def __init__(self, config, max_size=5, timeout=30, max_idle=300, max_lifetime=3600, health_check=True):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1.")
+        self.config = config
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.health_check = health_check
+
+        self._idle = []  # LIFO stack, so the warmest connection is reused first
+        self._checked_out = {}
+        self._in_use = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "waits": 0,
+            "wait_time": 0.0,
+            "timeouts": 0,
+            "created": 0,
+            "evicted_idle": 0,
+            "recycled": 0,
+            "failed_health_checks": 0,
+            "discarded": 0,
+        }
+
+    @property
+    def autocommit(self):
+        return self.config.get("autocommit", True)
+
+    def _open(self):
+        return _PooledConnection(mysql.connector.connect(**dict(self.config, autocommit=self.autocommit)))
+
+    def _close_quietly(self, entry):
+        try:
+            entry.connection.close()
+        except Exception:
+            pass
+
+    def _is_expired(self, entry, now):
+        if self.max_lifetime is not None and now - entry.created_at > self.max_lifetime:
+            self._stats["recycled"] += 1
+            return True
+        if self.max_idle is not None and now - entry.last_used > self.max_idle:
+            self._stats["evicted_idle"] += 1
+            return True
+        return False
+
+    def _is_healthy(self, entry):
+        if not self.health_check:
+            return True
+        try:
+            entry.connection.ping(reconnect=False)
+            return True
+        except Exception:
+            with self._cond:
+                self._stats["failed_health_checks"] += 1
+            return False
+
+    def _take_idle(self):
+        """Pop a usable idle connection, closing stale ones on the way. Caller holds the lock."""
+        now = time.monotonic()
+        while self._idle:
+            entry = self._idle.pop()
+            if self._is_expired(entry, now):
+                self._close_quietly(entry)
+                continue
+            return entry
+        return None
+
+    def acquire(self):
+        """
+        Check out a connection from the pool.
+
+        :return: A live database connection. Return it with ``release``.
+        """
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        waited_since = None
+        while True:
+            with self._cond:
+                if self._closed:
+                    raise RuntimeError("Connection pool is closed.")
+
+                entry = self._take_idle()
+                reuse = entry is not None
+                if entry is None and self._in_use + len(self._idle) < self.max_size:
+                    entry = "new"
+
+                if entry is None:
+                    if waited_since is None:
+                        waited_since = time.monotonic()
+                        self._stats["waits"] += 1
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        self._stats["wait_time"] += time.monotonic() - waited_since
+                        raise PoolTimeoutError(f"No connection available within {self.timeout} seconds.")
+                    self._cond.wait(remaining)
+                    continue
+
+                # Reserve the slot before doing any network I/O outside the lock.
+                self._in_use += 1
+                if waited_since is not None:
+                    self._stats["wait_time"] += time.monotonic() - waited_since
+                    waited_since = None
+
+            if reuse and self._is_healthy(entry):
+                with self._cond:
+                    self._stats["hits"] += 1
+                entry.last_used = time.monotonic()
+                return self._track(entry)
+
+            if reuse:
+                self._close_quietly(entry)
+            try:
+                entry = self._open()
+            except Exception:
+                with self._cond:
+                    self._in_use -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._stats["misses"] += 1
+                self._stats["created"] += 1
+            return self._track(entry)
+
+    def _track(self, entry):
+        with self._cond:
+            self._checked_out[id(entry.connection)] = entry
+        return entry.connection
+
+    def release(self, connection, discard=False):
+        """
+        Return a connection to the pool.
+
+        :param connection: Connection previously obtained from ``acquire``.
+        :param discard: Close the connection instead of reusing it (e.g. after an error
+                        or when an unbuffered result was not fully consumed).
+        """
+        if not discard and not self.autocommit:
+            # End the transaction so the next user does not read from this one's snapshot.
+            try:
+                connection.rollback()
+            except Exception:
+                discard = True
+        with self._cond:
+            entry = self._checked_out.pop(id(connection), None)
+            if entry is None:
+                return
+            self._in_use -= 1
+            if discard or self._closed:
+                if discard:
+                    self._stats["discarded"] += 1
+                self._close_quietly(entry)
+            else:
+                entry.last_used = time.monotonic()
+                self._idle.append(entry)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """
+        Context manager that checks out a connection and returns it afterwards.
+        The connection is discarded if the block raises or is abandoned (e.g. a
+        generator that is closed before it finished reading its result set).
+        """
+        conn = self.acquire()
+        discard = True
+        try:
+            yield conn
+            discard = False
+        finally:
+            self.release(conn, discard=discard)
+
+    def evict_idle(self):
+        """
+        Close idle connections that exceeded ``max_idle`` or ``max_lifetime``.
+
+        :return: Number of connections closed.
+        """
+        with self._cond:
+            now = time.monotonic()
+            keep, stale = [], []
+            for entry in self._idle:
+                (stale if self._is_expired(entry, now) else keep).append(entry)
+            self._idle = keep
+        for entry in stale:
+            self._close_quietly(entry)
+        return len(stale)
+
+    def close(self):
+        """Close all idle connections and refuse further checkouts."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for entry in idle:
+            self._close_quietly(entry)
+
+    def stats(self):
+        """
+        Return pool counters.
+
+        :return: Dictionary with hit/miss counts, total and average wait time and current sizes.
+        """
+        with self._cond:
+            stats = dict(self._stats)
+            stats["idle"] = len(self._idle)
+            stats["in_use"] = self._in_use
+            stats["max_size"] = self.max_size
+        checkouts = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / checkouts if checkouts else 0.0
+        stats["avg_wait_time"] = stats["wait_time"] / stats["waits"] if stats["waits"] else 0.0
+        return stats
@@ -0,0 +1,144 @@
+import numpy as np
+import pandas as pd
+from mysql.connector import FieldFlag, FieldType
+
+try:
+    # C routine pandas itself uses to turn row tuples into a 2-D object array; much
+    # faster than zip(*rows) or np.array(rows, dtype=object).
+    from pandas._libs.lib import to_object_array_tuples as _rows_to_matrix
+except ImportError:  # pragma: no cover - private API, fall back to NumPy
+    _rows_to_matrix = None
+
+INTEGER_TYPES = {FieldType.TINY, FieldType.SHORT, FieldType.INT24, FieldType.LONG, FieldType.LONGLONG, FieldType.YEAR}
+FLOAT_TYPES = {FieldType.FLOAT, FieldType.DOUBLE}
+DECIMAL_TYPES = {FieldType.DECIMAL, FieldType.NEWDECIMAL}
+DATETIME_TYPES = {FieldType.DATE, FieldType.NEWDATE, FieldType.DATETIME, FieldType.TIMESTAMP}
+TEXT_TYPES = {FieldType.VARCHAR, FieldType.VAR_STRING, FieldType.STRING, FieldType.ENUM, FieldType.SET}
+# MySQL reports TEXT columns as BLOBs; only the BINARY flag tells real BLOBs apart.
+BLOB_TYPES = {FieldType.TINY_BLOB, FieldType.MEDIUM_BLOB, FieldType.LONG_BLOB, FieldType.BLOB}
+CATEGORICAL_PROBE_ROWS = 1000
+
+
+class ResultDecoder:
+    """
+    Build DataFrames column by column from cursor results, using the type codes in
+    ``cursor.description`` to pick NumPy dtypes instead of letting pandas infer
+    object columns from a list of row tuples.
+
+    - integer columns become int64 (uint64 for unsigned BIGINT), or nullable Int64
+      backed by a NULL mask when the column contains NULLs
+    - FLOAT/DOUBLE (and DECIMAL with ``decimal_as_float``) become float64; DECIMAL values
+      otherwise stay exact Decimal objects
+    - DATE/DATETIME/TIMESTAMP become datetime64, TIME becomes timedelta64
+    - text columns (including TEXT columns reported as BLOB) become categoricals when they
+      have few distinct values
+    - anything else, or a column that fails to convert, stays an object column
+
+    :param categorical_max_ratio: Convert a text column to ``category`` when its number of
+                                  distinct values is at most this fraction of its rows
+                                  (0 disables categoricals).
+    :param categorical_min_rows: Only consider categoricals for results with at least this many rows.
+    :param decimal_as_float: Decode DECIMAL columns to float64 instead of keeping Decimal objects.
+                             Faster, but rounds values that do not fit a double (e.g. money
+                             amounts with many digits), so it has to be asked for.
+    """
+
+    def __init__(self, categorical_max_ratio=0.5, categorical_min_rows=100, decimal_as_float=False):
+        self.categorical_max_ratio = categorical_max_ratio
+        self.categorical_min_rows = categorical_min_rows
+        self.decimal_as_float = decimal_as_float
+
+    def decode(self, rows, description):
+        """
+        Build a DataFrame from the rows and description of an executed cursor.
+
+        :param rows: List of row tuples, as returned by ``fetchall``/``fetchmany``.
+        :param description: ``cursor.description`` of the query.
+        :return: DataFrame with one typed column per description entry.
+        """
+        names = [desc[0] for desc in description]
+        if not rows:
+            return pd.DataFrame(columns=names)
+
+        matrix = _to_object_matrix(rows, len(names))
+        arrays = {}
+        for position, desc in enumerate(description):
+            values = matrix[:, position]
+            try:
+                arrays[position] = self.decode_column(values, desc)
+            except (TypeError, ValueError, OverflowError):
+                arrays[position] = values.copy()
+
+        df = pd.DataFrame(arrays, copy=False)
+        # Positional keys keep duplicate column names (e.g. two joined "id" columns) apart.
+        df.columns = names
+        return df
+
+    def decode_column(self, values, desc):
+        """
+        Convert the values of one result column to a typed array.
+
+        :param values: 1-D object array with the column's Python values.
+        :param desc: The column's ``cursor.description`` entry.
+        :return: NumPy array or pandas extension array.
+        """
+        type_code = desc[1]
+        flags = desc[7] if len(desc) > 7 and desc[7] else 0
+
+        if type_code in INTEGER_TYPES:
+            unsigned = type_code == FieldType.LONGLONG and flags & FieldFlag.UNSIGNED
+            dtype = np.uint64 if unsigned else np.int64
+            try:
+                return values.astype(dtype)
+            except TypeError:
+                # NULLs present: keep them in a mask next to the integer data.
+                mask = pd.isna(values)
+                return pd.arrays.IntegerArray(np.where(mask, 0, values).astype(dtype), mask)
+
+        if type_code in FLOAT_TYPES or (type_code in DECIMAL_TYPES and self.decimal_as_float):
+            # None becomes NaN during the conversion.
+            return values.astype(np.float64)
+
+        if type_code in DATETIME_TYPES:
+            # None becomes NaT during the conversion.
+            return pd.to_datetime(values).to_numpy()
+
+        if type_code == FieldType.TIME:
+            return pd.to_timedelta(values).to_numpy()
+
+        is_text = type_code in TEXT_TYPES or (type_code in BLOB_TYPES and not flags & FieldFlag.BINARY)
+        if is_text and self._may_be_categorical(values):
+            codes, categories = pd.factorize(values)
+            if len(categories) <= len(values) * self.categorical_max_ratio:
+                return pd.Categorical.from_codes(codes, categories)
+
+        # Copy so the column does not keep the whole row matrix alive.
+        return values.copy()
+
+    def _may_be_categorical(self, values):
+        """Cheap pre-check on a prefix of the column before hashing all of it."""
+        count = len(values)
+        if not self.categorical_max_ratio or count < self.categorical_min_rows:
+            return False
+        head = values[:CATEGORICAL_PROBE_ROWS]
+        return len(pd.unique(head)) <= len(head) * self.categorical_max_ratio
+
+
+def _to_object_matrix(rows, width):
+    """Turn a list of row tuples into a (rows x width) object array."""
+    if _rows_to_matrix is not None:
+        try:
+            return _rows_to_matrix(rows if isinstance(rows, list) else list(rows))
+        except (TypeError, ValueError):
+            pass
+    matrix = np.empty((len(rows), width), dtype=object)
+    for i, row in enumerate(rows):
+        matrix[i] = row
+    return matrix
+
+
+def decode_rows(rows, description, **options):
+    """
+    Convenience wrapper around ``ResultDecoder(**options).decode(rows, description)``.
+    """
+    return ResultDecoder(**options).decode(rows, description)
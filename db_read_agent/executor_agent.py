@@ -1,17 +1,72 @@
+import logging
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import ExitStack, contextmanager
 import pandas as pd
 import mysql.connector
-from db_read_agent.read_queries import sql_queries  
+from mysql.connector import errorcode
+from db_read_agent.read_queries import sql_queries, partition_queries, pagination_queries
+from db_read_agent.connection_pool import ConnectionPool, PoolTimeoutError
+from db_read_agent.result_cache import QueryResultCache
+from db_read_agent.decoder import ResultDecoder
+from exporter_agent.streaming import StreamingExporter
+from exporter_agent.columnar import COLUMNAR_FORMATS, write_columnar
+from standardize_agent.compaction import CompactionPolicy, compact
+from instrumentation.spans import frame_bytes, span
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_ROWS = 10000
+DEFAULT_PAGE_ROWS = 200
 
 class SQLAgent:
-    def __init__(self, config):
+    def __init__(self, config, pool=None, result_cache=None, decoder=None, compaction=None, replica=None):
         """
         Initialize the SQLAgent with connection config.
 
         :param config: Dictionary containing database connection details
+        :param pool: Optional ConnectionPool. When given, queries check connections out of
+                     the pool instead of connecting and disconnecting on every call.
+        :param result_cache: Optional QueryResultCache. When given, results of execute_task are
+                             cached by normalized SQL and identical queries are served from the
+                             cache (execute_sql results only when the cache has a ``sql_ttl``).
+        :param decoder: Optional ResultDecoder (or True for the default one). When given, result
+                        DataFrames are built column-wise with dtypes taken from the cursor
+                        description instead of from a list of row tuples.
+        :param compaction: Optional CompactionPolicy (or True for the default one). When given,
+                           results of execute_sql and execute_task are compacted right after the
+                           fetch (before they are cached); the last report is kept in
+                           ``last_compaction``. Chunked reads are never compacted, so that all
+                           chunks keep the same dtypes.
+        :param replica: Optional LocalReplica. When given, execute_task answers the simple
+                        templates on replicated tables from the local copy while it is fresh
+                        enough. Every task result names its ``source``: "replica", "cache" or
+                        "database".
         """
         self.config = config
         self.connection = None
+        self.pool = pool
+        self.result_cache = result_cache
+        self.decoder = ResultDecoder() if decoder is True else decoder
+        self.compaction = CompactionPolicy() if compaction is True else compaction
+        self.replica = replica
+        self.last_compaction = None
+
+    @classmethod
+    def pooled(cls, config, result_cache=None, decoder=None, compaction=None, replica=None, **pool_options):
+        """
+        Create a SQLAgent backed by a new ConnectionPool.
+
+        :param config: Dictionary containing database connection details
+        :param result_cache: Optional QueryResultCache, see ``__init__``.
+        :param decoder: Optional ResultDecoder, see ``__init__``.
+        :param compaction: Optional CompactionPolicy, see ``__init__``.
+        :param replica: Optional LocalReplica, see ``__init__``.
+        :param pool_options: Keyword arguments forwarded to ConnectionPool (max_size, timeout, ...).
+        :return: SQLAgent in pooled mode.
+        """
+        return cls(config, pool=ConnectionPool(config, **pool_options), result_cache=result_cache, decoder=decoder,
+                   compaction=compaction, replica=replica)
 
     def connect(self):
         """Establish a connection to the database."""
@@ -24,85 +79,517 @@ class SQLAgent:
             self.connection.close()
             self.connection = None
 
-    def execute_sql(self, query):
+    @contextmanager
+    def _connection(self):
+        """
+        Yield a connection for a single call: a pooled one in pooled mode, otherwise
+        the agent's own connection which is closed again afterwards.
+        """
+        if self.pool is not None:
+            with ExitStack() as stack:
+                with span("connect", pooled=True):
+                    connection = stack.enter_context(self.pool.connection())
+                yield connection
+        else:
+            try:
+                with span("connect", pooled=False):
+                    self.connect()
+                yield self.connection
+            finally:
+                self.disconnect()
+
+    def pool_stats(self):
+        """
+        Return the connection pool counters (hits, misses, wait time, ...).
+
+        :return: Dictionary of pool statistics, or None when the agent is not pooled.
+        """
+        return self.pool.stats() if self.pool is not None else None
+
+    def cache_stats(self):
+        """
+        Return the result cache counters (hits, misses, evictions, ...).
+
+        :return: Dictionary of cache statistics, or None when no result cache is configured.
+        """
+        return self.result_cache.stats() if self.result_cache is not None else None
+
+    def replica_stats(self):
+        """
+        Return the local replica counters and per-table freshness.
+
+        :return: Dictionary of replica statistics, or None when no replica is configured.
+        """
+        return self.replica.stats() if self.replica is not None else None
+
+    def refresh_replica(self, tables=None, full=False):
+        """
+        Refresh the local replica from the database, see ``LocalReplica.refresh``.
+
+        :return: Dictionary of per-table refresh reports.
+        """
+        if self.replica is None:
+            raise ValueError("No replica is configured.")
+        return self.replica.refresh(self, tables=tables, full=full)
+
+    def invalidate_table(self, table_name):
+        """
+        Drop cached results that read from the given table, e.g. after writing to it.
+
+        :param table_name: Name of the modified table.
+        :return: Number of cached results removed.
+        """
+        if self.result_cache is None:
+            return 0
+        return self.result_cache.invalidate_table(table_name)
+
+    def close(self):
+        """Release all database resources held by the agent."""
+        if self.pool is not None:
+            self.pool.close()
+        self.disconnect()
+
+    def execute_sql(self, query, session_variables=None):
         """
         Execute a SQL query and return the results as a pandas DataFrame.
 
         :param query: SQL query string to be executed.
+        :param session_variables: Optional dictionary of session variables set (``SET SESSION``) on
+                                  the connection right before the query and reset to their defaults
+                                  afterwards. Variables the server does not know (e.g. MySQL 8 ones
+                                  on MySQL 5.7 or MariaDB) are skipped. Such queries bypass the
+                                  result cache.
         :return: DataFrame containing the results of the query.
         """
         try:
-            self.connect()
-            with self.connection.cursor() as cursor:
-                cursor.execute(query)
-                rows = cursor.fetchall()
-                columns = [desc[0] for desc in cursor.description]
-            return pd.DataFrame(rows, columns=columns)
+            with span("sql") as sql_span:
+                df, _ = self._query(query, session_variables=session_variables)
+                sql_span.set(rows=len(df))
+            return df
+        except PoolTimeoutError:
+            # Raised as is, so that callers can tell an overloaded pool from a failed query.
+            raise
         except mysql.connector.Error as err:
             raise Exception(f"MySQL Error: {err}")
         except Exception as e:
             raise Exception(f"Error executing SQL query: {str(e)}")
-        finally:
-            self.disconnect()
+
+    def _fetch_dataframe(self, query, session_variables=None):
+        """Run a query on the database and build a DataFrame from all of its rows."""
+        with self._connection() as connection:
+            with connection.cursor() as cursor:
+                applied = self._set_session_variables(cursor, session_variables or {})
+                try:
+                    with span("execute"):
+                        cursor.execute(query)
+                    with span("fetch") as fetch_span:
+                        rows = cursor.fetchall()
+                        fetch_span.set(rows=len(rows))
+                    description = cursor.description
+                finally:
+                    # Pooled connections are reused; later queries must not run with these values.
+                    for name in applied:
+                        cursor.execute(f"SET SESSION {name} = DEFAULT")
+        with span("build") as build_span:
+            df = self._build_dataframe(rows, description)
+            if build_span.recording:
+                build_span.set(rows=len(df), bytes=frame_bytes(df))
+        return df
+
+    @staticmethod
+    def _set_session_variables(cursor, session_variables):
+        """
+        Set session variables on a cursor's connection, skipping those the server does not know.
+
+        :return: Names of the variables that were set.
+        """
+        applied = []
+        for name, value in session_variables.items():
+            try:
+                cursor.execute(f"SET SESSION {name} = %s", (value,))
+            except mysql.connector.Error as err:
+                if err.errno != errorcode.ER_UNKNOWN_SYSTEM_VARIABLE:
+                    raise
+                logger.debug("Server does not support session variable %s; running the query without it.", name)
+                continue
+            applied.append(name)
+        return applied
+
+    def _build_dataframe(self, rows, description, categorical=True):
+        """
+        Convert fetched rows into a DataFrame, column-wise and typed when a decoder is set.
+
+        :param categorical: Allow the decoder to produce categorical columns. Chunked reads turn
+                            this off so that every chunk gets the same dtypes.
+        """
+        if self.decoder is not None:
+            if categorical:
+                return self.decoder.decode(rows, description)
+            return ResultDecoder(categorical_max_ratio=0, decimal_as_float=self.decoder.decimal_as_float).decode(rows, description)
+        columns = [desc[0] for desc in description]
+        return pd.DataFrame(rows, columns=columns)
+
+    def _compact(self, df):
+        """Compact a fetched result when a compaction policy is configured."""
+        if self.compaction is None:
+            return df
+        with span("compact") as compact_span:
+            df, self.last_compaction = compact(df, self.compaction)
+            compact_span.set(rows=len(df), bytes=self.last_compaction["bytes_after"])
+        return df
+
+    def _fetch_result(self, query, session_variables=None):
+        """Fetch a query result for callers (as opposed to internal metadata queries)."""
+        return self._compact(self._fetch_dataframe(query, session_variables=session_variables))
+
+    def _query(self, query, operation=None, tables=None, session_variables=None):
+        """
+        Run a query through the result cache when one is configured.
+
+        :param session_variables: Session variables to set first; the result cache is bypassed then.
+        :return: Tuple (DataFrame, cache_hit). Cached results are returned as copies so
+                 callers can modify them freely.
+        """
+        if self.result_cache is None or session_variables:
+            return self._fetch_result(query, session_variables=session_variables), False
+        df, hit = self.result_cache.get_or_execute(query, self._fetch_result, operation=operation, tables=tables)
+        return df.copy(), hit
             
+    def iter_sql(self, query, chunk_rows=DEFAULT_CHUNK_ROWS):
+        """
+        Execute a SQL query and yield the results as DataFrame chunks.
+
+        Rows are streamed from the server through an unbuffered cursor and fetched
+        ``chunk_rows`` at a time, so peak memory depends on the chunk size rather than
+        on the size of the result set. The connection stays checked out until the
+        iterator is exhausted or closed; an iterator closed early discards its
+        connection because the remaining rows were never read.
+
+        :param query: SQL query string to be executed.
+        :param chunk_rows: Maximum number of rows per yielded DataFrame.
+        :return: Generator of DataFrames sharing the same columns.
+        """
+        if chunk_rows < 1:
+            raise ValueError("chunk_rows must be at least 1.")
+        try:
+            with self._connection() as connection:
+                cursor = connection.cursor(buffered=False)
+                try:
+                    cursor.execute(query)
+                    description = cursor.description
+                    while True:
+                        rows = cursor.fetchmany(chunk_rows)
+                        if not rows:
+                            break
+                        yield self._build_dataframe(rows, description, categorical=False)
+                finally:
+                    try:
+                        cursor.close()
+                    except Exception:
+                        # Closing an unbuffered cursor with unread rows raises; the
+                        # connection is discarded in that case anyway.
+                        pass
+        except mysql.connector.Error as err:
+            raise Exception(f"MySQL Error: {err}")
+
+    def iter_task(self, task, chunk_rows=DEFAULT_CHUNK_ROWS):
+        """
+        Execute a given task and yield its results as DataFrame chunks.
+
+        :param task: Dictionary containing the operation and its arguments.
+        :param chunk_rows: Maximum number of rows per yielded DataFrame.
+        :return: Generator of DataFrames, see ``iter_sql``.
+        """
+        query = self.generate_sql_query(task)
+        return self.iter_sql(query, chunk_rows=chunk_rows)
+
     def execute_task(self, task):
         """
         Execute a given task using the predefined SQL queries.
 
+        When tracing is enabled (see ``instrumentation.configure``), the task's stages are
+        recorded as spans and the result carries a one-line ``profile`` of them.
+
         :param task: Dictionary containing the operation and its arguments.
-        :return: Dataframe with the results of the query or an error message.
+        :return: Dataframe with the results of the query or an error message. Errors caused by
+                 an exhausted connection pool carry ``"error_type": "pool_timeout"``, errors in the
+                 task itself (unknown operation, missing arguments, unsupported export format)
+                 ``"error_type": "invalid_task"``.
         """
+        args = task.get("args", {})
+        with span("task", operation=task.get("operation"), table=args.get("table_name")) as task_span:
+            result = self._execute_task(task)
+            if result["status"] != "success":
+                task_span.fail(result["message"])
+            elif result.get("data") is not None and task_span.recording:
+                task_span.set(rows=len(result["data"]), bytes=frame_bytes(result["data"]))
+            elif "export_stats" in result:
+                task_span.set(rows=result["export_stats"]["rows"], bytes=result["export_stats"]["bytes"])
+        if task_span.recording:
+            result["profile"] = task_span.profile()
+        return result
+
+    def _execute_task(self, task):
         try:
             operation = task.get("operation")
             args = task.get("args", {})
 
-            query = self.generate_sql_query(task)
+            try:
+                with span("sql_generate"):
+                    query = self.generate_sql_query(task)
+            except (ValueError, KeyError, IndexError) as e:
+                return {"status": "error", "message": str(e), "error_type": "invalid_task"}
 
             if not query:
-                return {"status": "error", "message": f"Unknown operation '{operation}'"}
-
+                return {"status": "error", "message": f"Unknown operation '{operation}'", "error_type": "invalid_task"}
 
-            # Connect to the database
-            self.connect()
+            if args.get("export_data") and args.get("stream_export"):
+                return self.stream_export(query, args)
 
-            with self.connection.cursor() as cursor:
-                cursor.execute(query)
-                rows = cursor.fetchall()
-                columns = [desc[0] for desc in cursor.description]
-
-            # Convert query result to a pandas DataFrame
-            df = pd.DataFrame(rows, columns=columns)
+            # Run the query (or reuse a cached result) and get a pandas DataFrame
+            table_name = args.get("table_name")
+            if operation == "select_with_condition" and int(args.get("partitions", 1)) > 1:
+                df = self.read_partitioned(
+                    table_name,
+                    partitions=int(args["partitions"]),
+                    partition_column=args.get("partition_column"),
+                    condition=args.get("condition", "1=1"),
+                    ordered=args.get("ordered", True),
+                )
+                df = self._compact(df)
+                cache_hit, source = False, "database"
+            else:
+                df = self.replica.query(query, table_name, operation) if self.replica is not None else None
+                if df is not None:
+                    df, cache_hit, source = self._compact(df), False, "replica"
+                else:
+                    df, cache_hit = self._query(query, operation=operation,
+                                                tables=[table_name] if table_name else None)
+                    source = "cache" if cache_hit else "database"
 
             # Handle data export if required
             if args.get("export_data"):
                 export_path = args.get("export_path")
                 export_format = args.get("export_format", "csv").lower()
+                if not self.export_dataframe(df, args):
+                    return {"status": "error", "message": f"Unsupported export format '{export_format}'",
+                            "error_type": "invalid_task"}
 
-                os.makedirs(os.path.dirname(export_path), exist_ok=True)
-
-                if export_format == "csv":
-                    df.to_csv(export_path, index=False)
-                elif export_format in ["xlsx", "excel"]:
-                    df.to_excel(export_path, index=False)
-                elif export_format == "json":
-                    df.to_json(export_path, orient='records', lines=True)
-                elif export_format == "html":
-                    df.to_html(export_path, index=False)
-                else:
-                    return {"status": "error", "message": f"Unsupported export format '{export_format}'"}
-
-                return {"status": "success", "query": query, "message": f"Data exported to {export_path}", "data": df}
+                return {"status": "success", "query": query, "message": f"Data exported to {export_path}", "data": df,
+                        "cache_hit": cache_hit, "source": source}
 
-            return {"status": "success", "query": query, "data": df, "message": "Query executed successfully"}
+            return {"status": "success", "query": query, "data": df, "message": "Query executed successfully",
+                    "cache_hit": cache_hit, "source": source}
 
+        except PoolTimeoutError as e:
+            return {"status": "error", "message": str(e), "error_type": "pool_timeout"}
         except mysql.connector.Error as err:
             return {"status": "error", "message": f"MySQL Error: {err}"}
         except Exception as e:
             return {"status": "error", "message": str(e)}
-        finally:
-            self.disconnect()
 
 
+    def export_dataframe(self, df, args):
+        """
+        Write a query result to the export target described by task arguments.
+
+        :param df: DataFrame to export.
+        :param args: Task arguments (export_path, export_format and, for the columnar formats,
+                     compression and row_group_size).
+        :return: False if the export format is not supported, True otherwise.
+        """
+        export_path = args.get("export_path")
+        export_format = args.get("export_format", "csv").lower()
+
+        os.makedirs(os.path.dirname(export_path), exist_ok=True)
+
+        with span("export", format=export_format) as export_span:
+            supported = self._write_export(df, export_path, export_format, args)
+            if supported and export_span.recording:
+                export_span.set(rows=len(df), bytes=os.path.getsize(export_path))
+        return supported
+
+    @staticmethod
+    def _write_export(df, export_path, export_format, args):
+        if export_format == "csv":
+            df.to_csv(export_path, index=False)
+        elif export_format in ["xlsx", "excel"]:
+            df.to_excel(export_path, index=False)
+        elif export_format == "json":
+            df.to_json(export_path, orient='records', lines=True)
+        elif export_format == "html":
+            df.to_html(export_path, index=False)
+        elif export_format in COLUMNAR_FORMATS:
+            write_columnar(df, export_path, export_format, compression=args.get("compression", "zstd"),
+                           row_group_size=args.get("row_group_size"))
+        else:
+            return False
+        return True
+
+    def find_partition_column(self, table_name):
+        """
+        Find an indexed integer column to split a table on, preferring the primary key.
+
+        :param table_name: Name of the table.
+        :return: Column name, or None if the table has no suitable index.
+        """
+        query = partition_queries["integer_index_columns"].format(table_name=table_name.replace("'", "''"))
+        columns = self._fetch_dataframe(query)
+        return columns.iat[0, 0] if not columns.empty else None
+
+    @staticmethod
+    def split_key_range(low, high, partitions):
+        """
+        Split the inclusive integer range [low, high] into at most ``partitions`` contiguous ranges.
+
+        :return: List of (low, high) tuples in ascending order.
+        """
+        low, high = int(low), int(high)
+        step = max(1, -(-(high - low + 1) // partitions))  # ceiling division
+        return [(start, min(start + step - 1, high)) for start in range(low, high + 1, step)]
+
+    def read_partitioned(self, table_name, partitions=4, partition_column=None, condition="1=1", ordered=True):
+        """
+        Read a (filtered) table with several concurrent range queries, one per connection.
+
+        The table is split into ``partitions`` key ranges on its primary key or another
+        indexed integer column. Each range is fetched on its own connection (pooled
+        connections in pooled mode) and the pieces are concatenated, either in key order
+        or in completion order when ``ordered`` is False.
+
+        :param table_name: Name of the table to read.
+        :param partitions: Number of key ranges fetched concurrently.
+        :param partition_column: Integer column to partition on; discovered when omitted.
+        :param condition: SQL condition applied to every range.
+        :param ordered: Return rows sorted by the partition column (NULL keys first, as in MySQL).
+        :return: DataFrame with all matching rows.
+        """
+        column = partition_column or self.find_partition_column(table_name)
+        if column is None:
+            raise ValueError(f"Table '{table_name}' has no indexed integer column to partition on.")
+
+        bounds_query = partition_queries["column_bounds"].format(table_name=table_name, column=column, condition=condition)
+        low, high = self._fetch_dataframe(bounds_query).iloc[0].tolist()
+
+        order_clause = f"ORDER BY {column}" if ordered else ""
+        queries = [partition_queries["null_keys"].format(table_name=table_name, column=column, condition=condition)]
+        if not pd.isna(low):
+            queries += [
+                partition_queries["key_range"].format(
+                    table_name=table_name, column=column, condition=condition,
+                    low=start, high=end, order_clause=order_clause,
+                )
+                for start, end in self.split_key_range(low, high, partitions)
+            ]
+
+        with ThreadPoolExecutor(max_workers=min(partitions, len(queries)), thread_name_prefix="partition") as executor:
+            futures = [executor.submit(self._fetch_on_own_connection, query) for query in queries]
+            pieces = [f.result() for f in futures] if ordered else [f.result() for f in as_completed(futures)]
+
+        pieces = [piece for piece in pieces if not piece.empty] or pieces[:1]
+        return pd.concat(pieces, ignore_index=True)
+
+    def _fetch_on_own_connection(self, query):
+        """
+        Run a query on a connection that is not shared with other threads: a pooled one
+        in pooled mode, otherwise a short-lived connection of a helper agent.
+        """
+        if self.pool is not None:
+            return self._fetch_dataframe(query)
+        return SQLAgent(self.config, decoder=self.decoder)._fetch_dataframe(query)
+
+    def find_key_column(self, table_name):
+        """
+        Find a single-column unique integer key to paginate a table on, preferring the primary key.
+
+        :param table_name: Name of the table.
+        :return: Column name, or None if the table has no such key.
+        """
+        query = pagination_queries["unique_integer_key"].format(table_name=table_name.replace("'", "''"))
+        columns = self._fetch_on_own_connection(query)
+        return columns.iat[0, 0] if not columns.empty else None
+
+    def count_rows(self, table_name, condition="1=1"):
+        """
+        Count the rows of a table matching a condition.
+
+        :return: Number of rows.
+        """
+        query = pagination_queries["count_rows"].format(table_name=table_name, condition=condition)
+        return int(self._fetch_on_own_connection(query).iat[0, 0])
+
+    def fetch_page(self, table_name, key_column, after=None, limit=DEFAULT_PAGE_ROWS, condition="1=1"):
+        """
+        Fetch one page of a table with keyset pagination: rows are ordered by a unique key and
+        a page starts right after the last key of the previous one, so the server seeks on
+        the index instead of scanning and discarding ``OFFSET`` rows. Rows with a NULL key
+        are not part of any page.
+
+        Safe to call from several threads: every call uses its own connection.
+
+        :param table_name: Name of the table.
+        :param key_column: Unique integer column to order and seek on (see ``find_key_column``).
+        :param after: Last key of the previous page, or None for the first page.
+        :param limit: Maximum number of rows in the page.
+        :param condition: SQL condition applied to every page.
+        :return: DataFrame with up to ``limit`` rows in key order.
+        """
+        if after is None:
+            query = pagination_queries["first_page"].format(table_name=table_name, key=key_column,
+                                                            condition=condition, limit=int(limit))
+        else:
+            query = pagination_queries["page_after"].format(table_name=table_name, key=key_column, condition=condition,
+                                                            after=int(after), limit=int(limit))
+        return self._fetch_on_own_connection(query)
+
+    def key_at_offset(self, table_name, key_column, offset, condition="1=1"):
+        """
+        Return the key of the row at a position in key order, to start a page in the middle
+        of a table without reading the pages before it. The query only reads the key index.
+
+        :return: Key value, or None when ``offset`` is past the end.
+        """
+        query = pagination_queries["key_at_offset"].format(table_name=table_name, key=key_column,
+                                                           condition=condition, offset=int(offset))
+        keys = self._fetch_on_own_connection(query)
+        return keys.iat[0, 0] if not keys.empty else None
+
+    def stream_export(self, query, args):
+        """
+        Stream the results of a query straight into an export file.
+
+        Rows are pulled from the cursor in batches of ``args["chunk_rows"]`` and appended
+        to a temporary file that is renamed to ``export_path`` once the export is done,
+        so memory use does not grow with the size of the result set. Supported formats
+        are csv, json (JSON lines), txt, html, parquet, feather and arrow.
+
+        :param query: SQL query string to be executed.
+        :param args: Task arguments (export_path, export_format, chunk_rows and, for the
+                     columnar formats, compression and row_group_size).
+        :return: Result dictionary with the export statistics; no DataFrame is returned.
+        """
+        export_path = args.get("export_path")
+        export_format = args.get("export_format", "csv").lower()
+        chunk_rows = int(args.get("chunk_rows", DEFAULT_CHUNK_ROWS))
+
+        if export_format not in StreamingExporter.SUPPORTED_FORMATS:
+            return {"status": "error", "message": f"Unsupported streaming export format '{export_format}'"}
+
+        exporter = StreamingExporter(export_path, export_format, compression=args.get("compression", "zstd"),
+                                     row_group_size=args.get("row_group_size"))
+        with span("export", format=export_format, streaming=True) as export_span:
+            stats = exporter.export(self.iter_sql(query, chunk_rows=chunk_rows))
+            export_span.set(rows=stats["rows"], bytes=stats["bytes"])
+        logger.info("Exported %d rows (%d bytes) to %s in %.2fs (%.0f rows/sec)", stats["rows"], stats["bytes"],
+                    export_path, stats["seconds"], stats["rows_per_sec"])
+        return {
+            "status": "success",
+            "query": query,
+            "message": f"Data exported to {export_path}",
+            "export_stats": stats,
+            "source": "database",
+        }
+
     def generate_sql_query(self, args):
         """
         Generate a SQL query dynamically based on the operation and its arguments.
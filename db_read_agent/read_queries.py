@@ -17,3 +17,57 @@ sql_queries = {
         {limit_clause};
     """
 }
+
+
+# queries used internally to plan partitioned reads
+
+partition_queries = {
+    # indexed integer columns of a table, primary key first
+    "integer_index_columns": """
+        SELECT s.COLUMN_NAME
+        FROM information_schema.STATISTICS s
+        JOIN information_schema.COLUMNS c
+          ON c.TABLE_SCHEMA = s.TABLE_SCHEMA
+         AND c.TABLE_NAME = s.TABLE_NAME
+         AND c.COLUMN_NAME = s.COLUMN_NAME
+        WHERE s.TABLE_SCHEMA = DATABASE()
+          AND s.TABLE_NAME = '{table_name}'
+          AND s.SEQ_IN_INDEX = 1
+          AND c.DATA_TYPE IN ('tinyint', 'smallint', 'mediumint', 'int', 'bigint')
+        ORDER BY s.INDEX_NAME = 'PRIMARY' DESC, s.NON_UNIQUE ASC, s.INDEX_NAME;
+    """,
+    "column_bounds": "SELECT MIN({column}), MAX({column}) FROM {table_name} WHERE {condition};",
+    "key_range": "SELECT * FROM {table_name} WHERE ({condition}) AND {column} BETWEEN {low} AND {high} {order_clause};",
+    "null_keys": "SELECT * FROM {table_name} WHERE ({condition}) AND {column} IS NULL;",
+}
+
+
+# queries used for keyset pagination (ORDER BY a unique key, seek past the last key seen)
+
+pagination_queries = {
+    # single-column unique integer keys of a table, primary key first
+    "unique_integer_key": """
+        SELECT s.COLUMN_NAME
+        FROM information_schema.STATISTICS s
+        JOIN information_schema.COLUMNS c
+          ON c.TABLE_SCHEMA = s.TABLE_SCHEMA
+         AND c.TABLE_NAME = s.TABLE_NAME
+         AND c.COLUMN_NAME = s.COLUMN_NAME
+        WHERE s.TABLE_SCHEMA = DATABASE()
+          AND s.TABLE_NAME = '{table_name}'
+          AND s.NON_UNIQUE = 0
+          AND c.DATA_TYPE IN ('tinyint', 'smallint', 'mediumint', 'int', 'bigint')
+          AND s.INDEX_NAME IN (
+              SELECT INDEX_NAME FROM information_schema.STATISTICS
+              WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = '{table_name}'
+              GROUP BY INDEX_NAME HAVING COUNT(*) = 1
+          )
+        ORDER BY s.INDEX_NAME = 'PRIMARY' DESC, s.INDEX_NAME;
+    """,
+    "count_rows": "SELECT COUNT(*) FROM {table_name} WHERE {condition};",
+    "first_page": "SELECT * FROM {table_name} WHERE ({condition}) AND {key} IS NOT NULL ORDER BY {key} LIMIT {limit};",
+    "page_after": "SELECT * FROM {table_name} WHERE ({condition}) AND {key} > {after} ORDER BY {key} LIMIT {limit};",
+    # index-only seek to the key at a row offset, used to jump into the middle of a table
+    "key_at_offset": "SELECT {key} FROM {table_name} WHERE ({condition}) AND {key} IS NOT NULL "
+                     "ORDER BY {key} LIMIT 1 OFFSET {offset};",
+}
@@ -0,0 +1,457 @@
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import date, datetime
+from decimal import Decimal
+
+import pandas as pd
+
+from db_read_agent.result_cache import tables_in_query
+from instrumentation.spans import frame_bytes, span
+
+logger = logging.getLogger(__name__)
+
+# Task operations the replica answers; the others (DESCRIBE, SHOW TABLES) describe the source itself.
+REPLICA_OPERATIONS = ("select_all", "count_records", "select_with_condition", "group_by_count")
+DEFAULT_MAX_STALENESS = 300.0
+DEFAULT_REFRESH_CHUNK_ROWS = 50000
+STATE_TABLE = "_replica_tables"
+# Column kinds SQLite compares, groups and sorts like MySQL; text (case-insensitive collation in
+# MySQL), DECIMAL (stored as exact text), datetimes (stored as text) and binary columns are not.
+NUMERIC_KINDS = ("integer", "real")
+# String literals, pattern matching, collations and division (integer division in SQLite).
+_UNSAFE_CLAUSE = re.compile(r"['\"/]|\b(?:LIKE|REGEXP|RLIKE|COLLATE|BINARY|DIV)\b", re.IGNORECASE)
+_IDENTIFIER = re.compile(r"[A-Za-z_][A-Za-z0-9_$]*")
+
+
+def _quote(name):
+    """Quote an identifier with backticks (understood by both MySQL and SQLite)."""
+    return "`" + str(name).replace("`", "``") + "`"
+
+
+def _literal(value):
+    """Render a watermark as a SQL literal."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return repr(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _sqlite_value(value):
+    if value is None or value is pd.NaT or (isinstance(value, float) and value != value):
+        return None
+    if isinstance(value, (datetime, date)):
+        return str(value)
+    if isinstance(value, Decimal):
+        # Exact: a REAL would round, and MySQL returns DECIMAL values unrounded.
+        return str(value)
+    if isinstance(value, bytes):
+        return value
+    if hasattr(value, "item"):
+        return value.item()
+    return value if isinstance(value, (int, float, str)) else str(value)
+
+
+def _watermark_value(value):
+    """Watermarks are compared in Python, so DECIMAL keys stay numbers."""
+    return float(value) if isinstance(value, Decimal) else _sqlite_value(value)
+
+
+def _column_type(series):
+    """SQLite type of a column and its kind: integer, real, decimal, datetime, text or blob."""
+    if pd.api.types.is_bool_dtype(series) or pd.api.types.is_integer_dtype(series):
+        return "INTEGER", "integer"
+    if pd.api.types.is_float_dtype(series):
+        return "REAL", "real"
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return "TEXT", "datetime"
+    sample = series.dropna()
+    value = sample.iloc[0] if len(sample) else None
+    if isinstance(value, (datetime, date)):
+        return "TEXT", "datetime"
+    if isinstance(value, bool) or isinstance(value, int):
+        return "INTEGER", "integer"
+    if isinstance(value, float):
+        return "REAL", "real"
+    if isinstance(value, Decimal):
+        return "TEXT", "decimal"
+    return ("BLOB", "blob") if isinstance(value, bytes) else ("TEXT", "text")
+
+
+def _routable(query, table_name, kinds):
+    """
+    Whether SQLite answers a template query as MySQL does: whatever follows the table name
+    (condition, grouping, ordering) may only refer to numerical columns, without string
+    literals, pattern matching, collations or division.
+
+    :param kinds: Column kinds of the local table, or None when they are unknown.
+    """
+    match = re.search(rf"\bFROM\s+`?{re.escape(table_name)}`?(.*)$", query, re.IGNORECASE | re.DOTALL)
+    clause = match.group(1) if match else query
+    if _UNSAFE_CLAUSE.search(clause):
+        return False
+    identifiers = {token.lower() for token in _IDENTIFIER.findall(clause)}
+    if kinds is None:
+        return not identifiers - {"limit"}
+    other = {name.lower() for name, kind in kinds.items() if kind not in NUMERIC_KINDS}
+    return not identifiers & other
+
+
+def _frame_rows(df):
+    """Rows of a DataFrame as tuples of values SQLite can store."""
+    columns = []
+    for name in df.columns:
+        column = df[name]
+        if pd.api.types.is_datetime64_any_dtype(column):
+            column = column.dt.strftime("%Y-%m-%d %H:%M:%S")
+        columns.append([_sqlite_value(value) for value in column.astype(object).tolist()])
+    return list(zip(*columns))
+
+
+class LocalReplica:
+    """
+    Local copies of selected (hot) tables in an embedded SQLite file, used to answer simple
+    task templates without a round trip to the MySQL server.
+
+    Only queries SQLite answers the same way are routed to the replica. Strings compare
+    case-sensitively in SQLite but not under MySQL's default collation, DECIMAL values are kept
+    as exact text and datetimes as text, so conditions, grouping and ordering on such columns,
+    string literals, LIKE and division always go to the source. Whole-table reads and counts,
+    and conditions on integer and floating-point columns, are answered locally; DECIMAL and
+    datetime values are converted back when they are read.
+
+    Every replicated table has a refresh policy:
+
+    - ``key``: an increasing primary key; refreshes only fetch rows with a larger key
+      (append-only tables).
+    - ``updated_at``: a last-modified column (requires ``key``); refreshes fetch rows changed
+      since the last watermark and upsert them by key.
+    - neither: every refresh re-reads the whole table.
+
+    Incremental refreshes do not see deleted rows; ``refresh(full=True)`` re-reads tables
+    completely. Full refreshes are written to a new table that replaces the old one in a
+    single transaction, so readers see either the old or the new snapshot.
+
+    ``max_staleness`` bounds (per table, in seconds) how old a snapshot may be to answer a
+    query; older snapshots, unknown tables and queries SQLite cannot run (or might answer
+    differently) are left to the source.
+    Table policies and watermarks are stored in the file itself, so a replica can be reopened
+    with ``LocalReplica(path)``.
+
+    :param path: SQLite file of the replica (created if needed).
+    :param tables: Tables to replicate: a list of names or a dictionary mapping names to
+                   policies (``key``, ``updated_at``, ``max_staleness``). Added to the tables
+                   already stored in the file.
+    :param default_max_staleness: Staleness bound of tables without their own (None: no bound).
+    :param chunk_rows: Rows fetched from the source per chunk while refreshing.
+    """
+
+    def __init__(self, path, tables=None, default_max_staleness=DEFAULT_MAX_STALENESS,
+                 chunk_rows=DEFAULT_REFRESH_CHUNK_ROWS):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.default_max_staleness = default_max_staleness
+        self.chunk_rows = chunk_rows
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._stats = {"hits": 0, "stale": 0, "unavailable": 0, "unsupported": 0, "errors": 0, "refreshes": 0,
+                       "refreshed_rows": 0}
+        self._refresher = None
+        self._stop = threading.Event()
+
+        writer = self._connection()
+        writer.execute("PRAGMA journal_mode=WAL")
+        writer.execute(f"CREATE TABLE IF NOT EXISTS {STATE_TABLE} (table_name TEXT PRIMARY KEY, policy TEXT, "
+                       "watermark TEXT, datetime_columns TEXT, refreshed_at REAL, rows INTEGER, column_kinds TEXT)")
+        if "column_kinds" not in {row[1] for row in writer.execute(f"PRAGMA table_info({STATE_TABLE})")}:
+            # Replica files from before column kinds were recorded; filled in by the next full refresh.
+            writer.execute(f"ALTER TABLE {STATE_TABLE} ADD COLUMN column_kinds TEXT")
+        if isinstance(tables, dict):
+            for name, policy in tables.items():
+                self.add_table(name, **(policy or {}))
+        else:
+            for name in tables or []:
+                self.add_table(name)
+
+    def _connection(self):
+        """SQLite connection of the calling thread (autocommit; writes use explicit transactions)."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def _state(self, table_name):
+        row = self._connection().execute(
+            f"SELECT policy, watermark, datetime_columns, refreshed_at, rows, column_kinds FROM {STATE_TABLE} "
+            "WHERE table_name = ?", (table_name,)).fetchone()
+        if row is None:
+            return None
+        policy, watermark, datetime_columns, refreshed_at, rows, column_kinds = row
+        return {"policy": json.loads(policy), "watermark": json.loads(watermark) if watermark else None,
+                "datetime_columns": json.loads(datetime_columns or "[]"), "refreshed_at": refreshed_at, "rows": rows,
+                "column_kinds": json.loads(column_kinds) if column_kinds else None}
+
+    def add_table(self, table_name, key=None, updated_at=None, max_staleness=None):
+        """
+        Replicate a table (or change its policy). The data is fetched by the next ``refresh``.
+
+        :param key: Increasing primary key column, for incremental refreshes.
+        :param updated_at: Last-modified column for incremental refreshes of changing rows;
+                           requires ``key`` to upsert by.
+        :param max_staleness: Seconds a snapshot may be old to answer queries (None: the default).
+        """
+        if updated_at and not key:
+            raise ValueError(f"Table '{table_name}': an updated_at watermark requires a key column to upsert by.")
+        policy = {"key": key, "updated_at": updated_at, "max_staleness": max_staleness}
+        with self._write_lock:
+            state = self._state(table_name)
+            connection = self._connection()
+            if state is None:
+                connection.execute(f"INSERT INTO {STATE_TABLE} (table_name, policy) VALUES (?, ?)",
+                                   (table_name, json.dumps(policy)))
+            elif state["policy"] != policy:
+                # A different watermark column makes the stored watermark meaningless.
+                reset = (state["policy"]["key"], state["policy"]["updated_at"]) != (key, updated_at)
+                connection.execute(f"UPDATE {STATE_TABLE} SET policy = ?{', watermark = NULL' if reset else ''} "
+                                   "WHERE table_name = ?", (json.dumps(policy), table_name))
+
+    def tables(self):
+        """Names of the replicated tables."""
+        return [row[0] for row in self._connection().execute(f"SELECT table_name FROM {STATE_TABLE} ORDER BY 1")]
+
+    def max_staleness(self, table_name):
+        state = self._state(table_name)
+        if state is None:
+            return None
+        bound = state["policy"]["max_staleness"]
+        return bound if bound is not None else self.default_max_staleness
+
+    def staleness(self, table_name):
+        """Seconds since the table's snapshot was taken, or None if it was never refreshed."""
+        state = self._state(table_name)
+        if state is None or state["refreshed_at"] is None:
+            return None
+        return time.time() - state["refreshed_at"]
+
+    def refresh(self, agent, tables=None, full=False):
+        """
+        Bring snapshots up to date from the source database.
+
+        :param agent: SQLAgent reading from the source (rows are streamed with ``iter_sql``).
+        :param tables: Tables to refresh (default: all replicated tables).
+        :param full: Re-read the tables completely instead of incrementally.
+        :return: Dictionary mapping table names to refresh reports ("mode", "rows", "seconds",
+                 "watermark") or to {"status": "error", "message": ...}.
+        """
+        reports = {}
+        for table_name in tables or self.tables():
+            try:
+                reports[table_name] = self._refresh_table(agent, table_name, full)
+            except Exception as e:
+                logger.error("Refreshing the replica of %s failed: %s", table_name, e)
+                reports[table_name] = {"status": "error", "message": str(e)}
+        return reports
+
+    def refresh_due(self, agent, fraction=0.5):
+        """
+        Refresh the tables whose snapshot is older than ``fraction`` of their staleness bound,
+        so that they are renewed before they stop answering queries.
+        """
+        due = []
+        for table_name in self.tables():
+            age, bound = self.staleness(table_name), self.max_staleness(table_name)
+            if age is None or (bound is not None and age >= bound * fraction):
+                due.append(table_name)
+        return self.refresh(agent, due) if due else {}
+
+    def _refresh_table(self, agent, table_name, full):
+        state = self._state(table_name)
+        if state is None:
+            raise ValueError(f"Table '{table_name}' is not replicated.")
+        policy = state["policy"]
+        watermark_column = policy["updated_at"] or policy["key"]
+        incremental = not full and watermark_column and state["refreshed_at"] is not None
+        started, wall_started = time.perf_counter(), time.time()
+
+        if incremental and state["watermark"] is not None:
+            # >= on updated_at: rows changed within the watermark's second may have been missed.
+            operator = ">=" if policy["updated_at"] else ">"
+            query = (f"SELECT * FROM {_quote(table_name)} "
+                     f"WHERE {_quote(watermark_column)} {operator} {_literal(state['watermark'])}")
+        else:
+            query = f"SELECT * FROM {_quote(table_name)}"
+        target = table_name if incremental else f"{table_name}__replica_new"
+        verb = "INSERT OR REPLACE" if policy["key"] else "INSERT"
+
+        with span("replica_refresh", table=table_name, incremental=bool(incremental)) as refresh_span, \
+                self._write_lock:
+            connection = self._connection()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                if not incremental:
+                    connection.execute(f"DROP TABLE IF EXISTS {_quote(target)}")
+                kinds = state["column_kinds"] if incremental else None
+                watermark, rows, created = state["watermark"], 0, bool(incremental)
+                for chunk in agent.iter_sql(query, chunk_rows=self.chunk_rows):
+                    if not created:
+                        kinds = self._create_table(connection, target, chunk, policy["key"])
+                        created = True
+                    placeholders = ", ".join("?" * len(chunk.columns))
+                    connection.executemany(f"{verb} INTO {_quote(target)} ({', '.join(map(_quote, chunk.columns))}) "
+                                           f"VALUES ({placeholders})", _frame_rows(chunk))
+                    rows += len(chunk)
+                    if watermark_column:
+                        chunk_max = _watermark_value(chunk[watermark_column].max())
+                        if chunk_max is not None and (watermark is None or chunk_max > watermark):
+                            watermark = chunk_max
+                if not created:
+                    # Empty source table: take the columns from an empty result.
+                    empty = agent.execute_sql(f"SELECT * FROM {_quote(table_name)} LIMIT 0")
+                    kinds = self._create_table(connection, target, empty, policy["key"])
+                if not incremental:
+                    connection.execute(f"DROP TABLE IF EXISTS {_quote(table_name)}")
+                    connection.execute(f"ALTER TABLE {_quote(target)} RENAME TO {_quote(table_name)}")
+                total = connection.execute(f"SELECT COUNT(*) FROM {_quote(table_name)}").fetchone()[0]
+                datetime_columns = (sorted(name for name, kind in kinds.items() if kind == "datetime")
+                                    if kinds is not None else state["datetime_columns"])
+                connection.execute(
+                    f"UPDATE {STATE_TABLE} SET watermark = ?, datetime_columns = ?, refreshed_at = ?, rows = ?, "
+                    "column_kinds = ? WHERE table_name = ?",
+                    (json.dumps(watermark) if watermark is not None else None, json.dumps(datetime_columns),
+                     wall_started, total, json.dumps(kinds) if kinds is not None else None, table_name))
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            refresh_span.set(rows=rows)
+
+        seconds = time.perf_counter() - started
+        with self._lock:
+            self._stats["refreshes"] += 1
+            self._stats["refreshed_rows"] += rows
+        mode = "incremental" if incremental else "full"
+        logger.info("Replica of %s refreshed (%s): %d rows fetched, %d rows total in %.2fs", table_name, mode, rows,
+                    total, seconds)
+        return {"status": "success", "mode": mode, "rows": rows, "total_rows": total, "seconds": seconds,
+                "watermark": watermark}
+
+    @staticmethod
+    def _create_table(connection, table_name, df, key):
+        """Create the local table for a source result; returns the kind of each column (see ``_column_type``)."""
+        definitions, kinds = [], {}
+        for name in df.columns:
+            column_type, kinds[name] = _column_type(df[name])
+            definitions.append(f"{_quote(name)} {column_type}")
+        if key:
+            definitions.append(f"PRIMARY KEY ({_quote(key)})")
+        connection.execute(f"CREATE TABLE {_quote(table_name)} ({', '.join(definitions)})")
+        return kinds
+
+    def query(self, query, table_name, operation=None):
+        """
+        Answer a task query from the replica when it can.
+
+        :param query: SQL generated from a ``sql_queries`` template.
+        :param table_name: Table the task reads.
+        :param operation: Task operation; only ``REPLICA_OPERATIONS`` are answered.
+        :return: DataFrame, or None when the query has to go to the source (the operation or
+                 table is not replicated, the snapshot is too old, or SQLite cannot run the query
+                 or might answer it differently, see the class description).
+        """
+        if operation not in REPLICA_OPERATIONS or not table_name:
+            return None
+        state = self._state(table_name)
+        if state is None or state["refreshed_at"] is None or tables_in_query(query) - {table_name.lower()}:
+            self._count("unavailable")
+            return None
+        bound = state["policy"]["max_staleness"]
+        bound = bound if bound is not None else self.default_max_staleness
+        if bound is not None and time.time() - state["refreshed_at"] > bound:
+            self._count("stale")
+            return None
+        if not _routable(query, table_name, state["column_kinds"]):
+            self._count("unsupported")
+            return None
+        try:
+            with span("replica", table=table_name) as replica_span:
+                cursor = self._connection().execute(query)
+                df = pd.DataFrame(cursor.fetchall(), columns=[column[0] for column in cursor.description])
+                for name in state["datetime_columns"]:
+                    if name in df.columns:
+                        df[name] = pd.to_datetime(df[name], errors="coerce")
+                for name, kind in (state["column_kinds"] or {}).items():
+                    if kind == "decimal" and name in df.columns:
+                        df[name] = df[name].map(lambda value: None if value is None else Decimal(value))
+                if replica_span.recording:
+                    replica_span.set(rows=len(df), bytes=frame_bytes(df))
+        except sqlite3.Error as e:
+            # E.g. MySQL-only functions in a condition: let the source answer.
+            logger.debug("Replica cannot answer %r: %s", query, e)
+            self._count("errors")
+            return None
+        self._count("hits")
+        return df
+
+    def _count(self, counter):
+        with self._lock:
+            self._stats[counter] += 1
+
+    def start_refresher(self, agent, interval=30.0, fraction=0.5):
+        """
+        Refresh due tables (see ``refresh_due``) on a background thread every ``interval`` seconds.
+        """
+        if self._refresher is not None:
+            return
+        self._stop.clear()
+
+        def refresh_loop():
+            while not self._stop.is_set():
+                try:
+                    self.refresh_due(agent, fraction)
+                except Exception as e:
+                    logger.error("Replica refresh failed: %s", e)
+                self._stop.wait(interval)
+
+        self._refresher = threading.Thread(target=refresh_loop, name="replica-refresher", daemon=True)
+        self._refresher.start()
+
+    def stop_refresher(self):
+        if self._refresher is not None:
+            self._stop.set()
+            self._refresher.join()
+            self._refresher = None
+
+    def stats(self):
+        """
+        Return the replica counters (hits, stale, unavailable, unsupported, errors, refreshes) and, per table,
+        its row count, watermark, staleness, bound and whether it is fresh enough to answer.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        tables = {}
+        for table_name in self.tables():
+            state, age, bound = self._state(table_name), self.staleness(table_name), self.max_staleness(table_name)
+            tables[table_name] = {"rows": state["rows"], "watermark": state["watermark"], "staleness": age,
+                                  "max_staleness": bound, "policy": state["policy"],
+                                  "fresh": age is not None and (bound is None or age <= bound)}
+        stats["tables"] = tables
+        return stats
+
+    def close(self):
+        """Stop the refresher and close the SQLite connections."""
+        self.stop_refresher()
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            connection.close()
+        self._local = threading.local()
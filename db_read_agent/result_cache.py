@@ -0,0 +1,241 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+
+# Task operations that describe the schema rather than read data; not cached unless configured.
+METADATA_OPERATIONS = ("describe_table", "list_tables", "show_tables")
+
+_TABLE_PATTERN = re.compile(r"\b(?:FROM|JOIN|UPDATE|INTO|TABLE)\s+`?([\w$]+)`?(?:\s*\.\s*`?([\w$]+)`?)?", re.IGNORECASE)
+
+
+def normalize_sql(query):
+    """
+    Normalize a SQL string for use as a cache key: collapse whitespace and drop the
+    trailing semicolon, so differently formatted copies of a query share one entry.
+    """
+    return re.sub(r"\s+", " ", query).strip().rstrip(";").strip()
+
+
+def tables_in_query(query):
+    """
+    Best-effort extraction of the table names referenced by a query.
+
+    :return: Set of lower-cased table names (without schema prefix).
+    """
+    tables = set()
+    for first, second in _TABLE_PATTERN.findall(query):
+        tables.add((second or first).lower())
+    return tables
+
+
+class _Entry:
+    def __init__(self, data, size, expires_at, tables):
+        self.data = data
+        self.size = size
+        self.expires_at = expires_at
+        self.tables = tables
+
+
+class _Flight:
+    """A query execution that concurrent callers for the same key wait on."""
+
+    def __init__(self, tables):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.tables = tables
+        # Set when the query's tables are invalidated while it runs; its result is then not stored.
+        self.invalidated = False
+
+
+class QueryResultCache:
+    """
+    Thread-safe LRU cache of query results (DataFrames) keyed on normalized SQL.
+
+    The cache is bounded by the total memory of the cached DataFrames. Entries expire
+    after a TTL that can be set per operation, and can be invalidated by table name.
+    Concurrent callers asking for the same uncached query share a single execution.
+    A result whose tables are invalidated while the query is still running is returned
+    to its callers but not cached, since it may predate the change.
+
+    Only task results are cached by default: queries run without an operation (raw
+    ``execute_sql`` calls, and with them SHOW TABLES, DESCRIBE, information_schema and
+    CHECKSUM queries) and the ``METADATA_OPERATIONS`` always go to the database unless a
+    TTL is configured for them.
+
+    :param max_bytes: Upper bound on the summed memory usage of cached DataFrames.
+    :param default_ttl: Seconds a task result stays valid (None keeps it until evicted).
+    :param ttl_by_operation: Dictionary of per-operation TTLs overriding ``default_ttl``;
+                             a TTL of 0 disables caching for that operation.
+    :param sql_ttl: TTL of queries run without an operation (0, the default, disables caching them).
+    """
+
+    def __init__(self, max_bytes=256 * 1024 * 1024, default_ttl=300, ttl_by_operation=None, sql_ttl=0):
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.ttl_by_operation = dict({operation: 0 for operation in METADATA_OPERATIONS}, **(ttl_by_operation or {}))
+        self.sql_ttl = sql_ttl
+
+        self._entries = OrderedDict()
+        self._flights = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "shared": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "invalidations": 0,
+            "uncacheable": 0,
+        }
+
+    def ttl_for(self, operation):
+        """Return the TTL that applies to an operation (``sql_ttl`` for queries without one)."""
+        if operation is None:
+            return self.sql_ttl
+        return self.ttl_by_operation.get(operation, self.default_ttl)
+
+    def get_or_execute(self, query, execute, operation=None, tables=None):
+        """
+        Return the cached result of a query, executing it on a miss.
+
+        :param query: SQL query string.
+        :param execute: Callable taking the query and returning a DataFrame.
+        :param operation: Name of the task operation, used to pick the TTL.
+        :param tables: Tables the query reads; parsed from the query when omitted.
+        :return: Tuple (DataFrame, hit) where ``hit`` tells whether the result was shared
+                 rather than executed by this caller. The DataFrame is the cached object
+                 itself and must not be modified in place.
+        """
+        ttl = self.ttl_for(operation)
+        if ttl == 0:
+            with self._lock:
+                self._stats["uncacheable"] += 1
+            return execute(query), False
+
+        key = normalize_sql(query)
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is not None:
+                self._stats["hits"] += 1
+                return entry.data, True
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                table_set = {t.lower() for t in tables} if tables else tables_in_query(query)
+                flight = self._flights[key] = _Flight(table_set)
+                self._stats["misses"] += 1
+            else:
+                self._stats["shared"] += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, True
+
+        try:
+            data = execute(query)
+            flight.result = data
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+                if flight.error is None and not flight.invalidated:
+                    self._store(key, data, ttl, flight.tables)
+            flight.done.set()
+        return data, False
+
+    def _lookup(self, key):
+        """Return a live entry and mark it most recently used. Caller holds the lock."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at is not None and entry.expires_at <= time.monotonic():
+            self._remove(key)
+            self._stats["expirations"] += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _store(self, key, data, ttl, tables):
+        """Insert an entry and evict least recently used ones to fit. Caller holds the lock."""
+        size = int(data.memory_usage(index=True, deep=True).sum())
+        if size > self.max_bytes:
+            self._stats["uncacheable"] += 1
+            return
+        if key in self._entries:
+            self._remove(key)
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        self._entries[key] = _Entry(data, size, expires_at, tables)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self._stats["evictions"] += 1
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def invalidate_table(self, table_name):
+        """
+        Drop every cached result that reads from a table.
+
+        :param table_name: Table name (schema prefix is ignored).
+        :return: Number of entries removed.
+        """
+        table_name = table_name.split(".")[-1].strip("`").lower()
+        with self._lock:
+            keys = [key for key, entry in self._entries.items() if table_name in entry.tables]
+            for key in keys:
+                self._remove(key)
+            for flight in self._flights.values():
+                if table_name in flight.tables:
+                    flight.invalidated = True
+            self._stats["invalidations"] += len(keys)
+        return len(keys)
+
+    def invalidate(self, query):
+        """
+        Drop the cached result of a single query.
+
+        :return: True if an entry was removed.
+        """
+        key = normalize_sql(query)
+        with self._lock:
+            if key in self._flights:
+                self._flights[key].invalidated = True
+            if key not in self._entries:
+                return False
+            self._remove(key)
+            self._stats["invalidations"] += 1
+            return True
+
+    def clear(self):
+        """Drop all cached results."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            for flight in self._flights.values():
+                flight.invalidated = True
+
+    def stats(self):
+        """
+        Return cache counters.
+
+        :return: Dictionary with hits, misses, shared executions, evictions, expirations,
+                 invalidations, hit rate, entry count and cached bytes.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["bytes"] = self._bytes
+            stats["max_bytes"] = self.max_bytes
+        lookups = stats["hits"] + stats["misses"] + stats["shared"]
+        stats["hit_rate"] = (stats["hits"] + stats["shared"]) / lookups if lookups else 0.0
+        return stats
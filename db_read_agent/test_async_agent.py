@@ -0,0 +1,101 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from db_read_agent.async_agent import AsyncSQLAgent, QueryTimeoutError, _RunningQuery
+from db_read_agent.executor_agent import SQLAgent
+from db_read_agent.result_cache import QueryResultCache
+
+
+def slow_query(steps):
+    """A query the stand-in spends roughly ``steps / 2_000_000`` seconds on."""
+    return f"WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < {steps}) SELECT count(*) FROM c"
+
+
+def test_timed_out_query_is_killed_and_its_connection_discarded(standin):
+    async def main():
+        async with AsyncSQLAgent.pooled({}, max_size=1) as agent:
+            with pytest.raises(QueryTimeoutError):
+                await agent.execute_sql(slow_query(10 ** 9), timeout=0.2)
+            pool_stats = agent.sql_agent.pool.stats()
+            df = await agent.execute_sql("SELECT count(*) FROM booking_origins")
+            return agent.stats(), pool_stats, df
+
+    stats, pool_stats, df = asyncio.run(main())
+    assert stats["timeouts"] == 1 and stats["killed"] == 1
+    assert pool_stats["discarded"] == 1 and pool_stats["idle"] == 0
+    assert int(df.iat[0, 0]) == 200
+
+
+def test_kill_is_not_sent_once_the_query_finished(standin, monkeypatch):
+    import mysql.connector
+
+    agent = AsyncSQLAgent(SQLAgent({}))
+    opened = []
+    connect = mysql.connector.connect
+    monkeypatch.setattr(mysql.connector, "connect", lambda **config: opened.append(1) or connect(**config))
+    assert agent._kill_query(_RunningQuery()) is False
+    assert len(opened) == 1
+    agent.close()
+
+
+def test_one_callers_timeout_does_not_kill_a_shared_query(standin):
+    query = slow_query(2 * 10 ** 6)
+
+    async def main():
+        agent = AsyncSQLAgent(SQLAgent.pooled({}, result_cache=QueryResultCache(sql_ttl=60), max_size=2))
+        try:
+            impatient = asyncio.ensure_future(agent.execute_sql(query, timeout=0.1))
+            patient = asyncio.ensure_future(agent._query(query))
+            results = await asyncio.gather(impatient, patient, return_exceptions=True)
+            return agent.stats(), agent.sql_agent.result_cache.stats(), results
+        finally:
+            agent.close()
+
+    stats, cache_stats, (impatient, patient) = asyncio.run(main())
+    assert isinstance(impatient, QueryTimeoutError)
+    df, hit = patient
+    assert int(df.iat[0, 0]) == 2 * 10 ** 6
+    assert stats["timeouts"] == 1 and stats["killed"] == 0
+    assert cache_stats["misses"] == 1 and cache_stats["shared"] == 1
+
+
+def test_last_caller_of_a_shared_query_kills_it(standin):
+    query = slow_query(10 ** 9)
+
+    async def main():
+        agent = AsyncSQLAgent(SQLAgent.pooled({}, result_cache=QueryResultCache(sql_ttl=60), max_size=2))
+        try:
+            first = asyncio.ensure_future(agent.execute_sql(query, timeout=0.1))
+            second = asyncio.ensure_future(agent.execute_sql(query, timeout=0.3))
+            results = await asyncio.gather(first, second, return_exceptions=True)
+            return agent.stats(), results, dict(agent._shared)
+        finally:
+            agent.close()
+
+    stats, results, shared = asyncio.run(main())
+    assert all(isinstance(result, QueryTimeoutError) for result in results)
+    assert stats["killed"] == 1 and shared == {}
+
+
+def test_cached_results_are_built_and_copied_on_the_cpu_executor(standin):
+    cpu = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cpu")
+    threads = []
+
+    async def main():
+        agent = AsyncSQLAgent(SQLAgent.pooled({}, result_cache=QueryResultCache(sql_ttl=60)), cpu_executor=cpu)
+        build = agent._build
+        agent._build = lambda *args: threads.append(threading.current_thread().name) or build(*args)
+        try:
+            first = await agent.execute_sql("SELECT * FROM channels")
+            second = await agent.execute_sql("SELECT * FROM channels")
+            return first, second, agent.sql_agent.result_cache.stats()
+        finally:
+            agent.close()
+
+    first, second, cache_stats = asyncio.run(main())
+    cpu.shutdown()
+    assert threads and all(name.startswith("cpu") for name in threads)
+    assert cache_stats["hits"] == 1 and first.equals(second) and first is not second
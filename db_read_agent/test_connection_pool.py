@@ -0,0 +1,35 @@
+import pytest
+
+from db_read_agent.connection_pool import ConnectionPool, PoolTimeoutError
+from db_read_agent.executor_agent import SQLAgent
+
+
+def count_channels(agent):
+    return int(agent.execute_sql("SELECT COUNT(*) FROM channels").iat[0, 0])
+
+
+def test_reused_connection_sees_rows_committed_after_its_first_query(standin, source):
+    agent = SQLAgent.pooled({}, max_size=1)
+    assert count_channels(agent) == 5
+    source.execute("INSERT INTO channels VALUES (6, 'fax')")
+    assert count_channels(agent) == 6
+    assert agent.pool_stats()["hits"] == 1
+    agent.close()
+
+
+def test_connections_without_autocommit_are_rolled_back_on_release(standin, source):
+    agent = SQLAgent.pooled({"autocommit": False}, max_size=1)
+    assert count_channels(agent) == 5
+    source.execute("INSERT INTO channels VALUES (6, 'fax')")
+    assert count_channels(agent) == 6
+    agent.close()
+
+
+def test_acquire_times_out_when_the_pool_is_exhausted(standin):
+    pool = ConnectionPool({}, max_size=1, timeout=0.05)
+    connection = pool.acquire()
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire()
+    pool.release(connection)
+    assert pool.acquire() is connection
+    pool.close()
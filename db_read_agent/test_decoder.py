@@ -0,0 +1,38 @@
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+from mysql.connector import FieldFlag, FieldType
+
+from db_read_agent.decoder import ResultDecoder
+
+
+def column(name, type_code, flags=0):
+    return (name, type_code, None, None, None, None, 1, flags)
+
+
+def test_decimals_stay_exact_unless_floats_are_asked_for():
+    rows = [(Decimal("12345678901234567.89"),), (None,)]
+    description = [column("amount", FieldType.NEWDECIMAL)]
+    exact = ResultDecoder().decode(rows, description)
+    assert exact["amount"].tolist()[0] == Decimal("12345678901234567.89")
+    floats = ResultDecoder(decimal_as_float=True).decode(rows, description)
+    assert floats["amount"].dtype == np.float64 and np.isnan(floats["amount"].iloc[1])
+
+
+def test_text_reported_as_blob_becomes_categorical():
+    rows = [("web" if i % 2 else "app", b"\x00\x01") for i in range(200)]
+    description = [column("code", FieldType.BLOB), column("payload", FieldType.BLOB, FieldFlag.BINARY)]
+    df = ResultDecoder().decode(rows, description)
+    assert isinstance(df["code"].dtype, pd.CategoricalDtype)
+    assert df["payload"].dtype == object and df["payload"].iloc[0] == b"\x00\x01"
+
+
+def test_typed_columns_and_empty_results():
+    rows = [(1, 2.5, None), (None, None, "x")]
+    description = [column("id", FieldType.LONGLONG), column("score", FieldType.DOUBLE),
+                   column("note", FieldType.VAR_STRING)]
+    df = ResultDecoder().decode(rows, description)
+    assert str(df["id"].dtype) == "Int64" and df["id"].isna().tolist() == [False, True]
+    assert df["score"].dtype == np.float64
+    assert ResultDecoder().decode([], description).columns.tolist() == ["id", "score", "note"]
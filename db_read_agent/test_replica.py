@@ -0,0 +1,97 @@
+from datetime import datetime
+from decimal import Decimal
+
+import pandas as pd
+import pytest
+
+from db_read_agent.executor_agent import SQLAgent
+from db_read_agent.replica import LocalReplica
+
+
+@pytest.fixture
+def replica(standin, tmp_path):
+    replica = LocalReplica(str(tmp_path / "replica.sqlite"), tables={"booking_origins": {"key": "id"}})
+    yield replica
+    replica.close()
+
+
+@pytest.fixture
+def agent(replica):
+    agent = SQLAgent.pooled({}, replica=replica, max_size=2)
+    agent.refresh_replica()
+    yield agent
+    agent.close()
+
+
+def task(operation, **args):
+    # execute_task requires a group_column for every operation.
+    return {"operation": operation, "args": dict({"table_name": "booking_origins", "group_column": "id"}, **args)}
+
+
+def test_numeric_queries_are_answered_locally(agent, standin):
+    source = SQLAgent({})
+    for routed in (task("count_records"), task("select_all"),
+                   task("select_with_condition", condition="amount > 250 AND id % 3 = 0"),
+                   task("group_by_count", group_column="customer_id", condition="id <= 50",
+                        sort_column="count", sort_order="DESC", limit=5)):
+        result = agent.execute_task(routed)
+        assert result["status"] == "success" and result["source"] == "replica", routed
+        if routed["operation"] in ("count_records", "select_with_condition"):
+            expected = source.execute_task(routed)["data"]
+            pd.testing.assert_frame_equal(result["data"].reset_index(drop=True), expected, check_dtype=False)
+    assert agent.replica_stats()["hits"] == 4
+
+
+@pytest.mark.parametrize("routed", [
+    task("select_with_condition", condition="code = 'WEB'"),
+    task("select_with_condition", condition="code LIKE 'w%'"),
+    task("select_with_condition", condition="created_at > 0"),
+    task("select_with_condition", condition="amount / 2 > 100"),
+    task("group_by_count", group_column="code", condition="1 = 1", sort_column="count", sort_order="DESC", limit=5),
+])
+def test_queries_sqlite_may_answer_differently_go_to_the_source(agent, routed):
+    result = agent.execute_task(routed)
+    assert result["status"] == "success" and result["source"] == "database"
+    assert agent.replica_stats()["unsupported"] == 1
+
+
+def test_stale_snapshots_are_not_used(standin, tmp_path):
+    replica = LocalReplica(str(tmp_path / "replica.sqlite"), tables={"channels": {"max_staleness": 0}})
+    agent = SQLAgent({}, replica=replica)
+    agent.refresh_replica()
+    result = agent.execute_task({"operation": "count_records", "args": {"table_name": "channels", "group_column": "id"}})
+    assert result["source"] == "database" and replica.stats()["stale"] == 1
+    replica.close()
+
+
+def test_incremental_refresh_picks_up_new_rows(agent, source):
+    source.execute("INSERT INTO booking_origins (id, customer_id, code, amount) VALUES (1000, 1, 'web', 1.0)")
+    report = agent.refresh_replica()["booking_origins"]
+    assert report["mode"] == "incremental" and report["rows"] == 1
+    assert agent.execute_task(task("count_records"))["data"].iat[0, 0] == 201
+
+
+class FrameSource:
+    """Stands in for a SQLAgent reading a table with DECIMAL and DATETIME columns."""
+
+    def __init__(self, df):
+        self.df = df
+
+    def iter_sql(self, query, chunk_rows=None):
+        yield self.df
+
+    def execute_sql(self, query):
+        return self.df.iloc[:0]
+
+
+def test_decimals_and_datetimes_round_trip_exactly(tmp_path):
+    df = pd.DataFrame({"id": [1, 2], "price": [Decimal("0.10"), Decimal("12345678901234567.89")],
+                       "created_at": [datetime(2024, 1, 2, 3, 4, 5), datetime(2024, 2, 3, 4, 5, 6)]})
+    replica = LocalReplica(str(tmp_path / "replica.sqlite"), tables=["prices"])
+    replica.refresh(FrameSource(df))
+    result = replica.query("SELECT * FROM prices LIMIT 5;", "prices", "select_all")
+    assert result["price"].tolist() == [Decimal("0.10"), Decimal("12345678901234567.89")]
+    assert result["created_at"].tolist() == df["created_at"].tolist()
+    assert replica.query("SELECT * FROM prices WHERE price > 1;", "prices", "select_with_condition") is None
+    assert replica.query("SELECT * FROM prices WHERE id > 1;", "prices", "select_with_condition")["id"].tolist() == [2]
+    replica.close()
@@ -0,0 +1,74 @@
+import pandas as pd
+
+from db_read_agent.executor_agent import SQLAgent
+from db_read_agent.result_cache import QueryResultCache, normalize_sql, tables_in_query
+
+COUNT_TASK = {"operation": "count_records", "args": {"table_name": "channels", "group_column": "id"}}
+
+
+def test_task_results_are_cached_until_their_table_is_invalidated(standin, source):
+    agent = SQLAgent({}, result_cache=QueryResultCache())
+    assert agent.execute_task(COUNT_TASK)["source"] == "database"
+    source.execute("INSERT INTO channels VALUES (6, 'fax')")
+    cached = agent.execute_task(COUNT_TASK)
+    assert cached["source"] == "cache" and cached["data"].iat[0, 0] == 5
+    assert agent.invalidate_table("channels") == 1
+    assert agent.execute_task(COUNT_TASK)["data"].iat[0, 0] == 6
+
+
+def test_raw_sql_and_metadata_queries_are_not_cached_by_default(standin, source):
+    agent = SQLAgent({}, result_cache=QueryResultCache())
+    assert "late" not in set(agent.execute_sql("SHOW TABLES").iloc[:, 0])
+    source.execute("CREATE TABLE late (id INTEGER)")
+    assert "late" in set(agent.execute_sql("SHOW TABLES").iloc[:, 0])
+    describe = {"operation": "describe_table", "args": {"table_name": "channels", "group_column": "id"}}
+    assert agent.execute_task(describe)["source"] == "database"
+    assert agent.execute_task(describe)["source"] == "database"
+    assert agent.cache_stats()["entries"] == 0
+
+
+def test_raw_sql_is_cached_when_opted_in():
+    cache = QueryResultCache(sql_ttl=60)
+    calls = []
+    execute = lambda query: calls.append(query) or pd.DataFrame({"a": [1]})
+    cache.get_or_execute("SELECT 1", execute)
+    _, hit = cache.get_or_execute("SELECT  1;", execute)
+    assert hit and len(calls) == 1
+
+
+def test_expired_entries_are_executed_again():
+    cache = QueryResultCache(ttl_by_operation={"select_all": 0.01})
+    execute = lambda query: pd.DataFrame({"a": [1]})
+    cache.get_or_execute("SELECT * FROM t", execute, operation="select_all")
+    import time
+    time.sleep(0.02)
+    _, hit = cache.get_or_execute("SELECT * FROM t", execute, operation="select_all")
+    assert not hit and cache.stats()["expirations"] == 1
+
+
+def test_query_normalization_and_table_extraction():
+    assert normalize_sql("SELECT *\n  FROM t ;") == "SELECT * FROM t"
+    assert tables_in_query("SELECT * FROM db.a JOIN `b` ON a.id = b.id") == {"a", "b"}
+
+
+def test_invalidation_during_a_running_query_keeps_its_result_out_of_the_cache():
+    import threading
+
+    cache = QueryResultCache()
+    started, release = threading.Event(), threading.Event()
+
+    def slow_execute(query):
+        started.set()
+        release.wait(5)
+        return pd.DataFrame({"a": [1]})
+
+    leader = threading.Thread(target=cache.get_or_execute, args=("SELECT * FROM t", slow_execute, "select_all"))
+    leader.start()
+    started.wait(5)
+    # The running query may have read the table before the change that prompted the invalidation.
+    cache.invalidate_table("t")
+    release.set()
+    leader.join(5)
+    _, hit = cache.get_or_execute("SELECT * FROM t", lambda query: pd.DataFrame({"a": [2]}), operation="select_all")
+    assert not hit and cache.stats()["misses"] == 2
+    assert cache.get_or_execute("SELECT * FROM t", slow_execute, operation="select_all")[0]["a"].tolist() == [2]
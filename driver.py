@@ -1,14 +1,30 @@
-from db_read_agent.executor_agent import SQLAgent
-from standardize_agent.main import DataFrameAgent
-from ui_agent import SQLVisualizerAgentUI
-from visualizer_agent import SQLVisualizerAgent
-from db_inspector import DatabaseInspector
-from exporter_agent import ExporterAgent
-
+"""
+Command line entry point for the database agents.
+
+    python driver.py inspect [--workers 4] [--output summary/database_summary.json]
+    python driver.py query "SELECT * FROM booking_origins LIMIT 10"
+    python driver.py export booking_origins --format parquet --output summary/booking_origins.parquet
+    python driver.py visualize booking_origins other_table --output-dir reports
+    python driver.py batch tasks.jsonl --results summary/batch_results.jsonl --workers 4
+    python driver.py serve --port 8765
+    python driver.py replica booking_origins --key id --updated-at updated_at --max-staleness 60
+    python driver.py --replica summary/replica.sqlite serve
+
+Connection settings come from the DB_HOST, DB_USER, DB_PASSWORD and DB_NAME environment
+variables (a .env file is loaded when present). Global options set the log level and
+enable stage tracing:
+
+    python driver.py --profile --trace summary/trace.jsonl --metrics summary/metrics.prom export booking_origins
+
+Agents and their dependencies (pandas, the MySQL driver, matplotlib, tkinter) are only
+imported by the subcommand that needs them, and nothing runs at import time.
+"""
+import argparse
+import logging
 import os
+import sys
 
-from dotenv import load_dotenv
-load_dotenv()  # Load environment variables from .env file
+DEFAULT_REPLICA_PATH = "summary/replica.sqlite"
 
 def take_input(prompt):
     """
@@ -140,57 +156,311 @@ task = {
     }
 }
 
-config = {
-    "host": os.environ.get("DB_HOST", "localhost"),  
-    "user": os.environ.get("DB_USER", "mysql"), 
-    "password": os.environ.get("DB_PASSWORD", "mysql"), 
-    "database": os.environ.get("DB_NAME", "mysql") 
-}
-
-
-inspector = DatabaseInspector(config)
-database_summary = inspector.inspect_database()
-
-exporter_agent = ExporterAgent(name="DatabaseSummaryExporter", export_format="json", export_path="summary/database_summary.json")
-response = exporter_agent.export_data(data=database_summary)
+def load_config():
+    """
+    Build the database connection settings from the environment (and a .env file, if any).
+    """
+    try:
+        from dotenv import load_dotenv
+        load_dotenv()  # Load environment variables from .env file
+    except ImportError:
+        pass
+    return {
+        "host": os.environ.get("DB_HOST", "localhost"),
+        "user": os.environ.get("DB_USER", "mysql"),
+        "password": os.environ.get("DB_PASSWORD", "mysql"),
+        "database": os.environ.get("DB_NAME", "mysql")
+    }
 
 
-if response["status"] == "success":
-    print(f"Database summary exported successfully to: {response['message']}")
-else:
+def open_replica(options):
+    """Open the local replica given with --replica, or return None."""
+    if not options.replica:
+        return None
+    from db_read_agent.replica import LocalReplica
+    return LocalReplica(options.replica)
+
+
+def make_sql_agent(options):
+    """Create the pooled SQLAgent shared by all work of one command."""
+    from db_read_agent.executor_agent import SQLAgent
+    return SQLAgent.pooled(load_config(), replica=open_replica(options), max_size=options.pool_size)
+
+
+def run_inspect(options):
+    """Inspect every table and export the valid-column summary."""
+    from db_inspector import DatabaseInspector
+    from exporter_agent import ExporterAgent
+
+    # One pooled agent is shared by the inspector and the visualizers so that
+    # every query reuses a warm connection instead of reconnecting.
+    sql_agent = make_sql_agent(options)
+    try:
+        # Only tables that changed since the last run are inspected again.
+        inspector = DatabaseInspector(sql_agent.config, agent=sql_agent, cache=options.cache or None,
+                                      validity_mode=options.validity_mode)
+        database_summary = inspector.inspect_database(workers=options.workers, table_timeout=options.table_timeout)
+        print(f"Connection pool stats: {sql_agent.pool_stats()}")
+    finally:
+        sql_agent.close()
+
+    os.makedirs(os.path.dirname(options.output) or ".", exist_ok=True)
+    exporter_agent = ExporterAgent(name="DatabaseSummaryExporter", export_format="json", export_path=options.output)
+    response = exporter_agent.export_data(data=database_summary)
+
+    if response["status"] == "success":
+        print(f"Database summary exported successfully to: {response['message']}")
+        return 0
     print(f"Error exporting database summary: {response['message']}")
-
-
-
-# from db_read_agent.executor_agent import SQLAgent
-# Show summary
-# for table, summary in database_summary.items():
-#     print(f"\nTable: {table}")
-#     print(f"Valid Columns (more than 50% non-null values):")
-#     for col, valid_percentage in summary['valid_columns'].items():
-#         print(f"  - {col}: {valid_percentage}% valid")
-
-
-
-
-# agent = SQLAgent(config)
-# response = agent.execute_task(task)
-
-# if response["status"] == "success":
-#     print(f"Task executed successfully. Data exported to: {response['message']}")
-#     agent = DataFrameAgent(dataframe=response["data"])
-
-#     # Data Processing (e.g., handling missing data, duplicates, etc.)
-#     agent.remove_duplicates()
-#     agent.filter_columns_by_valid_data()
-
-#     # View the processed dataframe
-#     processed_df = agent.get_dataframe()
-
-#     print(processed_df.head())
-
-#     # Visualize using UI
-#     visualizer_ui = SQLVisualizerAgentUI(agent)
-#     visualizer_ui.display_table_in_ui(processed_df)  # Display processed DataFrame in UI
-# else:
-#     print(f"Error: {response['message']}")
+    return 1
+
+
+def run_query(options):
+    """Run one SQL statement and print (or export) the result."""
+    sql_agent = make_sql_agent(options)
+    try:
+        df = sql_agent.execute_sql(options.sql)
+    except Exception as e:
+        print(f"Error: {e}")
+        return 1
+    finally:
+        sql_agent.close()
+
+    if options.output:
+        from exporter_agent import ExporterAgent
+        export_format = options.format or os.path.splitext(options.output)[1].lstrip(".") or "csv"
+        response = ExporterAgent(name="QueryExporter", export_path=options.output,
+                                 export_format=export_format).export_data(df)
+        print(response["message"])
+        return 0 if response["status"] == "success" else 1
+
+    print(df.head(options.rows).to_string(index=False))
+    print(f"({len(df)} rows)")
+    return 0
+
+
+def run_export(options):
+    """Export a table (optionally filtered) through SQLAgent.execute_task."""
+    args = {
+        "table_name": options.table,
+        # generate_sql_query requires a group column for every operation; this one ignores it.
+        "group_column": options.table,
+        "condition": options.condition,
+        "export_data": True,
+        "export_format": options.format,
+        "export_path": options.output or f"summary/{options.table}.{options.format}",
+        "stream_export": options.stream,
+        "chunk_rows": options.chunk_rows,
+        "compression": options.compression,
+        "partitions": options.partitions,
+    }
+    sql_agent = make_sql_agent(options)
+    try:
+        response = sql_agent.execute_task({"operation": "select_with_condition", "args": args})
+    finally:
+        sql_agent.close()
+
+    if response["status"] == "success":
+        print(f"Task executed successfully. {response['message']}")
+        return 0
+    print(f"Error: {response['message']}")
+    return 1
+
+
+def run_visualize(options):
+    """Render table images headlessly, or open the interactive viewer with --ui."""
+    sql_agent = make_sql_agent(options)
+    try:
+        if options.ui:
+            from ui_agent import SQLVisualizerAgentUI
+            SQLVisualizerAgentUI(sql_agent).visualize_table_in_ui(options.tables[0], condition=options.condition)
+            return 0
+
+        from visualizer_agent import SQLVisualizerAgent
+        results = SQLVisualizerAgent(sql_agent).render_batch(
+            options.tables, output_dir=options.output_dir, image_format=options.format, workers=options.workers,
+            max_rows=options.rows,
+        )
+    finally:
+        sql_agent.close()
+
+    for result in results:
+        if result["status"] != "success":
+            print(f"Error rendering {result['name']}: {result['message']}")
+    return 0 if all(result["status"] == "success" for result in results) else 1
+
+
+def run_batch(options):
+    """Run a JSONL file of tasks, skipping the ones already completed in the results file."""
+    from batch_runner import BatchTaskRunner
+
+    sql_agent = make_sql_agent(options)
+    try:
+        runner = BatchTaskRunner(sql_agent, options.results, max_workers=options.workers, window=options.window)
+        summary = runner.run(options.tasks)
+    finally:
+        sql_agent.close()
+    return 0 if summary["failed"] == 0 else 1
+
+
+def run_serve(options):
+    """Serve tasks over HTTP with warm connections and caches until interrupted."""
+    from server_agent import AgentServer
+
+    replica = open_replica(options)
+    server = AgentServer(load_config(), host=options.host, port=options.port, pool_size=options.pool_size,
+                         cache_bytes=options.cache_mb * 1024 * 1024, inspection_cache=options.cache or None,
+                         replica=replica)
+    if options.inspect:
+        server.inspect()
+    if replica is not None and options.replica_interval:
+        replica.start_refresher(server.sql_agent, interval=options.replica_interval)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if replica is not None:
+            replica.close()
+    return 0
+
+
+def run_replica(options):
+    """Add tables to the local replica and refresh them (or only show its state with --status)."""
+    from db_read_agent.replica import LocalReplica
+
+    replica = LocalReplica(options.replica or DEFAULT_REPLICA_PATH)
+    reports = {}
+    try:
+        for table in options.tables:
+            if options.key or options.updated_at or options.max_staleness is not None or table not in replica.tables():
+                replica.add_table(table, key=options.key, updated_at=options.updated_at,
+                                  max_staleness=options.max_staleness)
+        if not options.status:
+            sql_agent = make_sql_agent(options)
+            try:
+                reports = replica.refresh(sql_agent, tables=options.tables or None, full=options.full)
+            finally:
+                sql_agent.close()
+            for table, report in reports.items():
+                if report["status"] != "success":
+                    print(f"{table}: error: {report['message']}")
+                else:
+                    print(f"{table}: {report['mode']} refresh, {report['rows']} rows fetched, "
+                          f"{report['total_rows']} rows in the replica ({report['seconds']:.2f}s)")
+        for table, state in replica.stats()["tables"].items():
+            age = "never refreshed" if state["staleness"] is None else f"{state['staleness']:.0f}s old"
+            print(f"{table}: {state['rows'] or 0} rows, {age}, max staleness {state['max_staleness']}s, "
+                  f"watermark {state['watermark']}")
+    finally:
+        replica.close()
+    return 0 if all(report["status"] == "success" for report in reports.values()) else 1
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Inspect, query, export and visualize a MySQL database.")
+    parser.add_argument("--pool-size", type=int, default=4, help="Maximum number of pooled connections.")
+    parser.add_argument("--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR"])
+    parser.add_argument("--profile", action="store_true", help="Log a one-line stage profile of every task.")
+    parser.add_argument("--trace", help="Append stage spans to this JSONL file.")
+    parser.add_argument("--metrics", help="Write per-stage metrics to this Prometheus text file.")
+    parser.add_argument("--replica", help="Answer simple tasks on replicated tables from this local replica file "
+                                          "while it is fresh enough (see the replica command).")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    inspect_parser = commands.add_parser("inspect", help="Find the valid columns of every table.")
+    inspect_parser.add_argument("--workers", type=int, default=1, help="Tables inspected concurrently.")
+    inspect_parser.add_argument("--table-timeout", type=float, default=None, help="Seconds allowed per table.")
+    inspect_parser.add_argument("--validity-mode", choices=["sample", "pushdown"], default="sample")
+    inspect_parser.add_argument("--cache", default="summary/inspection_cache.json",
+                                help="Inspection cache file ('' to disable).")
+    inspect_parser.add_argument("--output", default="summary/database_summary.json")
+    inspect_parser.set_defaults(handler=run_inspect)
+
+    query_parser = commands.add_parser("query", help="Run a SQL query and print the result.")
+    query_parser.add_argument("sql")
+    query_parser.add_argument("--rows", type=int, default=20, help="Rows to print.")
+    query_parser.add_argument("--output", help="Export the result to this file instead of printing it.")
+    query_parser.add_argument("--format", help="Export format (default: the output file's extension).")
+    query_parser.set_defaults(handler=run_query)
+
+    export_parser = commands.add_parser("export", help="Export a table to a file.")
+    export_parser.add_argument("table")
+    export_parser.add_argument("--condition", default="1=1")
+    export_parser.add_argument("--format", default="csv",
+                               choices=["csv", "json", "txt", "html", "xlsx", "parquet", "feather", "arrow"])
+    export_parser.add_argument("--output", help="Target file (default: summary/<table>.<format>).")
+    export_parser.add_argument("--stream", action="store_true", help="Stream rows to the file in chunks.")
+    export_parser.add_argument("--chunk-rows", type=int, default=10000)
+    export_parser.add_argument("--compression", default="zstd", help="Codec for columnar formats.")
+    export_parser.add_argument("--partitions", type=int, default=1, help="Concurrent range reads.")
+    export_parser.set_defaults(handler=run_export)
+
+    visualize_parser = commands.add_parser("visualize", help="Render table images, or browse a table with --ui.")
+    visualize_parser.add_argument("tables", nargs="+")
+    visualize_parser.add_argument("--ui", action="store_true", help="Open the interactive viewer for the first table.")
+    visualize_parser.add_argument("--condition", default="1=1", help="Row filter for the interactive viewer.")
+    visualize_parser.add_argument("--output-dir", default="reports")
+    visualize_parser.add_argument("--format", choices=["png", "svg"], default="png")
+    visualize_parser.add_argument("--workers", type=int, default=None, help="Render processes.")
+    visualize_parser.add_argument("--rows", type=int, default=30, help="Rows drawn per table image.")
+    visualize_parser.set_defaults(handler=run_visualize)
+
+    batch_parser = commands.add_parser("batch", help="Run a JSONL file of tasks concurrently.")
+    batch_parser.add_argument("tasks", help="JSONL file with one task per line.")
+    batch_parser.add_argument("--results", default="summary/batch_results.jsonl",
+                              help="JSONL file the status of every task is appended to.")
+    batch_parser.add_argument("--workers", type=int, default=4, help="Queries run concurrently.")
+    batch_parser.add_argument("--window", type=int, default=1000, help="Tasks deduplicated together.")
+    batch_parser.set_defaults(handler=run_batch)
+
+    serve_parser = commands.add_parser("serve", help="Serve tasks over HTTP with warm connections and caches.")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8765)
+    serve_parser.add_argument("--cache-mb", type=int, default=256, help="Result cache size (0 to disable).")
+    serve_parser.add_argument("--cache", default="summary/inspection_cache.json",
+                              help="Inspection cache file ('' to disable).")
+    serve_parser.add_argument("--inspect", action="store_true", help="Inspect the database before serving.")
+    serve_parser.add_argument("--replica-interval", type=float, default=30,
+                              help="Seconds between background refreshes of the --replica (0 to disable).")
+    serve_parser.set_defaults(handler=run_serve)
+
+    replica_parser = commands.add_parser("replica", help="Snapshot tables into a local replica and refresh them.")
+    replica_parser.add_argument("tables", nargs="*", help="Tables to add or refresh (default: every replicated table).")
+    replica_parser.add_argument("--key", help="Increasing primary key column, for incremental refreshes.")
+    replica_parser.add_argument("--updated-at", help="Last-modified column, for incremental refreshes of changed rows.")
+    replica_parser.add_argument("--max-staleness", type=float, default=None,
+                                help="Seconds a snapshot may be old to answer queries (default 300).")
+    replica_parser.add_argument("--full", action="store_true", help="Re-read the tables completely.")
+    replica_parser.add_argument("--status", action="store_true", help="Only show the state of the replica.")
+    replica_parser.set_defaults(handler=run_replica)
+
+    return parser
+
+
+def configure_instrumentation(options):
+    """Set up logging and, when asked for, stage tracing. Returns the tracer or None."""
+    logging.basicConfig(level=options.log_level, format="%(message)s")
+    if not (options.profile or options.trace or options.metrics):
+        return None
+    import instrumentation
+    sinks = []
+    if options.trace:
+        sinks.append(instrumentation.JSONLSink(options.trace))
+    if options.metrics:
+        sinks.append(instrumentation.PrometheusSink(options.metrics))
+    return instrumentation.configure(sinks=sinks, profile=options.profile)
+
+
+def main(argv=None):
+    options = build_parser().parse_args(argv)
+    tracer = configure_instrumentation(options)
+    try:
+        return options.handler(options)
+    finally:
+        if tracer is not None:
+            tracer.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
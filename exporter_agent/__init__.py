@@ -1 +1,25 @@
-from .main import ExporterAgent
\ No newline at end of file
+import importlib
+
+# Public names and the submodules defining them. They are imported on first access, so
+# importing the package does not pull in pandas or pyarrow.
+_EXPORTS = {
+    "ExporterAgent": ".main",
+    "StreamingExporter": ".streaming",
+    "read_columnar": ".columnar",
+    "write_columnar": ".columnar",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,180 @@
+import os
+
+COLUMNAR_FORMATS = ("parquet", "feather", "arrow")
+COMPRESSIONS = ("zstd", "lz4", "snappy", None)
+# Arrow IPC (and therefore Feather v2) only supports these buffer codecs.
+IPC_COMPRESSIONS = ("zstd", "lz4", None)
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("pyarrow is required for parquet, feather and arrow exports (pip install pyarrow).") from e
+    return pyarrow
+
+
+def normalize_compression(export_format, compression):
+    """
+    Validate a compression codec for a columnar format.
+
+    :param export_format: One of "parquet", "feather" or "arrow".
+    :param compression: "zstd", "lz4", "snappy", or None/"none" for uncompressed output.
+    :return: Codec name understood by pyarrow, or None.
+    """
+    if compression in (None, "none", "uncompressed"):
+        return None
+    compression = compression.lower()
+    allowed = COMPRESSIONS if export_format == "parquet" else IPC_COMPRESSIONS
+    if compression not in allowed:
+        names = ", ".join(str(c) for c in allowed if c)
+        raise ValueError(f"Unsupported compression '{compression}' for {export_format}. Supported: {names} or none.")
+    return compression
+
+
+class ColumnarWriter:
+    """
+    Incremental writer for Parquet, Feather and Arrow IPC files.
+
+    Every DataFrame passed to ``write`` is appended as one or more row groups (Parquet)
+    or record batches (Feather/Arrow). The file schema is fixed when the file is started,
+    and later chunks are cast to it. A column that is entirely NULL so far has no type yet
+    (Arrow ``null``); chunks are held back until every column has shown a value, or until
+    ``max_pending_rows`` rows are waiting, in which case still untyped columns are written
+    as strings.
+
+    :param file: Path or binary file object to write to.
+    :param export_format: One of "parquet", "feather" or "arrow".
+    :param compression: Compression codec, see ``normalize_compression``.
+    :param row_group_size: Maximum rows per Parquet row group / Arrow record batch.
+    :param max_pending_rows: Rows held back at most while waiting for column types.
+    """
+
+    def __init__(self, file, export_format, compression="zstd", row_group_size=None, max_pending_rows=100000):
+        if export_format not in COLUMNAR_FORMATS:
+            raise ValueError(f"Unsupported columnar format '{export_format}'")
+        self.pa = _import_pyarrow()
+        self.file = file
+        self.export_format = export_format
+        self.compression = normalize_compression(export_format, compression)
+        self.row_group_size = row_group_size
+        self.max_pending_rows = max_pending_rows
+        self.schema = None
+        self._writer = None
+        self._pending = []
+        self._pending_rows = 0
+        self._types = {}
+
+    def write(self, df):
+        """
+        Append a DataFrame.
+        :param df: DataFrame with the same columns as the previous ones.
+        """
+        table = self.pa.Table.from_pandas(df, preserve_index=False)
+        if self._writer is not None:
+            self._write_table(table)
+            return
+        for field in table.schema:
+            if not self.pa.types.is_null(field.type):
+                self._types.setdefault(field.name, field.type)
+        self._pending.append(table)
+        self._pending_rows += table.num_rows
+        if len(self._types) == table.num_columns or self._pending_rows >= self.max_pending_rows:
+            self._start(self.pa.large_string())
+
+    def _start(self, untyped):
+        """Open the file with the types seen so far (``untyped`` for the others) and write the held chunks."""
+        pa = self.pa
+        first = self._pending[0].schema
+        self.schema = pa.schema([first.field(name).with_type(self._types.get(name, untyped)) for name in first.names],
+                                metadata=first.metadata)
+        if self.export_format == "parquet":
+            self._writer = pa.parquet.ParquetWriter(self.file, self.schema, compression=self.compression or "none")
+        else:
+            options = pa.ipc.IpcWriteOptions(compression=self.compression)
+            self._writer = pa.ipc.new_file(self.file, self.schema, options=options)
+        pending, self._pending, self._pending_rows = self._pending, [], 0
+        for table in pending:
+            self._write_table(table)
+
+    def _write_table(self, table):
+        table = table.select(self.schema.names).cast(self.schema)
+        if self.export_format == "parquet":
+            self._writer.write_table(table, row_group_size=self.row_group_size)
+        else:
+            self._writer.write_table(table, max_chunksize=self.row_group_size)
+
+    def close(self, empty_columns=None):
+        """
+        Finish the file.
+        :param empty_columns: Column names to write an empty file with when no chunk was written.
+        """
+        if self._writer is None:
+            if not self._pending:
+                import pandas as pd
+                self._pending.append(self.pa.Table.from_pandas(pd.DataFrame(columns=empty_columns or []),
+                                                               preserve_index=False))
+            # Columns without any value keep the Arrow null type.
+            self._start(self.pa.null())
+        self._writer.close()
+
+    def abort(self):
+        """Drop the writer of a failed export, before its file is closed."""
+        writer, self._writer, self._pending = self._writer, None, []
+        if writer is not None:
+            try:
+                writer.close()
+            except Exception:
+                pass
+
+
+def write_columnar(df, path, export_format, compression="zstd", row_group_size=None):
+    """
+    Write a DataFrame to a Parquet, Feather or Arrow IPC file.
+
+    :param df: DataFrame to write.
+    :param path: Target file path.
+    :param export_format: One of "parquet", "feather" or "arrow".
+    :param compression: "zstd", "lz4", "snappy" (Parquet only) or None.
+    :param row_group_size: Maximum rows per row group / record batch.
+    """
+    writer = ColumnarWriter(path, export_format, compression=compression, row_group_size=row_group_size)
+    writer.write(df)
+    writer.close()
+
+
+def read_columnar(path, export_format=None, columns=None, memory_map=True, as_arrow=False):
+    """
+    Load a file written by ``write_columnar``.
+
+    Feather/Arrow files are memory-mapped: uncompressed files are read without copying
+    their buffers, and ``to_pandas`` reuses them for numeric columns without nulls.
+    Parquet files are decoded through a memory map as well.
+
+    :param path: File path.
+    :param export_format: "parquet", "feather" or "arrow"; derived from the extension when omitted.
+    :param columns: Optional list of columns to load.
+    :param memory_map: Map the file instead of reading it into memory.
+    :param as_arrow: Return the pyarrow Table instead of a DataFrame.
+    :return: DataFrame (or pyarrow Table).
+    """
+    pa = _import_pyarrow()
+    if export_format is None:
+        export_format = os.path.splitext(path)[1].lstrip(".").lower()
+        export_format = {"pq": "parquet", "ipc": "arrow", "arrows": "arrow"}.get(export_format, export_format)
+    if export_format not in COLUMNAR_FORMATS:
+        raise ValueError(f"Unsupported columnar format '{export_format}'")
+
+    if export_format == "parquet":
+        table = pa.parquet.read_table(path, columns=columns, memory_map=memory_map)
+    else:
+        source = pa.memory_map(path, "r") if memory_map else pa.OSFile(path, "rb")
+        table = pa.ipc.open_file(source).read_all()
+        if columns is not None:
+            table = table.select(columns)
+
+    if as_arrow:
+        return table
+    return table.to_pandas(split_blocks=True)
@@ -1,25 +1,50 @@
+import asyncio
+import logging
+import os
 import pandas as pd
 import numpy as np
+from collections.abc import Iterator
+from exporter_agent.streaming import StreamingExporter
+from exporter_agent.columnar import COLUMNAR_FORMATS, normalize_compression, write_columnar
+from instrumentation.spans import span
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_FORMATS = ["json", "csv", "txt"] + list(COLUMNAR_FORMATS)
+
+
+def _is_chunk_iterator(data):
+    """Return True for lazily produced DataFrame chunks (generators, iterators)."""
+    return isinstance(data, Iterator) and not isinstance(data, (pd.DataFrame, pd.Series, str))
+
+
 class ExporterAgent:
     """
     Description:
     ExporterAgent is responsible for exporting data to various file formats.
-    It supports exporting data in JSON, CSV, and TXT formats.
+    It supports exporting data in JSON, CSV and TXT formats, and in the columnar binary
+    formats Parquet, Feather and Arrow IPC (these require pyarrow).
     This agent can be used to save query results or any other data in a structured format.
     Attributes:
         name (str): Name of the agent.
         file_path (str): Path where the exported file will be saved.
-        export_format (str): Format in which data will be exported. Supported formats are "json", "csv", and "txt".
+        export_format (str): Format in which data will be exported. Supported formats are "json", "csv", "txt",
+                             "parquet", "feather" and "arrow".
+        compression (str): Compression codec for columnar formats: "zstd", "lz4", "snappy" (Parquet only) or None.
+        row_group_size (int): Maximum rows per Parquet row group / Arrow record batch (None for the library default).
     Methods:
         export_data(data): Exports the provided data to a file in the specified format.
         export_format: str: The format in which data will be exported.
         
     
     """
-    def __init__(self, name: str, export_path: str = "/tmp/exported_data.json", export_format: str = "json"):
+    def __init__(self, name: str, export_path: str = "/tmp/exported_data.json", export_format: str = "json",
+                 compression: str = "zstd", row_group_size: int = None):
         self.name = name
         self.file_path = export_path  # Default path for exported data
-        self.export_format = export_format   # supports "json", "csv", "txt"
+        self.export_format = export_format   # supports "json", "csv", "txt", "parquet", "feather", "arrow"
+        self.compression = compression
+        self.row_group_size = row_group_size
     
 
     
@@ -28,8 +53,25 @@ class ExporterAgent:
         Export data to a file in the specified format.
         :param data: Data to be exported.
         """
+        if _is_chunk_iterator(data):
+            return self.export_chunks(data)
+        with span("export", format=self.export_format, exporter=self.name) as export_span:
+            response = self._write(data)
+            if response["status"] != "success":
+                export_span.fail(response["message"])
+            elif export_span.recording:
+                export_span.set(rows=len(data) if hasattr(data, "__len__") else None,
+                                bytes=os.path.getsize(self.file_path))
+        return response
+
+    def _write(self, data):
         import json
         try:
+            if self.export_format in COLUMNAR_FORMATS:
+                write_columnar(pd.DataFrame(data), self.file_path, self.export_format,
+                               compression=self.compression, row_group_size=self.row_group_size)
+                logger.info("Data exported successfully to %s", self.file_path)
+                return {"status": "success", "message": f"Data exported to {self.file_path}"}
             with open(self.file_path, 'w') as file:
                 if self.export_format == "json":
                     if isinstance(data, pd.DataFrame):
@@ -51,21 +93,59 @@ class ExporterAgent:
                             file.write(str(data))
                 else:
                     raise ValueError("Unsupported export format")
-            print(f"Data exported successfully to {self.file_path}")
+            logger.info("Data exported successfully to %s", self.file_path)
             return {"status": "success", "message": f"Data exported to {self.file_path}"}
         except Exception as e:
-            print(f"An error occurred while exporting data: {e}")
+            logger.error("An error occurred while exporting data: %s", e)
             return {"status": "error", "message": str(e)}
 
-    def set_export_format(self, format: str):
+    async def export_data_async(self, data, executor=None):
+        """
+        Awaitable version of ``export_data``: serialization and file writes run on ``executor``
+        (the event loop's default executor when omitted) instead of on the event loop.
+        :param data: Data to be exported.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, self.export_data, data)
+
+    def export_chunks(self, chunks):
+        """
+        Export an iterable of DataFrame chunks (e.g. from ``SQLAgent.iter_task``)
+        without concatenating them first. Chunks are appended to a temporary file as
+        they arrive, which is renamed over the target once all chunks are written.
+        :param chunks: Iterable of DataFrames with identical columns.
+        """
+        with span("export", format=self.export_format, exporter=self.name, streaming=True) as export_span:
+            try:
+                stats = StreamingExporter(self.file_path, self.export_format, compression=self.compression,
+                                          row_group_size=self.row_group_size).export(chunks)
+            except Exception as e:
+                logger.error("An error occurred while exporting data: %s", e)
+                export_span.fail(e)
+                return {"status": "error", "message": str(e)}
+            export_span.set(rows=stats["rows"], bytes=stats["bytes"])
+        logger.info("Data exported successfully to %s (%d rows, %d bytes, %.0f rows/sec)", self.file_path,
+                    stats["rows"], stats["bytes"], stats["rows_per_sec"])
+        return {"status": "success", "message": f"Data exported to {self.file_path}", "stats": stats}
+
+    def set_export_format(self, format: str, compression: str = None, row_group_size: int = None):
         """
         Set the export format for the data.
-        :param format: Format in which data will be exported. Supported formats are "json", "csv", and "txt".
+        :param format: Format in which data will be exported. Supported formats are "json", "csv", "txt",
+                       "parquet", "feather" and "arrow".
+        :param compression: Optional compression codec for the columnar formats (keeps the current one if None).
+        :param row_group_size: Optional rows per row group / record batch for the columnar formats.
         """
-        if format in ["json", "csv", "txt"]:
+        if format in SUPPORTED_FORMATS:
+            if format in COLUMNAR_FORMATS:
+                normalize_compression(format, compression if compression is not None else self.compression)
+                if compression is not None:
+                    self.compression = compression
+                if row_group_size is not None:
+                    self.row_group_size = row_group_size
             self.export_format = format
         else:
-            raise ValueError("Unsupported export format. Supported formats are 'json', 'csv', and 'txt'.")
+            raise ValueError(f"Unsupported export format. Supported formats are {', '.join(repr(f) for f in SUPPORTED_FORMATS)}.")
         
     def set_file_path(self, path: str):
         """
@@ -0,0 +1,179 @@
+import html
+import os
+import tempfile
+import time
+
+from exporter_agent.columnar import COLUMNAR_FORMATS, ColumnarWriter
+
+
+class StreamingExporter:
+    """
+    Description:
+    StreamingExporter writes DataFrame chunks to a file as they arrive, so query
+    results can be exported without ever being held in memory as a whole.
+    Data is written to a temporary file next to the target and atomically renamed
+    over the target once the export completes; a failed export leaves any existing
+    file untouched.
+    Attributes:
+        export_path (str): Final path of the exported file.
+        export_format (str): One of "csv", "json" (JSON lines), "txt", "html", "parquet", "feather" and "arrow".
+        compression (str): Codec for the columnar formats.
+        row_group_size (int): Rows per Parquet row group / Arrow record batch.
+    Methods:
+        write(chunk): Append a DataFrame chunk to the temporary file.
+        commit(): Finish the file, rename it into place and return the export stats.
+        abort(): Discard the temporary file.
+        export(chunks): Write all chunks and commit, aborting on error.
+    """
+    SUPPORTED_FORMATS = ("csv", "json", "txt", "html") + COLUMNAR_FORMATS
+
+    def __init__(self, export_path: str, export_format: str = "csv", compression: str = "zstd",
+                 row_group_size: int = None):
+        export_format = export_format.lower()
+        if export_format not in self.SUPPORTED_FORMATS:
+            raise ValueError(f"Unsupported streaming export format '{export_format}'")
+        self.export_path = export_path
+        self.export_format = export_format
+        self.compression = compression
+        self.row_group_size = row_group_size
+        self.rows = 0
+        self._file = None
+        self._columnar = None
+        self._tmp_path = None
+        self._columns = None
+        self._started = None
+        self._finished = None
+        self._first_byte = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+        return False
+
+    def open(self):
+        """Create the temporary file the chunks are written to."""
+        directory = os.path.dirname(os.path.abspath(self.export_path))
+        os.makedirs(directory, exist_ok=True)
+        fd, self._tmp_path = tempfile.mkstemp(
+            dir=directory, prefix=f".{os.path.basename(self.export_path)}.", suffix=".part"
+        )
+        os.chmod(self._tmp_path, 0o644)  # mkstemp creates owner-only files
+        if self.export_format in COLUMNAR_FORMATS:
+            self._file = os.fdopen(fd, "wb")
+            self._columnar = ColumnarWriter(self._file, self.export_format, compression=self.compression,
+                                            row_group_size=self.row_group_size)
+        else:
+            self._file = os.fdopen(fd, "w", encoding="utf-8", newline="")
+        self._started = time.perf_counter()
+
+    def write(self, chunk):
+        """
+        Append a DataFrame chunk to the export.
+        :param chunk: DataFrame whose columns match the previously written chunks.
+        """
+        if self._file is None:
+            self.open()
+        first = self._columns is None
+        if first:
+            self._columns = list(chunk.columns)
+
+        if self.export_format == "csv":
+            chunk.to_csv(self._file, index=False, header=first)
+        elif self.export_format == "json":
+            chunk.to_json(self._file, orient='records', lines=True)
+        elif self.export_format == "txt":
+            self._file.write(chunk.to_string(index=False, header=first))
+            self._file.write("\n")
+        elif self.export_format == "html":
+            if first:
+                self._write_html_header()
+            self._write_html_rows(chunk)
+        else:
+            self._columnar.write(chunk)
+
+        self.rows += len(chunk)
+        if self._first_byte is None:
+            # Push the first chunk to disk right away so readers see data early.
+            self._file.flush()
+            self._first_byte = time.perf_counter() - self._started
+
+    def _write_html_header(self):
+        cells = "".join(f"<th>{html.escape(str(col))}</th>" for col in self._columns)
+        self._file.write(f'<table border="1" class="dataframe">\n<thead>\n<tr>{cells}</tr>\n</thead>\n<tbody>\n')
+
+    def _write_html_rows(self, chunk):
+        lines = []
+        for row in chunk.itertuples(index=False, name=None):
+            cells = "".join(f"<td>{html.escape(str(value))}</td>" for value in row)
+            lines.append(f"<tr>{cells}</tr>\n")
+        self._file.writelines(lines)
+
+    def commit(self):
+        """
+        Finish the export and move the temporary file into place.
+        :return: Dictionary with rows, bytes written, elapsed seconds, rows/sec and time to first byte.
+        """
+        if self._file is None:
+            self.open()
+        if self.export_format == "html":
+            if self._columns is None:
+                self._columns = []
+                self._write_html_header()
+            self._file.write("</tbody>\n</table>\n")
+        elif self._columnar is not None:
+            self._columnar.close(empty_columns=self._columns)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._file = None
+        os.replace(self._tmp_path, self.export_path)
+        self._finished = time.perf_counter()
+        self._tmp_path = None
+        return self.stats()
+
+    def abort(self):
+        """Close and delete the temporary file without touching the target."""
+        if self._columnar is not None:
+            self._columnar.abort()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._tmp_path and os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+        self._tmp_path = None
+
+    def export(self, chunks):
+        """
+        Write every chunk and commit the file.
+        :param chunks: Iterable of DataFrames.
+        :return: Export stats, see ``commit``.
+        """
+        with self:
+            for chunk in chunks:
+                self.write(chunk)
+        return self.stats()
+
+    def stats(self):
+        """
+        Return the statistics of the export so far.
+        :return: Dictionary with rows, bytes, seconds, rows_per_sec and first_byte_seconds.
+        """
+        if self._started is None:
+            elapsed = 0.0
+        else:
+            elapsed = (self._finished or time.perf_counter()) - self._started
+        path = self._tmp_path or self.export_path
+        size = os.path.getsize(path) if path and os.path.exists(path) else 0
+        return {
+            "rows": self.rows,
+            "bytes": size,
+            "seconds": elapsed,
+            "rows_per_sec": self.rows / elapsed if elapsed > 0 else 0.0,
+            "first_byte_seconds": self._first_byte,
+        }
@@ -0,0 +1,66 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from exporter_agent.columnar import COLUMNAR_FORMATS, ColumnarWriter, read_columnar, write_columnar
+from exporter_agent.streaming import StreamingExporter
+
+
+def sparse_chunks():
+    """Chunks as iter_sql yields them without a decoder: all-NULL columns arrive as object None."""
+    yield pd.DataFrame({"id": [1, 2], "note": [None, None], "amount": [None, None]})
+    yield pd.DataFrame({"id": [3, 4], "note": ["a", None], "amount": [1.5, None]})
+    yield pd.DataFrame({"id": [5], "note": [None], "amount": [None]})
+
+
+@pytest.mark.parametrize("export_format", COLUMNAR_FORMATS)
+def test_stream_with_all_null_first_chunk(tmp_path, export_format):
+    path = str(tmp_path / f"out.{export_format}")
+    stats = StreamingExporter(path, export_format).export(sparse_chunks())
+    assert stats["rows"] == 5
+    df = read_columnar(path, export_format)
+    assert df["id"].tolist() == [1, 2, 3, 4, 5]
+    assert df["note"].isna().tolist() == [True, True, False, True, True] and df["note"][2] == "a"
+    assert df["amount"].dtype == np.float64
+    assert df["amount"].isna().tolist() == [True, True, False, True, True]
+
+
+def test_columns_untyped_past_the_pending_limit_are_written_as_strings(tmp_path):
+    path = str(tmp_path / "out.parquet")
+    writer = ColumnarWriter(path, "parquet", max_pending_rows=2)
+    writer.write(pd.DataFrame({"id": [1, 2], "code": [None, None]}))
+    writer.write(pd.DataFrame({"id": [3], "code": [7]}))
+    writer.close()
+    code = read_columnar(path)["code"]
+    assert code.isna().tolist() == [True, True, False] and code[2] == "7"
+
+
+def test_columns_that_never_get_a_value_stay_null(tmp_path):
+    path = str(tmp_path / "out.arrow")
+    writer = ColumnarWriter(path, "arrow")
+    writer.write(pd.DataFrame({"id": [1], "empty": [None]}))
+    writer.close()
+    assert read_columnar(path)["empty"].isna().all()
+
+
+def test_failed_stream_leaves_no_partial_file(tmp_path):
+    path = str(tmp_path / "out.parquet")
+
+    def chunks():
+        yield pd.DataFrame({"id": [1]})
+        raise RuntimeError("connection lost")
+
+    with pytest.raises(RuntimeError):
+        StreamingExporter(path, "parquet").export(chunks())
+    assert os.listdir(tmp_path) == []
+
+
+@pytest.mark.parametrize("export_format", COLUMNAR_FORMATS)
+def test_write_and_read_round_trip(tmp_path, export_format):
+    df = pd.DataFrame({"id": np.arange(3), "code": ["a", "b", None],
+                       "at": pd.to_datetime(["2024-01-01", None, "2024-01-03"])})
+    path = str(tmp_path / f"out.{export_format}")
+    write_columnar(df, path, export_format)
+    pd.testing.assert_frame_equal(read_columnar(path), df)
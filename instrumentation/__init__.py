@@ -0,0 +1,30 @@
+import importlib
+
+# Public names and the submodules defining them. They are imported on first access.
+_EXPORTS = {
+    "Tracer": ".spans",
+    "configure": ".spans",
+    "get_tracer": ".spans",
+    "span": ".spans",
+    "record_span": ".spans",
+    "format_profile": ".spans",
+    "frame_bytes": ".spans",
+    "JSONLSink": ".sinks",
+    "PrometheusSink": ".sinks",
+    "MemorySink": ".sinks",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
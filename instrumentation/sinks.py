@@ -0,0 +1,148 @@
+import json
+import os
+import threading
+import time
+
+# Upper bounds (seconds) of the stage duration histogram.
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 60.0)
+
+
+class JSONLSink:
+    """
+    Append every span as one JSON object per line (see ``Span.to_dict``). The file is flushed
+    after each trace, so traces of a crashed run are kept.
+
+    :param path: Trace file; created (with its directory) if needed.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a")
+        self._lock = threading.Lock()
+
+    def write(self, spans):
+        lines = "".join(json.dumps(span, default=str) + "\n" for span in spans)
+        with self._lock:
+            self._file.write(lines)
+            self._file.flush()
+
+    def flush(self):
+        with self._lock:
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+class PrometheusSink:
+    """
+    Aggregate spans per stage (span name) and write them as a Prometheus text-format file, e.g.
+    for the node_exporter textfile collector:
+
+    - ``agent_stage_calls_total`` / ``agent_stage_errors_total``
+    - ``agent_stage_seconds_total`` and the ``agent_stage_duration_seconds`` histogram
+    - ``agent_stage_rows_total`` / ``agent_stage_bytes_total``
+
+    The file is rewritten atomically at most every ``interval`` seconds, and on ``flush``/``close``.
+
+    :param path: Metrics file.
+    :param interval: Minimum seconds between two rewrites.
+    :param buckets: Histogram bucket upper bounds in seconds.
+    :param prefix: Metric name prefix.
+    """
+
+    def __init__(self, path, interval=5.0, buckets=DEFAULT_BUCKETS, prefix="agent_stage"):
+        self.path = path
+        self.interval = interval
+        self.buckets = tuple(sorted(buckets))
+        self.prefix = prefix
+        self._stages = {}
+        self._written_at = 0.0
+        self._lock = threading.Lock()
+
+    def write(self, spans):
+        with self._lock:
+            for span in spans:
+                stage = self._stages.get(span["name"])
+                if stage is None:
+                    stage = self._stages[span["name"]] = {"calls": 0, "errors": 0, "seconds": 0.0, "rows": 0,
+                                                          "bytes": 0, "buckets": [0] * len(self.buckets)}
+                stage["calls"] += 1
+                stage["errors"] += span["status"] == "error"
+                stage["seconds"] += span["seconds"]
+                stage["rows"] += span["rows"] or 0
+                stage["bytes"] += span["bytes"] or 0
+                for i, bound in enumerate(self.buckets):
+                    if span["seconds"] <= bound:
+                        stage["buckets"][i] += 1
+            due = time.monotonic() - self._written_at >= self.interval
+        if due:
+            self.flush()
+
+    def render(self):
+        """Return the metrics in the Prometheus text exposition format."""
+        with self._lock:
+            stages = {name: dict(stage, buckets=list(stage["buckets"])) for name, stage in self._stages.items()}
+        p = self.prefix
+        lines = []
+        for metric, key, kind, description in (
+                ("calls_total", "calls", "counter", "Number of times the stage ran."),
+                ("errors_total", "errors", "counter", "Number of times the stage failed."),
+                ("seconds_total", "seconds", "counter", "Total time spent in the stage."),
+                ("rows_total", "rows", "counter", "Rows produced by the stage."),
+                ("bytes_total", "bytes", "counter", "Bytes produced by the stage.")):
+            lines.append(f"# HELP {p}_{metric} {description}")
+            lines.append(f"# TYPE {p}_{metric} {kind}")
+            lines += [f'{p}_{metric}{{stage="{_label(name)}"}} {stage[key]}' for name, stage in stages.items()]
+
+        lines.append(f"# HELP {p}_duration_seconds Stage duration.")
+        lines.append(f"# TYPE {p}_duration_seconds histogram")
+        for name, stage in stages.items():
+            label = _label(name)
+            for bound, count in zip(self.buckets, stage["buckets"]):
+                lines.append(f'{p}_duration_seconds_bucket{{stage="{label}",le="{bound}"}} {count}')
+            lines.append(f'{p}_duration_seconds_bucket{{stage="{label}",le="+Inf"}} {stage["calls"]}')
+            lines.append(f'{p}_duration_seconds_sum{{stage="{label}"}} {stage["seconds"]}')
+            lines.append(f'{p}_duration_seconds_count{{stage="{label}"}} {stage["calls"]}')
+        return "\n".join(lines) + "\n"
+
+    def flush(self):
+        """Rewrite the metrics file (via a temporary file, so readers never see a partial one)."""
+        content = self.render()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.path}.tmp.{os.getpid()}.{threading.get_ident()}"
+        with open(temp_path, "w") as file:
+            file.write(content)
+        os.replace(temp_path, self.path)
+        with self._lock:
+            self._written_at = time.monotonic()
+
+    def close(self):
+        self.flush()
+
+
+class MemorySink:
+    """Keep span records in a list, e.g. to inspect traces from code or benchmarks."""
+
+    def __init__(self):
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def write(self, spans):
+        with self._lock:
+            self.spans.extend(spans)
+
+    def clear(self):
+        with self._lock:
+            self.spans = []
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -0,0 +1,303 @@
+import contextvars
+import itertools
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_span_ids = itertools.count(1)
+_current = contextvars.ContextVar("instrumentation_span", default=None)
+
+try:
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = 4096
+
+
+def current_rss():
+    """
+    Return the resident set size of this process in bytes, or None where it cannot be read
+    cheaply (only Linux' /proc is used; it costs a few microseconds).
+    """
+    try:
+        with open("/proc/self/statm", "rb") as statm:
+            return int(statm.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def frame_bytes(df):
+    """Shallow memory size of a DataFrame (values and index, without following Python objects)."""
+    return int(df.memory_usage(index=True, deep=False).sum())
+
+
+class Span:
+    """
+    One timed stage. Spans opened while another span is active (in the same thread or task)
+    become its children and share its trace; a span without a parent is the root of a trace,
+    and the whole trace is handed to the sinks when the root finishes.
+
+    Besides the duration, a span records optional ``rows`` and ``bytes`` counts, the change of
+    the process' resident memory over the stage (``memory_delta``) and free-form attributes.
+    """
+
+    recording = True
+
+    def __init__(self, tracer, name, attributes):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+        self.rows = None
+        self.bytes = None
+        self.error = None
+        self.span_id = next(_span_ids)
+        self.parent = None
+        self.trace = None
+        self.started_at = None
+        self.seconds = None
+        self.memory_delta = None
+        self._token = None
+        self._started = None
+        self._rss = None
+
+    def set(self, rows=None, bytes=None, **attributes):
+        """Record row and byte counts and other attributes of the stage."""
+        if rows is not None:
+            self.rows = int(rows)
+        if bytes is not None:
+            self.bytes = int(bytes)
+        self.attributes.update(attributes)
+        return self
+
+    def fail(self, message):
+        """Mark the stage as failed without raising, e.g. for error results."""
+        self.error = str(message)
+
+    def __enter__(self):
+        self.parent = _current.get()
+        self.trace = self.parent.trace if self.parent is not None else []
+        self._token = _current.set(self)
+        self.started_at = time.time()
+        self._rss = current_rss() if self.tracer.memory else None
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.seconds = time.perf_counter() - self._started
+        if self._rss is not None:
+            rss = current_rss()
+            self.memory_delta = None if rss is None else rss - self._rss
+        if exc is not None and self.error is None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        _current.reset(self._token)
+        self.trace.append(self)
+        if self.parent is None:
+            self.tracer._finish_trace(self.trace)
+        return False
+
+    def profile(self):
+        """One-line summary of this span and the spans below it, see ``format_profile``."""
+        return format_profile([span for span in self.trace if span is not self and self._is_ancestor_of(span)]
+                              + [self])
+
+    def _is_ancestor_of(self, span):
+        while span is not None:
+            if span.parent is self:
+                return True
+            span = span.parent
+        return False
+
+    def to_dict(self, trace_id=None):
+        record = {
+            "trace_id": trace_id if trace_id is not None else self.span_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent.span_id if self.parent is not None else None,
+            "name": self.name,
+            "started_at": self.started_at,
+            "seconds": self.seconds,
+            "rows": self.rows,
+            "bytes": self.bytes,
+            "memory_delta": self.memory_delta,
+            "status": "error" if self.error else "ok",
+        }
+        if self.error:
+            record["error"] = self.error
+        if self.attributes:
+            record["attributes"] = self.attributes
+        return record
+
+
+class _NoopSpan:
+    """Returned by a disabled tracer: every call is a no-op, so instrumentation costs almost nothing."""
+
+    recording = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        return False
+
+    def set(self, rows=None, bytes=None, **attributes):
+        return self
+
+    def fail(self, message):
+        pass
+
+    def profile(self):
+        return None
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """
+    Creates spans and hands finished traces to the sinks.
+
+    With no sinks and ``profile`` off the tracer is disabled and ``span`` returns a shared
+    no-op span.
+
+    :param sinks: Objects with ``write(spans)`` (and optionally ``flush()``/``close()``), see
+                  ``instrumentation.sinks``.
+    :param profile: Log a one-line profile of every finished trace at INFO level.
+    :param memory: Record resident memory deltas (one /proc read at the start and end of every span).
+    """
+
+    def __init__(self, sinks=None, profile=False, memory=True):
+        self.sinks = list(sinks or [])
+        self.profile = profile
+        self.memory = memory
+        self.last_profile = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return bool(self.sinks) or self.profile
+
+    def span(self, name, **attributes):
+        """
+        Open a span, to be used as a context manager::
+
+            with tracer.span("fetch") as span:
+                rows = cursor.fetchall()
+                span.set(rows=len(rows))
+        """
+        if not self.enabled:
+            return _NOOP_SPAN
+        return Span(self, name, attributes)
+
+    def record(self, name, seconds, rows=None, bytes=None, error=None, **attributes):
+        """
+        Add a span for a stage timed elsewhere, e.g. in a worker process, to the current trace
+        (or as a trace of its own).
+        """
+        if not self.enabled:
+            return
+        span = Span(self, name, attributes)
+        span.set(rows=rows, bytes=bytes)
+        span.error = error
+        span.parent = _current.get()
+        span.trace = span.parent.trace if span.parent is not None else []
+        span.started_at = time.time() - seconds
+        span.seconds = seconds
+        span.trace.append(span)
+        if span.parent is None:
+            self._finish_trace(span.trace)
+
+    def _finish_trace(self, spans):
+        self.last_profile = format_profile(spans)
+        if self.profile:
+            logger.info(self.last_profile)
+        trace_id = spans[-1].span_id
+        records = [span.to_dict(trace_id) for span in spans]
+        with self._lock:
+            for sink in self.sinks:
+                try:
+                    sink.write(records)
+                except Exception as e:
+                    logger.warning("Trace sink %s failed: %s", type(sink).__name__, e)
+
+    def flush(self):
+        with self._lock:
+            for sink in self.sinks:
+                if hasattr(sink, "flush"):
+                    sink.flush()
+
+    def close(self):
+        """Flush and close the sinks."""
+        with self._lock:
+            for sink in self.sinks:
+                if hasattr(sink, "close"):
+                    sink.close()
+            self.sinks = []
+
+
+def _format_bytes(size):
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(size) < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def format_profile(spans):
+    """
+    Summarize a trace on one line: the root span's duration, the total time of every stage
+    below it (in the order they first ran), and its row count, bytes and memory delta::
+
+        task select_with_condition 84.2 ms | connect 1.1, execute 40.3, fetch 20.1, build 15.2, export 5.0 ms | rows 1000, 120.3 KB, mem +2.1 MB
+
+    :param spans: Finished spans of one trace, the root last.
+    """
+    root = spans[-1]
+    stages = {}
+    for span in spans[:-1]:
+        stages[span.name] = stages.get(span.name, 0.0) + span.seconds
+    label = root.attributes.get("operation") or root.attributes.get("table") or ""
+    parts = [f"{root.name} {label}".strip() + f" {root.seconds * 1000:.1f} ms"]
+    if stages:
+        parts.append(", ".join(f"{name} {seconds * 1000:.1f}" for name, seconds in stages.items()) + " ms")
+    details = []
+    if root.rows is not None:
+        details.append(f"rows {root.rows}")
+    if root.bytes is not None:
+        details.append(_format_bytes(root.bytes))
+    if root.memory_delta is not None:
+        details.append(f"mem {'+' if root.memory_delta >= 0 else '-'}{_format_bytes(abs(root.memory_delta))}")
+    if root.error:
+        details.append(f"error: {root.error}")
+    if details:
+        parts.append(", ".join(details))
+    return " | ".join(parts)
+
+
+_tracer = Tracer()
+
+
+def get_tracer():
+    """Return the process-wide tracer used by the agents."""
+    return _tracer
+
+
+def configure(sinks=None, profile=False, memory=True):
+    """
+    Replace the process-wide tracer; the previous one is closed.
+
+    :return: The new Tracer.
+    """
+    global _tracer
+    previous, _tracer = _tracer, Tracer(sinks=sinks, profile=profile, memory=memory)
+    previous.close()
+    return _tracer
+
+
+def span(name, **attributes):
+    """Open a span on the process-wide tracer, see ``Tracer.span``."""
+    return _tracer.span(name, **attributes)
+
+
+def record_span(name, seconds, **attributes):
+    """Record an externally timed stage on the process-wide tracer, see ``Tracer.record``."""
+    _tracer.record(name, seconds, **attributes)
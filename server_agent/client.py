@@ -0,0 +1,117 @@
+import http.client
+import json
+import threading
+from urllib.parse import urlencode, urlparse
+
+# Kept here rather than in server_agent.main so that clients do not import pandas or the agents.
+DEFAULT_PORT = 8765
+
+
+class AgentClientError(Exception):
+    """Raised when the agent server answers with an error."""
+
+    def __init__(self, message, status_code=None, response=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.response = response
+
+
+class AgentClient:
+    """
+    Client for ``AgentServer``.
+
+    Each thread keeps its own persistent HTTP connection to the server, so a client can be
+    shared by many threads and requests do not pay for a new TCP connection.
+
+    :param url: Base URL of the server.
+    :param timeout: Socket timeout in seconds.
+    """
+
+    def __init__(self, url=f"http://127.0.0.1:{DEFAULT_PORT}", timeout=300):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or DEFAULT_PORT
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def execute_task(self, task, max_rows=None):
+        """
+        Run a task on the server, see ``SQLAgent.execute_task``.
+
+        :param task: Dictionary containing the operation and its arguments.
+        :param max_rows: Maximum number of rows to return (the server's default when omitted).
+        :return: Result dictionary; ``data`` holds the result as a DataFrame and ``truncated``
+                 tells whether rows were left out. Errors are returned with status "error".
+        """
+        try:
+            result = self._request("POST", "/task", task, max_rows=max_rows)
+        except AgentClientError as e:
+            if e.response is None:
+                raise
+            result = e.response
+        return self._with_dataframe(result)
+
+    def execute_sql(self, query, max_rows=None):
+        """
+        Run a SQL query on the server.
+
+        :return: DataFrame containing the results of the query.
+        """
+        return self._with_dataframe(self._request("POST", "/sql", {"query": query}, max_rows=max_rows))["data"]
+
+    def inspect(self, refresh=False):
+        """Return the server's database summary (table name to valid columns)."""
+        return self._request("GET", "/inspect", refresh=1 if refresh else None)["summary"]
+
+    def stats(self):
+        return self._request("GET", "/stats")
+
+    def health(self):
+        return self._request("GET", "/health")
+
+    def close(self):
+        """Close this thread's connection to the server."""
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = http.client.HTTPConnection(self.host, self.port,
+                                                                               timeout=self.timeout)
+        return connection
+
+    def _request(self, method, path, body=None, **params):
+        query = urlencode({name: value for name, value in params.items() if value is not None})
+        if query:
+            path = f"{path}?{query}"
+        payload = json.dumps(body).encode("utf-8") if body is not None else None
+        headers = {"Content-Type": "application/json"} if payload is not None else {}
+
+        for attempt in range(2):
+            connection = self._connection()
+            try:
+                connection.request(method, path, body=payload, headers=headers)
+                response = connection.getresponse()
+                content = response.read()
+                break
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                # The server closed an idle keep-alive connection; retry once on a new one.
+                self.close()
+                if attempt:
+                    raise
+
+        result = json.loads(content) if content else {}
+        if response.status >= 400:
+            raise AgentClientError(result.get("message", f"HTTP {response.status}"), response.status, result)
+        return result
+
+    @staticmethod
+    def _with_dataframe(result):
+        data = result.get("data")
+        if isinstance(data, dict):
+            import pandas as pd
+            result["data"] = pd.DataFrame(data["data"], columns=data["columns"])
+        return result
@@ -0,0 +1,285 @@
+import json
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from db_read_agent.connection_pool import PoolTimeoutError
+from db_read_agent.executor_agent import SQLAgent
+from db_read_agent.result_cache import QueryResultCache
+from db_inspector.main import DatabaseInspector
+from server_agent.client import DEFAULT_PORT
+
+# Rows returned inline per result unless the request asks for another limit.
+DEFAULT_MAX_ROWS = 10000
+MAX_BODY_BYTES = 1024 * 1024
+# HTTP status of failed tasks by their error_type; other failures happened while running the task (500).
+TASK_ERROR_CODES = {"invalid_task": 400, "pool_timeout": 503}
+
+logger = logging.getLogger(__name__)
+
+
+def encode_result(result, max_rows=DEFAULT_MAX_ROWS):
+    """
+    Serialize an ``execute_task`` result dictionary to a JSON response body.
+
+    The DataFrame is written by pandas straight into the body (``orient="split"``: columns and
+    row lists) instead of being converted to Python objects first. Results longer than
+    ``max_rows`` are cut and flagged with ``truncated``.
+
+    :return: Response body as bytes.
+    """
+    result = dict(result)
+    df = result.pop("data", None)
+    if df is None:
+        return json.dumps(result, default=str).encode("utf-8")
+    result["rows"] = len(df)
+    result["truncated"] = max_rows is not None and len(df) > max_rows
+    if result["truncated"]:
+        df = df.head(max_rows)
+    data = df.to_json(orient="split", index=False, date_format="iso", default_handler=str)
+    # Splice the frame into the envelope to avoid decoding and re-encoding it.
+    return (json.dumps(result, default=str)[:-1] + ', "data": ' + data + "}").encode("utf-8")
+
+
+class AgentServer:
+    """
+    Resident HTTP server that keeps a warm connection pool, result cache and inspection summary
+    for many clients.
+
+    Endpoints (JSON in and out):
+
+    - ``POST /task``: run a task in the shape ``SQLAgent.execute_task`` takes. The response is the
+      task result; the DataFrame is returned as ``data`` (``columns`` and ``data`` lists), cut to
+      ``?max_rows=N`` rows. Export tasks write on the server and return the export path.
+    - ``POST /sql``: run ``{"query": ...}``, same response shape.
+    - ``GET /inspect``: the database summary, computed on first use and kept (``?refresh=1``
+      re-inspects changed tables).
+    - ``GET /stats``: request counters and latencies, connection pool, result cache and replica
+      statistics.
+    - ``GET /health``: liveness check.
+
+    Every connection gets its own handler thread (``ThreadingHTTPServer``); database work is
+    bounded by the connection pool, and requests that cannot get a connection within the pool
+    timeout are answered with 503. Inspection bypasses the result cache.
+
+    :param config: Dictionary containing database connection details.
+    :param host: Interface to listen on (local only by default).
+    :param port: Port to listen on (0 picks a free one, see ``address``).
+    :param pool_size: Maximum number of pooled connections.
+    :param cache_bytes: Size of the shared result cache (0 disables it).
+    :param inspection_cache: Inspection cache file, or None.
+    :param max_rows: Default number of rows returned inline per result.
+    :param sql_agent: Optional SQLAgent to serve with instead of creating a pooled one.
+    :param replica: Optional LocalReplica answering simple tasks on replicated tables (for the
+                    pooled SQLAgent created by the server).
+    """
+
+    def __init__(self, config, host="127.0.0.1", port=DEFAULT_PORT, pool_size=8, cache_bytes=256 * 1024 * 1024,
+                 inspection_cache=None, max_rows=DEFAULT_MAX_ROWS, sql_agent=None, replica=None):
+        if sql_agent is None:
+            result_cache = QueryResultCache(max_bytes=cache_bytes) if cache_bytes else None
+            sql_agent = SQLAgent.pooled(config, result_cache=result_cache, replica=replica, max_size=pool_size)
+        self.sql_agent = sql_agent
+        # Inspection must see schema changes: it shares the pool, but not the result cache.
+        inspection_agent = sql_agent
+        if sql_agent.result_cache is not None:
+            inspection_agent = SQLAgent(sql_agent.config, pool=sql_agent.pool, decoder=sql_agent.decoder)
+        self.inspector = DatabaseInspector(config, agent=inspection_agent, cache=inspection_cache)
+        self.max_rows = max_rows
+        self._summary = None
+        self._summary_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {"requests": 0, "errors": 0, "in_flight": 0, "max_in_flight": 0, "seconds": 0.0,
+                       "max_seconds": 0.0, "by_endpoint": {}}
+        self._started = time.monotonic()
+        self._thread = None
+
+        self.httpd = ThreadingHTTPServer((host, port), AgentRequestHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.agent_server = self
+
+    @property
+    def address(self):
+        """(host, port) the server listens on."""
+        return self.httpd.server_address[:2]
+
+    @property
+    def url(self):
+        host, port = self.address
+        return f"http://{host}:{port}"
+
+    def serve_forever(self):
+        """Serve requests until ``shutdown`` is called (or the process is interrupted)."""
+        logger.info("Agent server listening on %s", self.url)
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self.close()
+
+    def start(self):
+        """Serve requests on a background thread and return right away."""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="agent-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def shutdown(self):
+        """Stop serving and release the server's resources."""
+        self.httpd.shutdown()
+        if self._thread is not None:
+            self._thread.join()
+        self.close()
+
+    def close(self):
+        self.httpd.server_close()
+        self.sql_agent.close()
+
+    def run_task(self, task):
+        result = self.sql_agent.execute_task(task)
+        args = task.get("args", {})
+        if args.get("export_data") and result["status"] == "success":
+            # The file was written on the server; return where instead of the rows.
+            data = result.pop("data", None)
+            result["export_path"] = args.get("export_path")
+            if data is not None:
+                result["rows"] = len(data)
+        return result
+
+    def run_sql(self, query):
+        df = self.sql_agent.execute_sql(query)
+        return {"status": "success", "query": query, "data": df, "message": "Query executed successfully"}
+
+    def inspect(self, refresh=False):
+        """
+        Return the database summary, inspecting the database on first use or when ``refresh`` is set.
+        Concurrent callers share one inspection.
+        """
+        with self._summary_lock:
+            if self._summary is None or refresh:
+                summary = self.inspector.inspect_database(workers=self.sql_agent.pool.max_size
+                                                          if self.sql_agent.pool is not None else 1)
+                self._summary = {"status": "success", "summary": summary,
+                                 "failed_tables": dict(self.inspector.failed_tables),
+                                 "inspected_at": time.strftime("%Y-%m-%dT%H:%M:%S")}
+            return self._summary
+
+    def stats(self):
+        """
+        Return server statistics.
+
+        :return: Dictionary with request counters and latencies (overall and per endpoint),
+                 uptime, and the pool, result cache and replica statistics of the SQLAgent.
+        """
+        with self._stats_lock:
+            stats = dict(self._stats, by_endpoint={name: dict(counters)
+                                                   for name, counters in self._stats["by_endpoint"].items()})
+        stats["avg_seconds"] = stats["seconds"] / stats["requests"] if stats["requests"] else 0.0
+        stats["uptime_seconds"] = time.monotonic() - self._started
+        stats["pool"] = self.sql_agent.pool_stats()
+        stats["cache"] = self.sql_agent.cache_stats()
+        stats["replica"] = self.sql_agent.replica_stats()
+        stats["inspected"] = self._summary is not None
+        return stats
+
+    def _request_started(self):
+        with self._stats_lock:
+            self._stats["in_flight"] += 1
+            self._stats["max_in_flight"] = max(self._stats["max_in_flight"], self._stats["in_flight"])
+
+    def _request_finished(self, endpoint, seconds, failed):
+        with self._stats_lock:
+            stats = self._stats
+            stats["in_flight"] -= 1
+            stats["requests"] += 1
+            stats["errors"] += failed
+            stats["seconds"] += seconds
+            stats["max_seconds"] = max(stats["max_seconds"], seconds)
+            counters = stats["by_endpoint"].setdefault(endpoint, {"requests": 0, "errors": 0, "seconds": 0.0})
+            counters["requests"] += 1
+            counters["errors"] += failed
+            counters["seconds"] += seconds
+
+
+class AgentRequestHandler(BaseHTTPRequestHandler):
+    """Request handler of ``AgentServer``; keeps connections alive between requests."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self._dispatch({"/health": self._health, "/stats": self._stats, "/inspect": self._inspect})
+
+    def do_POST(self):
+        self._dispatch({"/task": self._task, "/sql": self._sql})
+
+    def _dispatch(self, routes):
+        url = urlparse(self.path)
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        handler = routes.get(url.path)
+        server = self.server.agent_server
+        server._request_started()
+        started = time.perf_counter()
+        code = 500
+        try:
+            if handler is None:
+                code, body = 404, {"status": "error", "message": f"No endpoint {self.command} {url.path}"}
+            else:
+                code, body = handler(server, params)
+        except PoolTimeoutError as e:
+            code, body = 503, {"status": "error", "message": str(e)}
+        except ValueError as e:
+            code, body = 400, {"status": "error", "message": str(e)}
+        except Exception as e:
+            code, body = 500, {"status": "error", "message": str(e)}
+        finally:
+            server._request_finished(url.path, time.perf_counter() - started, code >= 400)
+        if not isinstance(body, bytes):
+            body = json.dumps(body, default=str).encode("utf-8")
+        self._respond(code, body)
+
+    def _respond(self, code, body):
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length", 0))
+        if length > MAX_BODY_BYTES:
+            raise ValueError(f"Request body larger than {MAX_BODY_BYTES} bytes")
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            raise ValueError("Request body is not valid JSON")
+        if not isinstance(body, dict):
+            raise ValueError("Request body must be a JSON object")
+        return body
+
+    def _max_rows(self, server, params):
+        return int(params["max_rows"]) if "max_rows" in params else server.max_rows
+
+    def _task(self, server, params):
+        result = server.run_task(self._read_json())
+        # Only a malformed task is the client's fault; a failure while running it is the server's.
+        code = 200 if result["status"] == "success" else TASK_ERROR_CODES.get(result.get("error_type"), 500)
+        return code, encode_result(result, self._max_rows(server, params))
+
+    def _sql(self, server, params):
+        query = self._read_json().get("query")
+        if not query:
+            raise ValueError("Missing 'query'")
+        return 200, encode_result(server.run_sql(query), self._max_rows(server, params))
+
+    def _inspect(self, server, params):
+        return 200, server.inspect(refresh=params.get("refresh") in ("1", "true"))
+
+    def _stats(self, server, params):
+        return 200, server.stats()
+
+    def _health(self, server, params):
+        return 200, {"status": "success", "message": "ok"}
+
+    def log_message(self, format, *args):
+        # Per-request logging would dominate the cost of small cached requests.
+        pass
@@ -0,0 +1,73 @@
+import pytest
+
+from db_read_agent.executor_agent import SQLAgent
+from db_read_agent.result_cache import QueryResultCache
+from server_agent import AgentClient, AgentClientError, AgentServer
+
+COUNT_TASK = {"operation": "count_records", "args": {"table_name": "booking_origins", "group_column": "id"}}
+
+
+@pytest.fixture
+def server(standin):
+    server = AgentServer({}, port=0, pool_size=2).start()
+    yield server
+    server.shutdown()
+
+
+def test_task_results_carry_data_and_source(server):
+    client = AgentClient(server.url)
+    result = client.execute_task(COUNT_TASK)
+    assert result["status"] == "success" and result["source"] == "database"
+    assert result["data"].iat[0, 0] == 200
+    assert client.execute_task(COUNT_TASK)["source"] == "cache"
+
+
+def test_unknown_endpoint_and_bad_body(server):
+    client = AgentClient(server.url)
+    with pytest.raises(AgentClientError) as error:
+        client._request("GET", "/nope")
+    assert error.value.status_code == 404
+    with pytest.raises(AgentClientError) as error:
+        client._request("POST", "/sql", {})
+    assert error.value.status_code == 400
+
+
+def test_inspect_refresh_sees_tables_created_after_startup(server, source):
+    client = AgentClient(server.url)
+    assert "late" not in client.inspect()
+    source.execute("CREATE TABLE late (id INTEGER PRIMARY KEY, name TEXT)")
+    source.execute("INSERT INTO late VALUES (1, 'a')")
+    assert "late" in client.inspect(refresh=True)
+
+
+def test_exhausted_pool_is_answered_with_503(standin):
+    sql_agent = SQLAgent.pooled({}, result_cache=QueryResultCache(), max_size=1, timeout=0.05)
+    server = AgentServer({}, port=0, sql_agent=sql_agent).start()
+    held = sql_agent.pool.acquire()
+    try:
+        client = AgentClient(server.url)
+        result = client.execute_task(COUNT_TASK)
+        assert result["status"] == "error" and result["error_type"] == "pool_timeout"
+        for path, body in (("/task", COUNT_TASK), ("/sql", {"query": "SELECT 1"})):
+            with pytest.raises(AgentClientError) as error:
+                client._request("POST", path, body)
+            assert error.value.status_code == 503
+    finally:
+        sql_agent.pool.release(held)
+        server.shutdown()
+
+
+def test_invalid_tasks_are_client_errors_and_failed_queries_server_errors(server):
+    client = AgentClient(server.url)
+    invalid = ({"operation": "drop_everything", "args": {"table_name": "booking_origins", "group_column": "id"}},
+               {"operation": "count_records", "args": {"table_name": "booking_origins"}})
+    for task in invalid:
+        assert client.execute_task(task)["error_type"] == "invalid_task"
+        with pytest.raises(AgentClientError) as error:
+            client._request("POST", "/task", task)
+        assert error.value.status_code == 400
+    missing_table = {"operation": "count_records", "args": {"table_name": "no_such_table", "group_column": "id"}}
+    assert client.execute_task(missing_table)["status"] == "error"
+    with pytest.raises(AgentClientError) as error:
+        client._request("POST", "/task", missing_table)
+    assert error.value.status_code == 500
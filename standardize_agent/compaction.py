@@ -0,0 +1,145 @@
+import numpy as np
+import pandas as pd
+
+SIGNED_INTEGER_DTYPES = (np.int8, np.int16, np.int32, np.int64)
+NULLABLE_INTEGER_DTYPES = ("Int8", "Int16", "Int32", "Int64")
+
+
+class CompactionPolicy:
+    """
+    Settings for ``compact``: which conversions to apply, and when a frame is worth compacting.
+
+    :param downcast_integers: Store integer columns in the smallest signed type that holds their range.
+    :param downcast_floats: Store float64 columns as float32 when every value survives the round trip exactly.
+    :param nullable_integers: Turn float columns that only hold whole numbers and NaN into nullable
+                              integer columns (Int8 ... Int64).
+    :param categorical_max_ratio: Convert string columns to ``category`` when their number of distinct
+                                  values is at most this fraction of the rows (0 disables it).
+    :param categorical_min_rows: Only create categoricals for frames with at least this many rows.
+    :param min_rows: Leave frames with fewer rows untouched.
+    :param min_bytes: Leave frames using less memory than this untouched.
+    """
+
+    def __init__(self, downcast_integers=True, downcast_floats=True, nullable_integers=True,
+                 categorical_max_ratio=0.5, categorical_min_rows=100, min_rows=0, min_bytes=0):
+        self.downcast_integers = downcast_integers
+        self.downcast_floats = downcast_floats
+        self.nullable_integers = nullable_integers
+        self.categorical_max_ratio = categorical_max_ratio
+        self.categorical_min_rows = categorical_min_rows
+        self.min_rows = min_rows
+        self.min_bytes = min_bytes
+
+    def applies_to(self, df, frame_bytes=None):
+        """Return True if the frame is large enough to be compacted."""
+        if len(df) < self.min_rows:
+            return False
+        if self.min_bytes:
+            if frame_bytes is None:
+                frame_bytes = int(df.memory_usage(index=True, deep=True).sum())
+            return frame_bytes >= self.min_bytes
+        return True
+
+
+def _smallest(dtypes, low, high):
+    for dtype in dtypes:
+        info = np.iinfo(dtype.lower() if isinstance(dtype, str) else dtype)
+        if info.min <= low and high <= info.max:
+            return dtype
+    return None
+
+
+def compact_column(series, policy):
+    """
+    Return a more compact version of a column, or the column itself when nothing applies.
+
+    :param series: Column to compact.
+    :param policy: CompactionPolicy.
+    """
+    dtype = series.dtype
+
+    if pd.api.types.is_bool_dtype(dtype) or isinstance(dtype, pd.CategoricalDtype):
+        return series
+
+    if pd.api.types.is_integer_dtype(dtype):
+        if not policy.downcast_integers or pd.api.types.is_unsigned_integer_dtype(dtype) or series.count() == 0:
+            return series
+        low, high = int(series.min()), int(series.max())
+        nullable = isinstance(dtype, pd.api.extensions.ExtensionDtype)
+        if nullable and not series.hasnans:
+            nullable = False
+        target = _smallest(NULLABLE_INTEGER_DTYPES if nullable else SIGNED_INTEGER_DTYPES, low, high)
+        return series.astype(target) if target is not None and series.dtype != target else series
+
+    if pd.api.types.is_float_dtype(dtype):
+        values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+        finite = values[~np.isnan(values)]
+        if policy.nullable_integers and series.hasnans and len(finite) and np.all(np.isfinite(finite)) \
+                and np.all(np.floor(finite) == finite):
+            target = _smallest(NULLABLE_INTEGER_DTYPES, finite.min(), finite.max())
+            if target is not None:
+                return series.astype(target)
+        if policy.downcast_floats and dtype == np.float64:
+            as_float32 = values.astype(np.float32)
+            with np.errstate(invalid="ignore"):
+                exact = (as_float32.astype(np.float64) == values) | np.isnan(values)
+            if exact.all():
+                return pd.Series(as_float32, index=series.index, name=series.name)
+        return series
+
+    if (pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype)) and policy.categorical_max_ratio:
+        rows = len(series)
+        if rows < policy.categorical_min_rows:
+            return series
+        codes, uniques = pd.factorize(series)
+        if len(uniques) <= rows * policy.categorical_max_ratio:
+            try:
+                return pd.Series(pd.Categorical.from_codes(codes, uniques), index=series.index, name=series.name)
+            except (TypeError, ValueError):
+                # Unhashable or mixed values that cannot form categories.
+                return series
+    return series
+
+
+def compact(df, policy=None):
+    """
+    Shrink a DataFrame's memory: downcast numerics, use nullable integers for whole-number
+    floats with NaN and turn low-cardinality strings into categoricals.
+
+    :param df: DataFrame to compact (not modified).
+    :param policy: CompactionPolicy; the defaults are used when omitted.
+    :return: Tuple (DataFrame, report). The report holds ``applied``, ``bytes_before``,
+             ``bytes_after`` and a ``columns`` list with the dtype and deep memory usage
+             of every column before and after.
+    """
+    policy = policy or CompactionPolicy()
+    before = df.memory_usage(index=False, deep=True)
+    report = {
+        "applied": False,
+        "bytes_before": int(before.sum()),
+        "bytes_after": int(before.sum()),
+        "columns": [],
+    }
+    if not policy.applies_to(df, report["bytes_before"]):
+        return df, report
+
+    compacted = {}
+    for position in range(df.shape[1]):
+        column = df.iloc[:, position]
+        compacted[position] = compact_column(column, policy)
+    result = pd.DataFrame(compacted, index=df.index, copy=False)
+    # Positional keys keep duplicate column names apart.
+    result.columns = df.columns
+
+    after = result.memory_usage(index=False, deep=True)
+    for position, name in enumerate(df.columns):
+        report["columns"].append({
+            "column": name,
+            "dtype_before": str(df.dtypes.iloc[position]),
+            "dtype_after": str(result.dtypes.iloc[position]),
+            "bytes_before": int(before.iloc[position]),
+            "bytes_after": int(after.iloc[position]),
+        })
+    report["applied"] = True
+    report["bytes_after"] = int(after.sum())
+    return result, report
@@ -0,0 +1,124 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from standardize_agent.serialization import decode_value, encode_value, to_python, write_json_atomic
+
+VOCABULARY_VERSION = 1
+# Reserved codes; vocabulary codes start at 0.
+UNSEEN = -1
+MISSING = -2
+CATEGORICAL_DTYPES = ["object", "string", "category"]
+
+
+def code_dtype(size):
+    """Return the smallest signed integer dtype holding codes 0..size-1 and the reserved codes."""
+    for dtype in (np.int8, np.int16, np.int32):
+        if size <= np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+class CategoricalEncoder:
+    """
+    Label encoder with persistent vocabularies.
+
+    Each column has a vocabulary: the list of values seen so far, where a value's code is
+    its position. New values are appended, so the codes of known values never change
+    between batches. Encoding hashes the values once with ``pd.factorize`` and only looks
+    up the distinct values in the vocabulary, so it is O(n) without sorting or converting
+    the column to strings. Codes use the smallest integer dtype that fits (int8, int16, ...).
+
+    Missing values get the code MISSING (-2). Values not in the vocabulary get UNSEEN (-1)
+    when the vocabulary is frozen (``extend=False``).
+
+    :param vocabularies: Optional dictionary mapping column names to lists of values.
+    """
+
+    def __init__(self, vocabularies=None):
+        self.vocabularies = {col: list(values) for col, values in (vocabularies or {}).items()}
+        self._indexes = {}
+
+    def _index(self, col):
+        index = self._indexes.get(col)
+        if index is None:
+            index = self._indexes[col] = pd.Index(self.vocabularies.get(col, []), dtype=object)
+        return index
+
+    def encode_column(self, values, col, extend=True):
+        """
+        Encode one column.
+
+        :param values: Series (or array) of values.
+        :param col: Name of the vocabulary to use.
+        :param extend: Add new values to the vocabulary; when False they are encoded as UNSEEN.
+        :return: NumPy array of codes.
+        """
+        values = pd.Series(values, copy=False)
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            # Codes and categories are already factorized; only the categories are looked up.
+            codes, uniques = values.cat.codes.to_numpy(), values.cat.categories
+        else:
+            codes, uniques = pd.factorize(values, use_na_sentinel=True)
+
+        index = self._index(col)
+        positions = index.get_indexer(pd.Index(uniques, dtype=object))
+        new = positions == -1
+        if extend and new.any():
+            added = [to_python(value) for value in np.asarray(uniques, dtype=object)[new]]
+            start = len(index)
+            self.vocabularies.setdefault(col, []).extend(added)
+            self._indexes.pop(col, None)
+            positions[new] = np.arange(start, start + len(added))
+
+        dtype = code_dtype(len(self.vocabularies.get(col, [])))
+        # One extra slot maps the missing-value sentinel (-1) to MISSING.
+        lookup = np.append(positions, MISSING).astype(dtype)
+        return lookup[codes]
+
+    def encode(self, df, columns=None, extend=True):
+        """
+        Encode several columns of a DataFrame.
+
+        :param df: Input DataFrame (not modified).
+        :param columns: Columns to encode, or None for all object, string and category columns.
+        :param extend: Add new values to the vocabularies; when False they are encoded as UNSEEN.
+        :return: Dictionary mapping column names to code arrays.
+        """
+        if columns is None:
+            columns = df.select_dtypes(include=CATEGORICAL_DTYPES).columns
+        return {col: self.encode_column(df[col], col, extend=extend) for col in columns}
+
+    def decode_column(self, codes, col):
+        """
+        Map codes back to values; reserved codes become None.
+
+        :return: Object array of values.
+        """
+        vocabulary = np.asarray(self.vocabularies.get(col, []) + [None], dtype=object)
+        codes = np.asarray(codes)
+        # Reserved (negative) codes point at the trailing None.
+        return vocabulary[np.where(codes >= 0, codes, len(vocabulary) - 1)]
+
+    def to_dict(self):
+        # Values other than strings, numbers and booleans (datetimes, Decimals, bytes, ...) are type-tagged.
+        vocabularies = {col: [encode_value(value) for value in values] for col, values in self.vocabularies.items()}
+        return {"version": VOCABULARY_VERSION, "vocabularies": vocabularies}
+
+    @classmethod
+    def from_dict(cls, content):
+        if content.get("version") != VOCABULARY_VERSION:
+            raise ValueError(f"Unsupported vocabulary version {content.get('version')!r}")
+        return cls({col: [decode_value(value) for value in values]
+                    for col, values in content["vocabularies"].items()})
+
+    def save(self, path):
+        """Write the vocabularies to a JSON file atomically."""
+        write_json_atomic(path, self.to_dict())
+
+    @classmethod
+    def load(cls, path):
+        """Load vocabularies saved with ``save``."""
+        with open(path) as file:
+            return cls.from_dict(json.load(file))
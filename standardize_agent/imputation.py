@@ -0,0 +1,126 @@
+import pandas as pd
+
+NUMERIC_STRATEGIES = ("mean", "median", "most_frequent")
+CATEGORICAL_STRATEGIES = ("most_frequent", None)
+DATETIME_STRATEGIES = ("ffill", "most_frequent", None)
+
+
+def group_columns(df, columns=None):
+    """
+    Split columns into the groups imputation treats differently.
+
+    :return: Dictionary with "numeric", "datetime" and "categorical" lists of column names.
+             Booleans and everything that is neither numerical nor datetime-like count as
+             categorical.
+    """
+    columns = list(df.columns if columns is None else columns)
+    groups = {"numeric": [], "datetime": [], "categorical": []}
+    for col in columns:
+        dtype = df[col].dtype
+        if pd.api.types.is_bool_dtype(dtype):
+            groups["categorical"].append(col)
+        elif pd.api.types.is_numeric_dtype(dtype):
+            groups["numeric"].append(col)
+        elif pd.api.types.is_datetime64_any_dtype(dtype) or pd.api.types.is_timedelta64_dtype(dtype):
+            groups["datetime"].append(col)
+        else:
+            groups["categorical"].append(col)
+    return groups
+
+
+def _most_frequent(series):
+    """Most frequent non-missing value; ties go to the smallest value, as in SimpleImputer."""
+    modes = series.mode(dropna=True)
+    return modes.iloc[0] if len(modes) else None
+
+
+def _numeric_fill_values(df, columns, strategy, stats):
+    if strategy == "mean":
+        if stats is not None:
+            return {col: stats[col].mean for col in columns}
+        return df[columns].mean().to_dict()
+    if strategy == "median":
+        return df[columns].median().to_dict()
+    return {col: _most_frequent(df[col]) for col in columns}
+
+
+def _needs_float(series, fill):
+    """Nullable integer columns cannot hold a fractional fill value."""
+    return (pd.api.types.is_integer_dtype(series.dtype) and isinstance(series.dtype, pd.api.extensions.ExtensionDtype)
+            and not float(fill).is_integer())
+
+
+def _fill_block(df, fills, widen=()):
+    """Fill several columns with one fillna call and assign them back."""
+    columns = list(fills)
+    block = df[columns]
+    if widen:
+        block = block.astype({col: "Float64" for col in widen})
+    df[columns] = block.fillna(fills)
+
+
+def impute_missing(df, strategy="mean", columns=None, categorical_strategy="most_frequent",
+                   datetime_strategy="ffill", stats=None):
+    """
+    Fill missing values group by group, keeping every column's dtype and the frame's index.
+
+    Only columns that contain missing values are touched; the others are neither copied
+    nor converted.
+
+    - numerical columns: ``strategy`` ("mean", "median" or "most_frequent")
+    - categorical, string, object and boolean columns: ``categorical_strategy`` (the mode)
+    - datetime and timedelta columns: ``datetime_strategy``; "ffill" carries the previous
+      value forward (leading gaps take the first value), "most_frequent" uses the mode
+
+    A group whose strategy is None is left as it is. Columns without any value keep their
+    missing values.
+
+    :param df: DataFrame to impute; replaced columns are assigned to it.
+    :param strategy: Strategy for numerical columns.
+    :param columns: Columns to impute, or None for all of them.
+    :param categorical_strategy: Strategy for categorical columns.
+    :param datetime_strategy: Strategy for datetime columns.
+    :param stats: Optional ColumnStats by column name; supplies null counts and means.
+    :return: List of the columns that were filled.
+    """
+    if strategy not in NUMERIC_STRATEGIES:
+        raise ValueError(f"Unsupported imputation strategy '{strategy}'. Supported: {', '.join(NUMERIC_STRATEGIES)}.")
+    if categorical_strategy not in CATEGORICAL_STRATEGIES:
+        raise ValueError(f"Unsupported categorical strategy '{categorical_strategy}'.")
+    if datetime_strategy not in DATETIME_STRATEGIES:
+        raise ValueError(f"Unsupported datetime strategy '{datetime_strategy}'.")
+
+    columns = list(df.columns if columns is None else columns)
+    if stats is not None:
+        with_missing = [col for col in columns if stats[col].null_count]
+    else:
+        null_counts = df[columns].isna().sum()
+        with_missing = [col for col in columns if null_counts[col]]
+    groups = group_columns(df, with_missing)
+
+    filled = []
+    if groups["numeric"]:
+        fills = _usable(_numeric_fill_values(df, groups["numeric"], strategy, stats))
+        if fills:
+            _fill_block(df, fills, widen=[col for col, fill in fills.items() if _needs_float(df[col], fill)])
+            filled.extend(fills)
+    if categorical_strategy is not None and groups["categorical"]:
+        fills = _usable({col: _most_frequent(df[col]) for col in groups["categorical"]})
+        if fills:
+            _fill_block(df, fills)
+            filled.extend(fills)
+    if datetime_strategy == "most_frequent" and groups["datetime"]:
+        fills = _usable({col: _most_frequent(df[col]) for col in groups["datetime"]})
+        if fills:
+            _fill_block(df, fills)
+            filled.extend(fills)
+    elif datetime_strategy == "ffill" and groups["datetime"]:
+        df[groups["datetime"]] = df[groups["datetime"]].ffill().bfill()
+        filled.extend(groups["datetime"])
+
+    return filled
+
+
+def _usable(fills):
+    """Drop columns without a fill value (columns that have no values at all)."""
+    return {col: fill for col, fill in fills.items() if fill is not None and not pd.isna(fill)}
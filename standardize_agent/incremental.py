@@ -0,0 +1,260 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from standardize_agent.serialization import decode_value, encode_value, to_python, write_json_atomic
+from standardize_agent.stats import ColumnStats, compute_column_stats, merge_column_stats
+
+STATE_VERSION = 1
+IMPUTE_STRATEGIES = ("mean", "most_frequent", "constant", None)
+SCALERS = ("standard", "minmax", None)
+
+
+class IncrementalPreprocessor:
+    """
+    Imputer and scaler fitted over a stream of DataFrame chunks instead of one in-memory
+    frame, for data that does not fit in RAM.
+
+    Pass 1 (``partial_fit`` / ``fit``) accumulates mergeable per-column statistics (and
+    value counts for "most_frequent") chunk by chunk. Pass 2 (``transform`` /
+    ``transform_chunks``) applies the fitted imputation and scaling to each chunk. The
+    result matches running ``handle_missing_data`` followed by ``standardize_numerical_columns``
+    or ``normalize_numerical_columns`` on the concatenated chunks: scaling parameters are
+    derived from the statistics of the imputed data.
+
+    The fitted state is JSON-serializable (``to_dict`` / ``save`` / ``load``), so later
+    batches can be transformed without refitting.
+
+    The "median" strategy is not supported, because an exact median cannot be merged
+    from per-chunk summaries.
+
+    :param impute_strategy: "mean", "most_frequent", "constant", or None to keep missing values.
+    :param scaler: "standard", "minmax", or None to skip scaling.
+    :param columns: Columns to process; defaults to the numerical columns of the first chunk
+                    (all of its columns for "most_frequent"/"constant" imputation without scaling).
+    :param fill_value: Value used by the "constant" strategy.
+    """
+
+    def __init__(self, impute_strategy="mean", scaler="standard", columns=None, fill_value=None):
+        if impute_strategy not in IMPUTE_STRATEGIES:
+            raise ValueError(f"Unsupported imputation strategy '{impute_strategy}' for incremental fitting. "
+                             f"Supported: mean, most_frequent, constant or None.")
+        if scaler not in SCALERS:
+            raise ValueError(f"Unsupported scaler '{scaler}'. Supported: standard, minmax or None.")
+        if impute_strategy == "constant" and fill_value is None:
+            raise ValueError("fill_value is required for the 'constant' strategy.")
+        self.impute_strategy = impute_strategy
+        self.scaler = scaler
+        self.columns = list(columns) if columns is not None else None
+        self.fill_value = fill_value
+
+        self.stats = {}
+        self.value_counts = {}
+        self.chunks_seen = 0
+        self._params = None
+
+    # Pass 1
+
+    def partial_fit(self, chunk):
+        """
+        Accumulate the statistics of one chunk.
+
+        :param chunk: DataFrame with (at least) the processed columns.
+        :return: self
+        """
+        if self.columns is None:
+            self.columns = self._default_columns(chunk)
+        chunk_stats = compute_column_stats(chunk, self.columns)
+        if self.scaler is not None or self.impute_strategy == "mean":
+            for col, col_stats in chunk_stats.items():
+                if col_stats.count == 0:
+                    # An all-NULL column comes back with object dtype; it adds no values, only nulls.
+                    chunk_stats[col] = ColumnStats(0, col_stats.null_count, None, 0.0, None, None)
+                elif not col_stats.numeric:
+                    raise ValueError(f"Column '{col}' is not numerical.")
+        if self.impute_strategy == "most_frequent":
+            for col in self.columns:
+                counts = self.value_counts.setdefault(col, {})
+                for value, count in chunk[col].value_counts(dropna=True).items():
+                    value = to_python(value)
+                    counts[value] = counts.get(value, 0) + int(count)
+
+        self.stats = merge_column_stats(self.stats, chunk_stats)
+        self.chunks_seen += 1
+        self._params = None
+        return self
+
+    def fit(self, chunks):
+        """
+        Fit on an iterable of DataFrame chunks, e.g. ``SQLAgent.iter_task(task)``.
+
+        :return: self
+        """
+        for chunk in chunks:
+            self.partial_fit(chunk)
+        return self
+
+    def _default_columns(self, chunk):
+        if self.impute_strategy in ("most_frequent", "constant") and self.scaler is None:
+            return list(chunk.columns)
+        return list(chunk.select_dtypes(include=[np.number]).columns)
+
+    @property
+    def fitted(self):
+        return self.chunks_seen > 0
+
+    def fill_values(self):
+        """
+        Return the value each column's missing entries are replaced with.
+
+        :return: Dictionary mapping column names to fill values (columns without one are omitted).
+        """
+        fills = {}
+        for col in self.columns or []:
+            if self.impute_strategy == "mean":
+                fill = self.stats[col].mean
+            elif self.impute_strategy == "most_frequent":
+                counts = self.value_counts.get(col)
+                # Ties go to the smallest value, as in SimpleImputer.
+                fill = min(counts.items(), key=lambda item: (-item[1], item[0]))[0] if counts else None
+            elif self.impute_strategy == "constant":
+                fill = self.fill_value
+            else:
+                fill = None
+            if fill is not None:
+                fills[col] = fill
+        return fills
+
+    def imputed_stats(self):
+        """
+        Return the column statistics of the data after imputation, derived from the fitted
+        statistics without another pass: the imputed entries are merged in as a constant block.
+        """
+        if self.impute_strategy is None:
+            return dict(self.stats)
+        fills = self.fill_values()
+        imputed = {}
+        for col, col_stats in self.stats.items():
+            fill = fills.get(col)
+            if fill is None or not col_stats.null_count or not col_stats.numeric:
+                imputed[col] = col_stats
+                continue
+            block = ColumnStats(col_stats.null_count, 0, float(fill), 0.0, float(fill), float(fill))
+            imputed[col] = ColumnStats(col_stats.count, 0, col_stats.mean, col_stats.m2,
+                                       col_stats.min, col_stats.max).merge(block)
+        return imputed
+
+    def scale_params(self):
+        """
+        Return the (offset, scale) pair applied as ``(x - offset) / scale`` to each scaled column.
+        Constant columns are left unscaled, as sklearn's scalers do.
+        """
+        if self._params is None:
+            self._check_fitted()
+            params = {}
+            if self.scaler is not None:
+                for col, col_stats in self.imputed_stats().items():
+                    if self.scaler == "standard":
+                        offset, scale = col_stats.mean, col_stats.std
+                    else:
+                        offset = col_stats.min
+                        scale = None if col_stats.min is None else col_stats.max - col_stats.min
+                    if offset is None:
+                        offset = 0.0
+                    if scale is None or not np.isfinite(scale) or scale <= 0:
+                        scale = 1.0
+                    params[col] = (float(offset), float(scale))
+            self._params = params
+        return self._params
+
+    # Pass 2
+
+    def transform(self, chunk):
+        """
+        Impute and scale one chunk with the fitted state.
+
+        :param chunk: DataFrame containing the fitted columns.
+        :return: New DataFrame; the input chunk is not modified. Scaled columns, and numerical
+                 columns imputed with "mean", are float64 in every chunk so that all chunks
+                 share one schema.
+        """
+        self._check_fitted()
+        chunk = chunk.copy(deep=False)
+        fills = self.fill_values()
+        params = self.scale_params()
+
+        float_cols = [col for col in self.columns
+                      if col in params or (self.impute_strategy == "mean" and col in fills)]
+        other_fills = {col: fill for col, fill in fills.items() if col not in float_cols}
+        if other_fills:
+            chunk[list(other_fills)] = chunk[list(other_fills)].fillna(other_fills)
+        if float_cols:
+            block = chunk[float_cols].astype(np.float64)
+            block_fills = {col: fills[col] for col in float_cols if col in fills}
+            if block_fills:
+                block = block.fillna(block_fills)
+            if params:
+                offsets = pd.Series({col: params[col][0] for col in float_cols if col in params})
+                scales = pd.Series({col: params[col][1] for col in float_cols if col in params})
+                scaled = list(offsets.index)
+                block[scaled] = (block[scaled] - offsets) / scales
+            chunk[float_cols] = block
+        return chunk
+
+    def transform_chunks(self, chunks):
+        """
+        Transform an iterable of chunks lazily.
+
+        :return: Generator of transformed DataFrames, accepted by ``ExporterAgent.export_data``.
+        """
+        for chunk in chunks:
+            yield self.transform(chunk)
+
+    def _check_fitted(self):
+        if not self.fitted:
+            raise ValueError("IncrementalPreprocessor is not fitted yet; call fit or partial_fit first.")
+
+    # Serialization
+
+    def to_dict(self):
+        """
+        Return the configuration and fitted state as a JSON-serializable dictionary.
+        """
+        return {
+            "version": STATE_VERSION,
+            "impute_strategy": self.impute_strategy,
+            "scaler": self.scaler,
+            "columns": self.columns,
+            "fill_value": encode_value(self.fill_value),
+            "chunks_seen": self.chunks_seen,
+            "stats": {col: col_stats.to_dict() for col, col_stats in self.stats.items()},
+            # Pairs instead of a mapping, so non-string values survive the JSON round trip.
+            "value_counts": {col: [[encode_value(value), count] for value, count in counts.items()]
+                             for col, counts in self.value_counts.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        """
+        Rebuild a preprocessor from ``to_dict`` output.
+        """
+        if state.get("version") != STATE_VERSION:
+            raise ValueError(f"Unsupported preprocessor state version {state.get('version')!r}")
+        preprocessor = cls(impute_strategy=state["impute_strategy"], scaler=state["scaler"],
+                           columns=state["columns"], fill_value=decode_value(state["fill_value"]))
+        preprocessor.chunks_seen = state["chunks_seen"]
+        preprocessor.stats = {col: ColumnStats.from_dict(values) for col, values in state["stats"].items()}
+        preprocessor.value_counts = {col: {decode_value(value): count for value, count in pairs}
+                                     for col, pairs in state["value_counts"].items()}
+        return preprocessor
+
+    def save(self, path):
+        """Write the fitted state to a JSON file atomically."""
+        write_json_atomic(path, self.to_dict())
+
+    @classmethod
+    def load(cls, path):
+        """Load a preprocessor saved with ``save``."""
+        with open(path) as file:
+            return cls.from_dict(json.load(file))
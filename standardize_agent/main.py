@@ -1,108 +1,270 @@
+import functools
+import logging
+import os
+import inspect
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import StandardScaler, MinMaxScaler
-from sklearn.impute import SimpleImputer
-from sklearn.preprocessing import LabelEncoder
+from standardize_agent.plan import TransformPlan
+from standardize_agent.stats import compute_column_stats
+from standardize_agent.incremental import IncrementalPreprocessor
+from standardize_agent.encoding import CategoricalEncoder
+from standardize_agent.compaction import CompactionPolicy, compact
+from standardize_agent.imputation import impute_missing
+from instrumentation.spans import frame_bytes, span
+
+logger = logging.getLogger(__name__)
+
+
+def outlier_keep_mask(df, z_threshold=3, stats=None):
+    """
+    Return a boolean array marking the rows whose numerical values all lie within
+    ``z_threshold`` standard deviations of their column mean.
+
+    Means and standard deviations (ddof=0, as in scipy's zscore) ignore missing values;
+    rows with a missing numerical value are not kept. A constant column has a z-score
+    of 0 for every row.
+
+    :param df: DataFrame to check (non-numerical columns are ignored).
+    :param z_threshold: Z-score threshold to consider as outliers.
+    :param stats: Optional precomputed ColumnStats of ``df`` by column name.
+    """
+    numerical_cols = list(df.select_dtypes(include=[np.number]).columns)
+    if not numerical_cols:
+        return np.ones(len(df), dtype=bool)
+    if stats is None:
+        stats = compute_column_stats(df, numerical_cols)
+    means = np.array([_or_nan(stats[col].mean) for col in numerical_cols])
+    stds = np.array([stats[col].std for col in numerical_cols])
+    stds = np.where(stds > 0, stds, np.inf)  # constant columns: z-score 0
+    values = df[numerical_cols].to_numpy(dtype=np.float64, na_value=np.nan)
+    with np.errstate(invalid="ignore"):
+        z_scores = np.abs(values - means) / stds
+        return (z_scores < z_threshold).all(axis=1)
+
+
+def _or_nan(value):
+    return np.nan if value is None else value
+
+
+def _or_zero(value):
+    return 0.0 if value is None else value
+
+
+def _nonzero_scale(scale):
+    """Constant (or empty) columns are left unscaled, as sklearn's scalers do."""
+    return scale if scale > 0 and np.isfinite(scale) else 1.0
+
+
+def lazy_step(method):
+    """
+    Record the call in the agent's plan instead of running it when the agent is lazy.
+    Eager calls run inside a "clean.<step>" span recording the rows and bytes of the result.
+    """
+    signature = inspect.signature(method)
+    span_name = f"clean.{method.__name__}"
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not self.lazy:
+            with span(span_name) as step_span:
+                result = method(self, *args, **kwargs)
+                if step_span.recording:
+                    step_span.set(rows=len(self.df), bytes=frame_bytes(self.df))
+            return result
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        arguments = dict(bound.arguments)
+        arguments.pop("self")
+        self.plan.add(method.__name__, arguments)
+        return self
+
+    return wrapper
+
 
 class DataFrameAgent:
-    def __init__(self, dataframe):
+    def __init__(self, dataframe, lazy=False):
         """
         Initialize the agent with the dataframe.
         
         :param dataframe: The input pandas DataFrame to operate on.
+        :param lazy: Record transformations instead of running them right away. The recorded
+                     plan is optimized and executed in one pass by ``get_dataframe``.
         """
         self.df = dataframe
+        self.lazy = lazy
+        self.plan = TransformPlan()
+        self.last_profile = []
+        self.encoder = None
+        self.last_compaction = None
+        self._stats = {}
 
-    def handle_missing_data(self, strategy='mean', columns=None):
+    def column_stats(self, columns=None):
         """
-        Handle missing data by imputing with a specified strategy.
+        Return per-column statistics (counts, null counts, mean, variance, min, max).
 
-        :param strategy: The imputation strategy ('mean', 'median', 'most_frequent').
-        :param columns: List of columns to apply imputation, or None to apply to all.
+        Statistics are computed in one vectorized pass for the columns that are not cached
+        yet and reused by the transforms until the columns they describe change.
+
+        :param columns: Columns to describe, or None for all columns.
+        :return: Dictionary mapping column names to ColumnStats.
         """
-        imputer = SimpleImputer(strategy=strategy)
-        if columns:
-            self.df[columns] = imputer.fit_transform(self.df[columns])
+        columns = list(self.df.columns if columns is None else columns)
+        missing = [col for col in columns if col not in self._stats]
+        if missing:
+            self._stats.update(compute_column_stats(self.df, missing))
+        return {col: self._stats[col] for col in columns}
+
+    def invalidate_stats(self, columns=None):
+        """
+        Drop cached statistics, e.g. after modifying ``self.df`` directly.
+
+        :param columns: Columns whose statistics are stale, or None for all of them.
+        """
+        if columns is None:
+            self._stats = {}
         else:
-            self.df = pd.DataFrame(imputer.fit_transform(self.df), columns=self.df.columns)
-        print(f"Missing data handled using {strategy} strategy.")
+            for col in columns:
+                self._stats.pop(col, None)
+
+    def _numerical_columns(self, columns):
+        if columns:
+            return list(columns)
+        return list(self.df.select_dtypes(include=[np.number]).columns)
+
+    def _rescale(self, columns, offsets, scales):
+        """Apply (x - offset) / scale per column and update the cached statistics accordingly."""
+        if not columns:
+            return
+        stats = self.column_stats(columns)
+        self.df[columns] = (self.df[columns] - pd.Series(offsets, index=columns)) / pd.Series(scales, index=columns)
+        for col, offset, scale in zip(columns, offsets, scales):
+            self._stats[col] = stats[col].affine(offset, scale)
 
+    def _require_numerical(self, stats):
+        for col, col_stats in stats.items():
+            if not col_stats.numeric:
+                raise ValueError(f"Column '{col}' is not numerical.")
+
+    @lazy_step
+    def handle_missing_data(self, strategy='mean', columns=None, categorical_strategy='most_frequent',
+                            datetime_strategy='ffill'):
+        """
+        Handle missing data by imputing each group of columns with a strategy suited to its dtype.
+        Columns keep their dtypes and the index is preserved; only columns with missing values
+        are replaced.
+
+        :param strategy: The imputation strategy for numerical columns ('mean', 'median', 'most_frequent').
+        :param columns: List of columns to apply imputation, or None to apply to all.
+        :param categorical_strategy: Strategy for string, categorical and boolean columns
+                                     ('most_frequent', or None to leave them alone).
+        :param datetime_strategy: Strategy for datetime columns ('ffill', 'most_frequent' or None).
+        """
+        target = list(columns) if columns else list(self.df.columns)
+        filled = impute_missing(self.df, strategy=strategy, columns=target, categorical_strategy=categorical_strategy,
+                                datetime_strategy=datetime_strategy, stats=self.column_stats(target))
+        self.invalidate_stats(filled)
+        logger.info("Missing data handled using %s strategy.", strategy)
+
+    @lazy_step
     def remove_duplicates(self):
         """
         Remove duplicate rows from the dataframe.
         """
         initial_shape = self.df.shape
         self.df.drop_duplicates(inplace=True)
-        print(f"Removed {initial_shape[0] - self.df.shape[0]} duplicate rows.")
+        if self.df.shape[0] != initial_shape[0]:
+            self.invalidate_stats()
+        logger.info("Removed %d duplicate rows.", initial_shape[0] - self.df.shape[0])
 
+    @lazy_step
     def remove_outliers(self, z_threshold=3):
         """
         Remove rows where numerical columns have outliers beyond a certain Z-score threshold.
         
         :param z_threshold: Z-score threshold to consider as outliers.
         """
-        from scipy.stats import zscore
-        numerical_cols = self.df.select_dtypes(include=[np.number]).columns
-        z_scores = np.abs(zscore(self.df[numerical_cols]))
-        self.df = self.df[(z_scores < z_threshold).all(axis=1)]
-        print(f"Outliers removed based on Z-score threshold {z_threshold}.")
+        numerical_cols = self._numerical_columns(None)
+        keep = outlier_keep_mask(self.df, z_threshold, stats=self.column_stats(numerical_cols))
+        if not keep.all():
+            self.df = self.df[keep]
+            self.invalidate_stats()
+        logger.info("Outliers removed based on Z-score threshold %s.", z_threshold)
 
-    def encode_categorical(self, columns=None):
+    @lazy_step
+    def encode_categorical(self, columns=None, encoder=None, vocabulary_path=None, extend=True):
         """
-        Encode categorical columns using label encoding.
-        
+        Encode categorical columns as compact integer codes.
+
+        Codes come from a CategoricalEncoder whose vocabularies persist across calls (and
+        across runs with ``vocabulary_path``), so a value gets the same code in every batch.
+        Missing values are encoded as -2 and, with ``extend=False``, unknown values as -1.
+
         :param columns: List of columns to encode, or None to apply to all categorical columns.
+        :param encoder: CategoricalEncoder to use instead of the agent's own one.
+        :param vocabulary_path: JSON file the vocabularies are loaded from (if it exists) and saved to.
+        :param extend: Add values that are not in the vocabulary yet instead of encoding them as unseen.
         """
-        if columns:
-            for col in columns:
-                encoder = LabelEncoder()
-                self.df[col] = encoder.fit_transform(self.df[col].astype(str))
-                print(f"Column '{col}' encoded.")
-        else:
-            categorical_cols = self.df.select_dtypes(include=[object]).columns
-            for col in categorical_cols:
-                encoder = LabelEncoder()
-                self.df[col] = encoder.fit_transform(self.df[col].astype(str))
-                print(f"Column '{col}' encoded.")
+        if encoder is None:
+            if self.encoder is None:
+                if vocabulary_path and os.path.exists(vocabulary_path):
+                    self.encoder = CategoricalEncoder.load(vocabulary_path)
+                else:
+                    self.encoder = CategoricalEncoder()
+            encoder = self.encoder
+
+        codes = encoder.encode(self.df, columns=columns, extend=extend)
+        for col, values in codes.items():
+            self.df[col] = values
+            logger.debug("Column '%s' encoded.", col)
+        self.invalidate_stats(list(codes))
+        if vocabulary_path:
+            encoder.save(vocabulary_path)
 
+    @lazy_step
     def normalize_numerical_columns(self, columns=None):
         """
         Normalize numerical columns using Min-Max scaling.
 
         :param columns: List of columns to normalize, or None to apply to all numerical columns.
         """
-        scaler = MinMaxScaler()
-        if columns:
-            self.df[columns] = scaler.fit_transform(self.df[columns])
-        else:
-            numerical_cols = self.df.select_dtypes(include=[np.number]).columns
-            self.df[numerical_cols] = scaler.fit_transform(self.df[numerical_cols])
-        print("Numerical columns normalized.")
+        numerical_cols = self._numerical_columns(columns)
+        stats = self.column_stats(numerical_cols)
+        self._require_numerical(stats)
+        offsets = [_or_zero(stats[col].min) for col in numerical_cols]
+        scales = [_nonzero_scale(_or_zero(stats[col].max) - _or_zero(stats[col].min)) for col in numerical_cols]
+        self._rescale(numerical_cols, offsets, scales)
+        logger.info("Numerical columns normalized.")
 
+    @lazy_step
     def standardize_numerical_columns(self, columns=None):
         """
         Standardize numerical columns to have zero mean and unit variance.
         
         :param columns: List of columns to standardize, or None to apply to all numerical columns.
         """
-        scaler = StandardScaler()
-        if columns:
-            self.df[columns] = scaler.fit_transform(self.df[columns])
-        else:
-            numerical_cols = self.df.select_dtypes(include=[np.number]).columns
-            self.df[numerical_cols] = scaler.fit_transform(self.df[numerical_cols])
-        print("Numerical columns standardized.")
+        numerical_cols = self._numerical_columns(columns)
+        stats = self.column_stats(numerical_cols)
+        self._require_numerical(stats)
+        offsets = [_or_zero(stats[col].mean) for col in numerical_cols]
+        scales = [_nonzero_scale(stats[col].std) for col in numerical_cols]
+        self._rescale(numerical_cols, offsets, scales)
+        logger.info("Numerical columns standardized.")
 
+    @lazy_step
     def filter_columns_by_valid_data(self, threshold=0.2):
         """
         Filter out columns with more than a certain percentage of missing data.
         
         :param threshold: Percentage of missing data allowed (e.g., 0.4 means 40% missing data).
         """
-        valid_cols = self.df.columns[self.df.isnull().mean() <= threshold]
-        self.df = self.df[valid_cols]
-        print(f"Columns with more than {threshold*100}% missing data filtered out.")
+        stats = self.column_stats()
+        valid_cols = [col for col in self.df.columns if stats[col].null_ratio <= threshold]
+        if len(valid_cols) != self.df.shape[1]:
+            self.df = self.df[valid_cols]
+            self.invalidate_stats([col for col in stats if col not in set(valid_cols)])
+        logger.info("Columns with more than %s%% missing data filtered out.", threshold * 100)
 
+    @lazy_step
     def generate_feature_interaction(self, col1, col2, new_col_name):
         """
         Create a new feature based on interaction between two columns.
@@ -112,8 +274,10 @@ class DataFrameAgent:
         :param new_col_name: The name of the new interaction column.
         """
         self.df[new_col_name] = self.df[col1] * self.df[col2]
-        print(f"New interaction feature '{new_col_name}' created between {col1} and {col2}.")
+        self.invalidate_stats([new_col_name])
+        logger.info("New interaction feature '%s' created between %s and %s.", new_col_name, col1, col2)
 
+    @lazy_step
     def handle_imbalance(self, method='undersample'):
         """
         Handle class imbalance if applicable (for classification tasks).
@@ -127,17 +291,122 @@ class DataFrameAgent:
             smote = SMOTE()
             X_res, y_res = smote.fit_resample(self.df.drop(columns='target'), self.df['target'])
             self.df = pd.concat([X_res, y_res], axis=1)
-            print("Data oversampled to handle imbalance.")
+            self.invalidate_stats()
+            logger.info("Data oversampled to handle imbalance.")
         elif method == 'undersample':
             undersampler = RandomUnderSampler()
             X_res, y_res = undersampler.fit_resample(self.df.drop(columns='target'), self.df['target'])
             self.df = pd.concat([X_res, y_res], axis=1)
-            print("Data undersampled to handle imbalance.")
+            self.invalidate_stats()
+            logger.info("Data undersampled to handle imbalance.")
+
+    @classmethod
+    def process_chunks(cls, chunks, steps):
+        """
+        Apply the same processing steps to every DataFrame of a chunked result,
+        e.g. the output of ``SQLAgent.iter_task``.
+
+        Each step only sees its own chunk, so row-wise steps (handle_missing_data,
+        remove_duplicates, remove_outliers, ...) are computed per chunk.
+
+        :param chunks: Iterable of DataFrames.
+        :param steps: List of method names, or (method_name, kwargs) tuples.
+        :return: Generator of processed DataFrames.
+        """
+        steps = [(step, {}) if isinstance(step, str) else step for step in steps]
+        for chunk in chunks:
+            agent = cls(dataframe=chunk)
+            for method_name, kwargs in steps:
+                getattr(agent, method_name)(**kwargs)
+            yield agent.get_dataframe()
+
+    @lazy_step
+    def compact(self, policy=None):
+        """
+        Reduce the memory used by the dataframe: downcast numerical columns, use nullable
+        integers for whole-number floats with NaN and categoricals for low-cardinality strings.
+        The per-column byte report is stored in ``last_compaction``.
+
+        :param policy: CompactionPolicy, or None for the default policy.
+        """
+        self.df, self.last_compaction = compact(self.df, policy or CompactionPolicy())
+        if self.last_compaction["applied"]:
+            self.invalidate_stats()
+        logger.info("Dataframe compacted from %d to %d bytes.", self.last_compaction["bytes_before"],
+                    self.last_compaction["bytes_after"])
+
+    @staticmethod
+    def fit_chunks(chunks, impute_strategy='mean', scaler='standard', columns=None, fill_value=None):
+        """
+        Pass 1 of out-of-core processing: fit imputation and scaling over a chunked result
+        (e.g. ``SQLAgent.iter_task``) without loading it into memory at once.
+
+        :param chunks: Iterable of DataFrames.
+        :param impute_strategy: 'mean', 'most_frequent', 'constant' or None.
+        :param scaler: 'standard', 'minmax' or None.
+        :param columns: Columns to process, or None for the numerical columns.
+        :param fill_value: Value for the 'constant' strategy.
+        :return: Fitted IncrementalPreprocessor; its state can be saved and reused later.
+        """
+        preprocessor = IncrementalPreprocessor(impute_strategy=impute_strategy, scaler=scaler,
+                                               columns=columns, fill_value=fill_value)
+        return preprocessor.fit(chunks)
+
+    @staticmethod
+    def transform_chunks(chunks, preprocessor, sink=None):
+        """
+        Pass 2 of out-of-core processing: transform chunks with a fitted preprocessor.
+
+        :param chunks: Iterable of DataFrames (a fresh iterator, not the one used for fitting).
+        :param preprocessor: Fitted IncrementalPreprocessor, or the path of a saved one.
+        :param sink: Optional ExporterAgent; the transformed chunks are streamed to it.
+        :return: The sink's export response, or a generator of transformed DataFrames.
+        """
+        if isinstance(preprocessor, str):
+            preprocessor = IncrementalPreprocessor.load(preprocessor)
+        transformed = preprocessor.transform_chunks(chunks)
+        if sink is None:
+            return transformed
+        return sink.export_data(transformed)
+
+    def explain(self):
+        """
+        Describe the recorded plan of a lazy agent and how it will be optimized.
+        """
+        return self.plan.explain()
+
+    def execute_plan(self):
+        """
+        Optimize and run the recorded plan of a lazy agent. Per-step timings, row and
+        column counts and frame sizes are stored in ``last_profile``.
+        """
+        if not len(self.plan):
+            return
+        # One eager agent runs every step, starting from this agent's encoder and statistics,
+        # which are taken back afterwards as if the steps had run eagerly here.
+        runner = DataFrameAgent(self.df)
+        runner.encoder, runner._stats = self.encoder, self._stats
+
+        def step_agent(df):
+            if df is not runner.df:
+                # The plan filtered rows itself; the cached statistics describe the old frame.
+                runner.df = df
+                runner.invalidate_stats()
+            return runner
+
+        self.df, self.last_profile = self.plan.execute(self.df, step_agent, outlier_keep_mask)
+        self.plan.clear()
+        step_agent(self.df)
+        self.encoder, self._stats = runner.encoder, runner._stats
+        if runner.last_compaction is not None:
+            self.last_compaction = runner.last_compaction
 
     def get_dataframe(self):
         """
         Return the processed DataFrame.
         """
+        if self.lazy:
+            self.execute_plan()
         return self.df
 
 
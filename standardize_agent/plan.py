@@ -0,0 +1,212 @@
+import logging
+import time
+
+import numpy as np
+
+from instrumentation.spans import frame_bytes, span
+
+logger = logging.getLogger(__name__)
+
+# Steps that only drop rows, based on the values of each row.
+ROW_FILTER_STEPS = ("remove_duplicates", "remove_outliers")
+# Steps that rescale columns affinely; they keep NaNs where they are.
+SCALER_STEPS = ("normalize_numerical_columns", "standardize_numerical_columns")
+COLUMN_PRUNING_STEPS = ("filter_columns_by_valid_data",)
+
+
+class PlanStep:
+    """A recorded DataFrameAgent call."""
+
+    def __init__(self, name, kwargs):
+        self.name = name
+        self.kwargs = dict(kwargs)
+        self.notes = []
+        # Set when column pruning was moved in front of this step; explicitly listed
+        # columns that were pruned meanwhile are then skipped instead of failing.
+        self.skip_missing_columns = False
+
+    def describe(self):
+        args = ", ".join(f"{key}={value!r}" for key, value in self.kwargs.items())
+        return f"{self.name}({args})"
+
+
+class FusedRowFilter:
+    """Consecutive row filters evaluated as one boolean mask and applied with a single copy."""
+
+    name = "fused_row_filter"
+
+    def __init__(self, steps):
+        self.steps = steps
+        self.notes = []
+
+    def describe(self):
+        return "fused row filter [" + ", ".join(step.describe() for step in self.steps) + "]"
+
+
+class TransformPlan:
+    """
+    Recorded DataFrameAgent transformations, optimized and executed in one go.
+
+    The optimizer only applies rewrites that do not change the result:
+    - column pruning (filter_columns_by_valid_data) is moved in front of directly
+      preceding scalers, which keep NaN positions, so the scalers skip columns that
+      would be dropped anyway. It is never moved across row filters, imputation or
+      encoding, because those change the null ratios it is based on.
+    - a scaler directly followed by another scaler on the same columns is removed;
+      min-max and standard scaling are both invariant to a prior affine rescaling.
+    - repeated remove_duplicates calls collapse into one.
+    - runs of row filters are fused: every filter is evaluated on the rows kept so
+      far, but the frame is only copied once at the end of the run.
+    """
+
+    def __init__(self):
+        self.steps = []
+
+    def add(self, name, kwargs):
+        """Record a transformation."""
+        self.steps.append(PlanStep(name, kwargs))
+
+    def clear(self):
+        self.steps = []
+
+    def __len__(self):
+        return len(self.steps)
+
+    def optimize(self):
+        """
+        Return the optimized list of steps (PlanStep / FusedRowFilter), leaving the
+        recorded plan untouched.
+        """
+        steps = [PlanStep(step.name, step.kwargs) for step in self.steps]
+        steps = self._hoist_column_pruning(steps)
+        steps = self._fuse_scalers(steps)
+        steps = self._collapse_duplicate_removal(steps)
+        return self._fuse_row_filters(steps)
+
+    @staticmethod
+    def _hoist_column_pruning(steps):
+        for i in range(len(steps)):
+            if steps[i].name not in COLUMN_PRUNING_STEPS:
+                continue
+            j = i
+            while j > 0 and steps[j - 1].name in SCALER_STEPS:
+                scaler = steps[j - 1]
+                scaler.skip_missing_columns = True
+                steps[j - 1], steps[j] = steps[j], scaler
+                steps[j - 1].notes.append(f"moved before {scaler.name}")
+                j -= 1
+        return steps
+
+    @staticmethod
+    def _fuse_scalers(steps):
+        fused = []
+        for step in steps:
+            previous = fused[-1] if fused else None
+            if (previous is not None and step.name in SCALER_STEPS and previous.name in SCALER_STEPS
+                    and previous.kwargs.get("columns") == step.kwargs.get("columns")):
+                fused.pop()
+                step.skip_missing_columns = step.skip_missing_columns or previous.skip_missing_columns
+                step.notes.append(f"replaces {previous.name}")
+            fused.append(step)
+        return fused
+
+    @staticmethod
+    def _collapse_duplicate_removal(steps):
+        collapsed = []
+        for step in steps:
+            if step.name == "remove_duplicates" and collapsed and collapsed[-1].name == "remove_duplicates":
+                collapsed[-1].notes.append("repeated call removed")
+                continue
+            collapsed.append(step)
+        return collapsed
+
+    @staticmethod
+    def _fuse_row_filters(steps):
+        fused, run = [], []
+        for step in steps + [None]:
+            if step is not None and step.name in ROW_FILTER_STEPS:
+                run.append(step)
+                continue
+            if run:
+                fused.append(FusedRowFilter(run))
+                run = []
+            if step is not None:
+                fused.append(step)
+        return fused
+
+    def explain(self):
+        """
+        Describe the recorded plan and the optimized plan that will run.
+
+        :return: Multi-line string.
+        """
+        lines = ["Recorded plan:"]
+        lines += [f"  {i}. {step.describe()}" for i, step in enumerate(self.steps, 1)] or ["  (empty)"]
+        lines.append("Optimized plan:")
+        optimized = self.optimize()
+        for i, step in enumerate(optimized, 1):
+            notes = f"  -- {'; '.join(step.notes)}" if step.notes else ""
+            lines.append(f"  {i}. {step.describe()}{notes}")
+        if not optimized:
+            lines.append("  (empty)")
+        return "\n".join(lines)
+
+    def execute(self, df, agent_factory, outlier_keep_mask):
+        """
+        Run the optimized plan on a DataFrame.
+
+        :param df: Input DataFrame.
+        :param agent_factory: Callable returning the eager DataFrameAgent that runs a step on a
+                              DataFrame; it may hand out the same agent for every step.
+        :param outlier_keep_mask: Callable (df, z_threshold) -> boolean array of rows to keep.
+        :return: Tuple (DataFrame, profile) where profile lists per-step seconds, rows,
+                 columns and shallow frame bytes.
+        """
+        profile = []
+        for step in self.optimize():
+            started = time.perf_counter()
+            if isinstance(step, FusedRowFilter):
+                with span("clean.fused_row_filter") as filter_span:
+                    df = self._apply_row_filters(df, step.steps, outlier_keep_mask)
+                    if filter_span.recording:
+                        filter_span.set(rows=len(df), bytes=frame_bytes(df))
+            else:
+                kwargs = dict(step.kwargs)
+                if step.skip_missing_columns and kwargs.get("columns"):
+                    kwargs["columns"] = [col for col in kwargs["columns"] if col in df.columns]
+                    if not kwargs["columns"]:
+                        profile.append(self._profile_entry(step, started, df, skipped=True))
+                        continue
+                agent = agent_factory(df)
+                getattr(agent, step.name)(**kwargs)
+                df = agent.get_dataframe()
+            profile.append(self._profile_entry(step, started, df))
+        return df, profile
+
+    @staticmethod
+    def _apply_row_filters(df, steps, outlier_keep_mask):
+        keep = np.ones(len(df), dtype=bool)
+        for step in steps:
+            if step.name == "remove_duplicates":
+                # A row whose first copy was filtered out earlier has the same values
+                # as that copy and was filtered too, so duplicates can be found on
+                # the full frame.
+                keep &= ~df.duplicated().to_numpy()
+            else:
+                numeric = df.select_dtypes(include=[np.number]).columns
+                sub_keep = outlier_keep_mask(df.loc[keep, numeric], **step.kwargs)
+                keep[keep] = sub_keep
+        removed = len(df) - int(keep.sum())
+        logger.info("Fused row filter removed %d rows.", removed)
+        return df[keep] if removed else df
+
+    @staticmethod
+    def _profile_entry(step, started, df, skipped=False):
+        return {
+            "step": step.describe(),
+            "seconds": time.perf_counter() - started,
+            "rows": len(df),
+            "columns": df.shape[1],
+            "frame_bytes": int(df.memory_usage(index=True, deep=False).sum()),
+            "skipped": skipped,
+        }
@@ -0,0 +1,77 @@
+import base64
+import datetime
+import json
+import os
+import tempfile
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+
+# Values JSON stores natively; everything else is written as {"type": ..., "value": ...}.
+JSON_TYPES = (str, bool, int, float, type(None))
+# Tag, type and (encode, decode) pair of every other supported value type. More specific types come first
+# (pd.Timestamp is a datetime, and datetime is a date).
+TAGGED_TYPES = (
+    ("timestamp", pd.Timestamp, (pd.Timestamp.isoformat, pd.Timestamp)),
+    ("datetime", datetime.datetime, (datetime.datetime.isoformat, datetime.datetime.fromisoformat)),
+    ("date", datetime.date, (datetime.date.isoformat, datetime.date.fromisoformat)),
+    ("time", datetime.time, (datetime.time.isoformat, datetime.time.fromisoformat)),
+    ("timedelta", pd.Timedelta, (pd.Timedelta.isoformat, pd.Timedelta)),
+    ("decimal", Decimal, (str, Decimal)),
+    ("bytes", bytes, (lambda value: base64.b64encode(value).decode("ascii"), base64.b64decode)),
+)
+
+
+def write_json_atomic(path, content):
+    """Write JSON to a temporary file and move it into place, so readers never see a partial file."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".part")
+    try:
+        with os.fdopen(fd, "w") as file:
+            json.dump(content, file, indent=2)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def to_python(value):
+    """Turn NumPy scalars into plain Python (or pandas) values so they can be written as JSON."""
+    if isinstance(value, np.datetime64):
+        # .item() turns nanosecond datetimes into integers.
+        return pd.Timestamp(value)
+    if isinstance(value, np.timedelta64):
+        return pd.Timedelta(value)
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def encode_value(value):
+    """
+    Turn a scalar into a JSON value that ``decode_value`` restores with its type.
+
+    :param value: str, bool, int, float, None, NumPy scalar, datetime, date, time, pd.Timestamp,
+                  pd.Timedelta, Decimal or bytes.
+    :return: The value itself when JSON stores it natively, otherwise {"type": tag, "value": text}.
+    """
+    value = to_python(value)
+    if isinstance(value, JSON_TYPES):
+        return value
+    if isinstance(value, datetime.timedelta) and not isinstance(value, pd.Timedelta):
+        value = pd.Timedelta(value)
+    for tag, value_type, (encode, _) in TAGGED_TYPES:
+        if isinstance(value, value_type):
+            return {"type": tag, "value": encode(value)}
+    raise TypeError(f"Cannot serialize value of type {type(value).__name__}: {value!r}")
+
+
+def decode_value(content):
+    """Restore a value written by ``encode_value``."""
+    if not isinstance(content, dict):
+        return content
+    for tag, _, (_, decode) in TAGGED_TYPES:
+        if tag == content.get("type"):
+            return decode(content["value"])
+    raise ValueError(f"Unknown value type {content.get('type')!r}")
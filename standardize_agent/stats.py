@@ -0,0 +1,185 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+class ColumnStats:
+    """
+    Summary statistics of one column: non-null count, null count, mean, sum of squared
+    deviations (M2), min and max. Statistics of disjoint parts of a column (chunks of
+    rows) can be combined exactly with ``merge``, using the parallel variance formula
+    of Chan et al., so they can be built over streamed chunks.
+
+    Non-numerical columns only carry counts; their mean, M2, min and max are None.
+    """
+
+    __slots__ = ("count", "null_count", "mean", "m2", "min", "max")
+
+    def __init__(self, count=0, null_count=0, mean=None, m2=None, min=None, max=None):
+        self.count = count
+        self.null_count = null_count
+        self.mean = mean
+        self.m2 = m2
+        self.min = min
+        self.max = max
+
+    @property
+    def numeric(self):
+        return self.mean is not None or (self.count == 0 and self.m2 is not None)
+
+    @property
+    def rows(self):
+        return self.count + self.null_count
+
+    @property
+    def null_ratio(self):
+        return self.null_count / self.rows if self.rows else float("nan")
+
+    @property
+    def variance(self):
+        """Population variance (ddof=0), as used by scipy's zscore and StandardScaler."""
+        if self.m2 is None or self.count == 0:
+            return float("nan")
+        return self.m2 / self.count
+
+    @property
+    def std(self):
+        return float(np.sqrt(self.variance))
+
+    def merge(self, other):
+        """
+        Combine the statistics of two disjoint sets of rows of the same column.
+
+        :return: New ColumnStats describing both.
+        """
+        count = self.count + other.count
+        null_count = self.null_count + other.null_count
+        if self.count == 0 or other.count == 0:
+            # A side without values (e.g. an all-NULL chunk) only adds nulls; keep the statistics
+            # of the other side, and prefer numeric ones when neither has values.
+            base = other if self.count == 0 and (other.count or other.m2 is not None) else self
+            return ColumnStats(count, null_count, base.mean, base.m2, base.min, base.max)
+        if self.m2 is None or other.m2 is None:
+            return ColumnStats(count, null_count)
+        delta = other.mean - self.mean
+        mean = self.mean + delta * other.count / count
+        m2 = self.m2 + other.m2 + delta * delta * self.count * other.count / count
+        return ColumnStats(count, null_count, mean, m2, min(self.min, other.min), max(self.max, other.max))
+
+    def affine(self, offset, scale):
+        """
+        Statistics of the column after ``(x - offset) / scale``, without rescanning it.
+
+        :param offset: Value subtracted from every entry.
+        :param scale: Positive value every entry is divided by.
+        """
+        if self.m2 is None or self.count == 0:
+            return ColumnStats(self.count, self.null_count, self.mean, self.m2, self.min, self.max)
+        return ColumnStats(
+            self.count,
+            self.null_count,
+            (self.mean - offset) / scale,
+            self.m2 / (scale * scale),
+            (self.min - offset) / scale,
+            (self.max - offset) / scale,
+        )
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, values):
+        return cls(**values)
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"ColumnStats({fields})"
+
+
+def _numeric_block_stats(df, columns):
+    """Compute stats for a block of numerical columns with vectorized reductions."""
+    values = df[columns].to_numpy(dtype=np.float64, na_value=np.nan)
+    missing = np.isnan(values)
+    counts = values.shape[0] - missing.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = np.nansum(values, axis=0) / counts
+        deviations = values - means
+        deviations[missing] = 0.0
+        m2 = np.einsum("ij,ij->j", deviations, deviations)
+    has_values = counts > 0
+    mins = np.full(len(columns), np.nan)
+    maxs = np.full(len(columns), np.nan)
+    if has_values.any():
+        mins[has_values] = np.nanmin(values[:, has_values], axis=0)
+        maxs[has_values] = np.nanmax(values[:, has_values], axis=0)
+
+    stats = {}
+    for i, col in enumerate(columns):
+        count = int(counts[i])
+        if count == 0:
+            stats[col] = ColumnStats(0, int(missing[:, i].sum()), None, 0.0, None, None)
+        else:
+            stats[col] = ColumnStats(count, values.shape[0] - count, float(means[i]), float(m2[i]),
+                                     float(mins[i]), float(maxs[i]))
+    return stats
+
+
+def compute_column_stats(df, columns=None, workers=1, block_size=64):
+    """
+    Compute ColumnStats for the given columns of a DataFrame.
+
+    Numerical columns are processed in blocks: each block is converted to one float
+    array once and all statistics are derived from it with vectorized reductions.
+    Other columns only get their null counts.
+
+    :param df: DataFrame to summarize.
+    :param columns: Columns to summarize (all columns when None).
+    :param workers: Number of threads processing column blocks in parallel.
+    :param block_size: Number of numerical columns per block.
+    :return: Dictionary mapping column names to ColumnStats.
+    """
+    columns = list(df.columns if columns is None else columns)
+    numeric_columns = set(df[columns].select_dtypes(include=[np.number]).columns)
+
+    stats = {}
+    other = [col for col in columns if col not in numeric_columns]
+    if other:
+        null_counts = df[other].isnull().sum()
+        for col in other:
+            stats[col] = ColumnStats(len(df) - int(null_counts[col]), int(null_counts[col]))
+
+    numeric = [col for col in columns if col in numeric_columns]
+    blocks = [numeric[i:i + block_size] for i in range(0, len(numeric), block_size)]
+    if workers > 1 and len(blocks) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for block_stats in executor.map(lambda block: _numeric_block_stats(df, block), blocks):
+                stats.update(block_stats)
+    else:
+        for block in blocks:
+            stats.update(_numeric_block_stats(df, block))
+
+    return {col: stats[col] for col in columns}
+
+
+def merge_column_stats(left, right):
+    """
+    Merge two dictionaries of ColumnStats computed over disjoint rows of the same columns.
+
+    :return: Dictionary of merged ColumnStats (columns present in only one side are kept as is).
+    """
+    merged = dict(left)
+    for col, stats in right.items():
+        merged[col] = merged[col].merge(stats) if col in merged else stats
+    return merged
+
+
+def stats_from_chunks(chunks, columns=None, workers=1):
+    """
+    Build ColumnStats over an iterable of DataFrame chunks (e.g. ``SQLAgent.iter_task``).
+
+    :return: Dictionary mapping column names to ColumnStats for all rows of all chunks.
+    """
+    total = {}
+    for chunk in chunks:
+        total = merge_column_stats(total, compute_column_stats(chunk, columns=columns, workers=workers))
+    return total
@@ -0,0 +1,40 @@
+import datetime
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+
+from standardize_agent.encoding import UNSEEN, CategoricalEncoder
+from standardize_agent.incremental import IncrementalPreprocessor
+
+
+def test_vocabularies_of_any_value_type_survive_saving(tmp_path):
+    df = pd.DataFrame({
+        "day": pd.Series([datetime.date(2024, 1, 2), datetime.date(2024, 1, 3)], dtype=object),
+        "created_at": pd.to_datetime(["2024-01-02 03:04:05.000000001", "2024-01-03 00:00:00.000000000"]),
+        "price": pd.Series([Decimal("0.10"), Decimal("12345678901234567.89")], dtype=object),
+        "payload": pd.Series([b"\x00\xff", b"abc"], dtype=object),
+        "code": pd.Series(["web", "1"], dtype=object),
+        "mixed": pd.Series([1, "1"], dtype=object),
+    })
+    encoder = CategoricalEncoder()
+    codes = encoder.encode(df, columns=df.columns)
+    path = str(tmp_path / "vocabulary.json")
+    encoder.save(path)
+
+    loaded = CategoricalEncoder.load(path)
+    assert loaded.vocabularies == encoder.vocabularies
+    for col in df.columns:
+        assert [type(value) for value in loaded.vocabularies[col]] == [type(value) for value in encoder.vocabularies[col]]
+        np.testing.assert_array_equal(loaded.encode_column(df[col], col, extend=False), codes[col])
+    assert loaded.encode_column(pd.Series([Decimal("0.1")], dtype=object), "price", extend=False)[0] != UNSEEN
+
+
+def test_most_frequent_datetimes_survive_saving(tmp_path):
+    df = pd.DataFrame({"created_at": pd.to_datetime(["2024-01-02", "2024-01-02", None])})
+    preprocessor = IncrementalPreprocessor(impute_strategy="most_frequent", scaler=None).partial_fit(df)
+    path = str(tmp_path / "state.json")
+    preprocessor.save(path)
+    loaded = IncrementalPreprocessor.load(path)
+    pd.testing.assert_frame_equal(loaded.transform(df), preprocessor.transform(df))
+    assert loaded.transform(df)["created_at"].isna().sum() == 0
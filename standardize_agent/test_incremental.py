@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from standardize_agent.incremental import IncrementalPreprocessor
+from standardize_agent.stats import ColumnStats, compute_column_stats
+
+
+def chunks_with_null_chunk():
+    """Chunks as iter_task yields them: the middle chunk's "b" is all NULL and arrives as object None."""
+    yield pd.DataFrame({"a": [1.0, 2.0], "b": [10.0, np.nan]})
+    yield pd.DataFrame({"a": [3.0, None], "b": [None, None]})
+    yield pd.DataFrame({"a": [4.0], "b": [30.0]})
+
+
+@pytest.mark.parametrize("scaler", ["standard", "minmax"])
+def test_fit_with_an_all_null_chunk_matches_the_concatenated_data(scaler):
+    preprocessor = IncrementalPreprocessor(impute_strategy="mean", scaler=scaler, columns=["a", "b"])
+    preprocessor.fit(chunks_with_null_chunk())
+    assert preprocessor.stats["b"].count == 2 and preprocessor.stats["b"].null_count == 3
+    assert preprocessor.stats["b"].mean == pytest.approx(20.0)
+
+    whole = pd.concat(list(chunks_with_null_chunk()), ignore_index=True).astype(np.float64)
+    expected = whole.fillna(whole.mean())
+    if scaler == "standard":
+        expected = (expected - expected.mean()) / expected.std(ddof=0)
+    else:
+        expected = (expected - expected.min()) / (expected.max() - expected.min())
+    transformed = pd.concat(preprocessor.transform_chunks(chunks_with_null_chunk()), ignore_index=True)
+    pd.testing.assert_frame_equal(transformed, expected)
+
+
+def test_first_chunk_all_null_still_fits():
+    preprocessor = IncrementalPreprocessor(columns=["b"])
+    preprocessor.partial_fit(pd.DataFrame({"b": [None, None]}))
+    preprocessor.partial_fit(pd.DataFrame({"b": [1.0, 3.0]}))
+    assert preprocessor.stats["b"].numeric
+    assert (preprocessor.stats["b"].count, preprocessor.stats["b"].null_count) == (2, 2)
+    assert preprocessor.fill_values() == {"b": 2.0}
+
+
+def test_text_columns_are_still_rejected():
+    preprocessor = IncrementalPreprocessor(columns=["name"])
+    with pytest.raises(ValueError, match="not numerical"):
+        preprocessor.partial_fit(pd.DataFrame({"name": ["x", None]}))
+
+
+def test_merge_keeps_numeric_stats_next_to_empty_sides():
+    values = compute_column_stats(pd.DataFrame({"b": [1.0, 3.0]}))["b"]
+    for empty in (ColumnStats(0, 2), ColumnStats(0, 2, None, 0.0)):
+        for merged in (values.merge(empty), empty.merge(values)):
+            assert (merged.count, merged.null_count, merged.mean, merged.m2) == (2, 2, 2.0, 2.0)
+            assert (merged.min, merged.max) == (1.0, 3.0)
+    assert ColumnStats(0, 1).merge(ColumnStats(0, 1, None, 0.0)).numeric
+    assert not ColumnStats(2, 0).merge(values).numeric
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from standardize_agent.encoding import CategoricalEncoder
+from standardize_agent.main import DataFrameAgent
+from standardize_agent.stats import compute_column_stats
+
+
+def sample_frame(seed=0, rows=300):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "amount": rng.normal(100, 20, rows),
+        "count": rng.integers(0, 50, rows).astype(np.float64),
+        "sparse": np.where(rng.random(rows) < 0.6, np.nan, rng.normal(0, 1, rows)),
+        "code": rng.choice(["web", "app", "agent"], rows).astype(object),
+    })
+    df.loc[::17, "amount"] = np.nan
+    df.loc[5, "amount"] = 10000.0  # outlier
+    return pd.concat([df, df.iloc[:20]], ignore_index=True)  # duplicates
+
+
+STEPS = [
+    ("handle_missing_data", {"columns": ["amount", "count", "code"]}),
+    ("remove_duplicates", {}),
+    ("remove_duplicates", {}),
+    ("remove_outliers", {"z_threshold": 3}),
+    ("encode_categorical", {}),
+    ("normalize_numerical_columns", {"columns": ["amount", "count", "sparse"]}),
+    ("standardize_numerical_columns", {"columns": ["amount", "count", "sparse"]}),
+    ("filter_columns_by_valid_data", {"threshold": 0.5}),
+    ("generate_feature_interaction", {"col1": "amount", "col2": "count", "new_col_name": "product"}),
+    ("compact", {}),
+]
+
+
+def run(agent, steps=STEPS):
+    for name, kwargs in steps:
+        getattr(agent, name)(**kwargs)
+    return agent.get_dataframe()
+
+
+def test_optimized_plan_matches_eager_execution():
+    eager = DataFrameAgent(sample_frame())
+    lazy = DataFrameAgent(sample_frame(), lazy=True)
+    expected = run(eager)
+    result = run(lazy)
+    pd.testing.assert_frame_equal(result, expected)
+    assert lazy.encoder.vocabularies == eager.encoder.vocabularies
+    assert lazy.last_compaction == eager.last_compaction
+
+
+def test_explain_shows_the_rewrites():
+    lazy = DataFrameAgent(sample_frame(), lazy=True)
+    for name, kwargs in STEPS:
+        getattr(lazy, name)(**kwargs)
+    plan = lazy.explain()
+    assert "moved before" in plan and "replaces normalize_numerical_columns" in plan
+    assert "fused row filter [remove_duplicates(), remove_outliers(z_threshold=3)]" in plan
+
+
+def test_lazy_encoding_uses_and_updates_the_agents_encoder(tmp_path):
+    encoder = CategoricalEncoder({"code": ["kiosk"]})
+    first = DataFrameAgent(pd.DataFrame({"code": ["web", "kiosk"]}), lazy=True)
+    first.encoder = encoder
+    first.encode_categorical()
+    assert first.get_dataframe()["code"].tolist() == [1, 0]
+    assert first.encoder is encoder and encoder.vocabularies == {"code": ["kiosk", "web"]}
+
+    path = str(tmp_path / "vocabulary.json")
+    second = DataFrameAgent(pd.DataFrame({"code": ["app", "web"]}), lazy=True)
+    second.encode_categorical(vocabulary_path=path)
+    second.get_dataframe()
+    third = DataFrameAgent(pd.DataFrame({"code": ["web", "app"]}), lazy=True)
+    third.encode_categorical(vocabulary_path=path)
+    assert third.get_dataframe()["code"].tolist() == [1, 0]
+    assert third.encoder.vocabularies == {"code": ["app", "web"]}
+
+
+def test_statistics_cache_is_shared_with_the_plan():
+    lazy = DataFrameAgent(sample_frame(), lazy=True)
+    lazy.column_stats(["count"])
+    lazy.normalize_numerical_columns(columns=["count"])
+    lazy.remove_outliers()
+    df = lazy.get_dataframe()
+    # Statistics cached before and during the plan still describe the resulting frame.
+    expected = compute_column_stats(df)
+    for col, col_stats in lazy.column_stats().items():
+        assert col_stats.count == expected[col].count
+        if col_stats.numeric:
+            assert col_stats.mean == pytest.approx(expected[col].mean)
+            assert col_stats.std == pytest.approx(expected[col].std)
@@ -1,68 +1,153 @@
+import logging
 import tkinter as tk
 from tkinter import ttk
 import pandas as pd
+from ui_agent.paging import DataFramePageSource, SQLPageSource
+
+# Delay between redraws while rows are still being fetched in the background.
+PENDING_REFRESH_MS = 30
+
+logger = logging.getLogger(__name__)
+
+
+def _format_cell(value):
+    if value is None or (isinstance(value, float) and value != value):
+        return ""
+    return value
+
 
 class SQLVisualizerAgentUI:
     def __init__(self, sql_agent):
         """
         Initialize SQLVisualizerAgentUI with the given SQLAgent instance.
         This allows for a UI-based visualization of SQL query results.
-        
+
         :param sql_agent: Instance of the SQLAgent for querying the database
         """
         self.sql_agent = sql_agent
 
-    def display_table_in_ui(self, df, title="Table Visualization"):
+    def display_table_in_ui(self, df, title="Table Visualization", visible_rows=30):
         """
         Display the table in a Tkinter UI window.
-        
+
+        Only the rows in view are inserted into the widget, so large frames open right away.
+
         :param df: Pandas DataFrame to be displayed.
         :param title: Title of the window.
+        :param visible_rows: Number of rows shown at once.
+        """
+        self.display_source_in_ui(DataFramePageSource(df), title=title, visible_rows=visible_rows)
+
+    def display_source_in_ui(self, source, title="Table Visualization", visible_rows=30):
+        """
+        Display rows from a page source (DataFramePageSource or SQLPageSource) in a virtualized
+        Tkinter table: the Treeview only ever holds the visible rows, and scrolling replaces them.
+
+        :param source: Object with ``columns``, ``total_rows``, ``rows(start, stop)`` and ``close()``.
+        :param title: Title of the window.
+        :param visible_rows: Number of rows shown at once.
         """
         root = tk.Tk()
-        root.title(title)
+        root.title(f"{title} ({source.total_rows} rows)")
 
         frame = ttk.Frame(root)
         frame.pack(fill="both", expand=True)
 
-        tree = ttk.Treeview(frame, columns=list(df.columns), show="headings")
-        
-        for col in df.columns:
+        tree = ttk.Treeview(frame, columns=source.columns, show="headings", height=visible_rows)
+
+        for col in source.columns:
             tree.heading(col, text=col)
             tree.column(col, width=100, anchor="center")
 
-        for index, row in df.iterrows():
-            tree.insert("", "end", values=list(row))
+        state = {"offset": 0, "refresh": None}
+
+        def render():
+            state["refresh"] = None
+            last_offset = max(0, source.total_rows - visible_rows)
+            state["offset"] = offset = max(0, min(state["offset"], last_offset))
+            try:
+                rows, error = source.rows(offset, offset + visible_rows), None
+            except Exception as e:
+                rows, error = [], e
+            tree.delete(*tree.get_children())
+            if error is not None:
+                # Show the failure instead of polling for rows that will not arrive; scrolling retries.
+                logger.error("Could not load rows %d to %d: %s", offset, offset + visible_rows, error)
+                tree.insert("", "end", values=[f"Error: {error}"] + [""] * (len(source.columns) - 1))
+            elif rows is None:
+                # Rows are being fetched; show placeholders and try again shortly.
+                for _ in range(min(visible_rows, source.total_rows - offset)):
+                    tree.insert("", "end", values=["…"] * len(source.columns))
+                state["refresh"] = root.after(PENDING_REFRESH_MS, render)
+            else:
+                for row in rows:
+                    tree.insert("", "end", values=[_format_cell(value) for value in row])
+            if source.total_rows:
+                scroll_y.set(offset / source.total_rows, min(1.0, (offset + visible_rows) / source.total_rows))
+            else:
+                scroll_y.set(0.0, 1.0)
+
+        def scroll_to(offset):
+            state["offset"] = offset
+            if state["refresh"] is not None:
+                root.after_cancel(state["refresh"])
+            render()
+
+        def on_scrollbar(*args):
+            if args[0] == "moveto":
+                scroll_to(int(float(args[1]) * source.total_rows))
+            elif args[0] == "scroll":
+                step = visible_rows if args[2] == "pages" else 1
+                scroll_to(state["offset"] + int(args[1]) * step)
+
+        def on_wheel(event):
+            if getattr(event, "num", None) == 4 or event.delta > 0:
+                scroll_to(state["offset"] - 3)
+            else:
+                scroll_to(state["offset"] + 3)
+            return "break"
 
-        scroll_y = ttk.Scrollbar(frame, orient="vertical", command=tree.yview)
+        scroll_y = ttk.Scrollbar(frame, orient="vertical", command=on_scrollbar)
         scroll_y.pack(side="right", fill="y")
-        tree.configure(yscrollcommand=scroll_y.set)
 
         scroll_x = ttk.Scrollbar(frame, orient="horizontal", command=tree.xview)
         scroll_x.pack(side="bottom", fill="x")
         tree.configure(xscrollcommand=scroll_x.set)
 
+        tree.bind("<MouseWheel>", on_wheel)
+        tree.bind("<Button-4>", on_wheel)
+        tree.bind("<Button-5>", on_wheel)
+        tree.bind("<Prior>", lambda event: scroll_to(state["offset"] - visible_rows))
+        tree.bind("<Next>", lambda event: scroll_to(state["offset"] + visible_rows))
+
         tree.pack(fill="both", expand=True)
 
+        def on_close():
+            source.close()
+            root.destroy()
+
+        root.protocol("WM_DELETE_WINDOW", on_close)
+        render()
         root.mainloop()
 
-    def visualize_table_in_ui(self, table_name):
+    def visualize_table_in_ui(self, table_name, condition="1=1", key_column=None, page_rows=200, max_pages=32):
         """
-        Fetch the table from the database and display it in a Tkinter UI window.
-        
+        Display a whole database table (or the rows matching ``condition``) in a Tkinter UI window.
+
+        Rows are read page by page with keyset pagination as the user scrolls, with an LRU of
+        ``max_pages`` pages and background prefetching of the neighbouring pages.
+
         :param table_name: Name of the table to visualize.
+        :param condition: SQL condition restricting the displayed rows.
+        :param key_column: Unique integer column to paginate on; discovered when omitted.
+        :param page_rows: Rows fetched per page.
+        :param max_pages: Maximum number of pages kept in memory.
         """
-        task = {
-            "operation": "select_all", 
-            "args": {
-                "table_name": table_name
-            }
-        }
-        
-        result = self.sql_agent.execute_task(task)
-        
-        if result["status"] == "success":
-            df = result["data"]
-            self.display_table_in_ui(df, title=f"Table: {table_name}")
-        else:
-            print(f"Error fetching data for {table_name}: {result['message']}")
+        try:
+            source = SQLPageSource(self.sql_agent, table_name, condition=condition, key_column=key_column,
+                                   page_rows=page_rows, max_pages=max_pages)
+        except Exception as e:
+            logger.error("Error fetching data for %s: %s", table_name, e)
+            return
+
+        self.display_source_in_ui(source, title=f"Table: {table_name}")
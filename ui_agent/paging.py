@@ -0,0 +1,224 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+# Marks a page that starts past the last row.
+_PAST_END = object()
+
+logger = logging.getLogger(__name__)
+
+
+def _page_rows(df):
+    """Turn a page DataFrame into a list of row tuples once, so rendering never touches pandas."""
+    return list(df.itertuples(index=False, name=None))
+
+
+class DataFramePageSource:
+    """
+    Row source for the table viewer backed by an in-memory DataFrame. Rows are sliced on
+    demand instead of being inserted into the widget up front.
+
+    :param df: DataFrame to display.
+    """
+
+    def __init__(self, df):
+        self.df = df
+        self.columns = [str(col) for col in df.columns]
+        self.total_rows = len(df)
+
+    def rows(self, start, stop, wait=False):
+        """Return the row tuples in [start, stop)."""
+        return _page_rows(self.df.iloc[start:stop])
+
+    def stats(self):
+        return {"total_rows": self.total_rows}
+
+    def close(self):
+        pass
+
+
+class SQLPageSource:
+    """
+    Row source for the table viewer that reads a table page by page with keyset pagination
+    (``SQLAgent.fetch_page``).
+
+    Pages are kept in an LRU of at most ``max_pages`` entries. Pages are fetched on worker
+    threads: requesting rows that are not loaded yet starts their fetch and, unless
+    ``wait`` is set, returns None right away so the UI can show placeholders and retry.
+    After every request the ``prefetch_pages`` pages on either side are fetched in the
+    background as well. A failed fetch is reported by raising its error from the next request
+    for that page; the request after that fetches the page again.
+
+    Scrolling page by page seeks on the last key of the previous page. Jumping to a page
+    whose predecessor was never loaded first looks up its start key with an index-only
+    query (``SQLAgent.key_at_offset``).
+
+    :param sql_agent: SQLAgent used for the queries.
+    :param table_name: Table to display.
+    :param condition: SQL condition restricting the rows.
+    :param key_column: Unique integer column to paginate on; discovered when omitted.
+    :param page_rows: Rows per page.
+    :param max_pages: Maximum number of pages kept in memory.
+    :param prefetch_pages: Pages fetched ahead of and behind the requested rows.
+    :param workers: Number of background fetch threads.
+    """
+
+    def __init__(self, sql_agent, table_name, condition="1=1", key_column=None, page_rows=200, max_pages=32,
+                 prefetch_pages=2, workers=2):
+        self.sql_agent = sql_agent
+        self.table_name = table_name
+        self.key_column = key_column or sql_agent.find_key_column(table_name)
+        if self.key_column is None:
+            raise ValueError(f"Table '{table_name}' has no unique integer key to paginate on.")
+        self.condition = f"({condition}) AND {self.key_column} IS NOT NULL"
+        self.page_rows = page_rows
+        self.max_pages = max(max_pages, 2 * prefetch_pages + 2)
+        self.prefetch_pages = prefetch_pages
+
+        self._pages = OrderedDict()
+        self._pending = {}
+        self._errors = {}
+        # Exclusive start key of each page whose predecessor was loaded.
+        self._after = {0: None}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="page-fetch")
+        self._stats = {"hits": 0, "misses": 0, "fetches": 0, "errors": 0, "evictions": 0, "seeks": 0,
+                       "fetch_seconds": 0.0}
+
+        self.total_rows = sql_agent.count_rows(table_name, self.condition)
+        first = self.sql_agent.fetch_page(self.table_name, self.key_column, limit=self.page_rows,
+                                          condition=self.condition)
+        self.columns = [str(col) for col in first.columns]
+        self._store(0, first)
+
+    def page_count(self):
+        return -(-self.total_rows // self.page_rows)
+
+    def rows(self, start, stop, wait=False):
+        """
+        Return the row tuples in [start, stop).
+
+        :param wait: Block until missing pages are fetched instead of returning None.
+        :return: List of row tuples, or None when some of the rows are still being fetched.
+        :raises Exception: The error of a failed page fetch.
+        """
+        start, stop = max(0, start), min(stop, self.total_rows)
+        if start >= stop:
+            return []
+        first_page, last_page = start // self.page_rows, (stop - 1) // self.page_rows
+        pages = [self.page(index, wait=wait) for index in range(first_page, last_page + 1)]
+        self.prefetch(first_page - self.prefetch_pages, last_page + self.prefetch_pages)
+        if any(page is None for page in pages):
+            return None
+        rows = [row for page in pages for row in page]
+        offset = start - first_page * self.page_rows
+        return rows[offset:offset + stop - start]
+
+    def page(self, index, wait=True):
+        """
+        Return the rows of one page, fetching it if needed.
+
+        :param wait: Block until the page is fetched; otherwise return None while it is loading.
+        :raises Exception: The error of the page's last fetch, if it failed.
+        """
+        with self._lock:
+            page = self._pages.get(index)
+            if page is not None:
+                self._pages.move_to_end(index)
+                self._stats["hits"] += 1
+                return page
+            error = self._errors.pop(index, None)
+            if error is not None:
+                raise error
+            self._stats["misses"] += 1
+            future = self._submit(index)
+        if not wait:
+            return None
+        try:
+            future.result()
+        except Exception:
+            with self._lock:
+                self._errors.pop(index, None)
+            raise
+        with self._lock:
+            return self._pages.get(index, [])
+
+    def prefetch(self, first_page, last_page):
+        """Start background fetches for the pages in [first_page, last_page] that are not loaded (or failed)."""
+        with self._lock:
+            for index in range(max(0, first_page), min(last_page, self.page_count() - 1) + 1):
+                if index not in self._pages and index not in self._errors:
+                    self._submit(index)
+
+    def _submit(self, index):
+        """Start fetching a page unless that is already under way. Caller holds the lock."""
+        future = self._pending.get(index)
+        if future is None:
+            future = self._pending[index] = self._executor.submit(self._load, index)
+        return future
+
+    def _load(self, index):
+        started = time.perf_counter()
+        try:
+            after = self._start_after(index)
+            if after is _PAST_END:
+                df = pd.DataFrame(columns=self.columns)
+            else:
+                df = self.sql_agent.fetch_page(self.table_name, self.key_column, after=after,
+                                               limit=self.page_rows, condition=self.condition)
+            with self._lock:
+                self._stats["fetches"] += 1
+                self._stats["fetch_seconds"] += time.perf_counter() - started
+                self._store(index, df)
+        except Exception as e:
+            logger.warning("Fetching page %d of %s failed: %s", index, self.table_name, e)
+            with self._lock:
+                self._errors[index] = e
+                self._stats["errors"] += 1
+            raise
+        finally:
+            with self._lock:
+                self._pending.pop(index, None)
+
+    def _start_after(self, index):
+        with self._lock:
+            if index in self._after:
+                return self._after[index]
+        key = self.sql_agent.key_at_offset(self.table_name, self.key_column, index * self.page_rows, self.condition)
+        with self._lock:
+            self._stats["seeks"] += 1
+        if key is None:
+            return _PAST_END
+        # Integer keys: the page starts right after the previous integer.
+        return int(key) - 1
+
+    def _store(self, index, df):
+        """Add a fetched page to the LRU. Caller holds the lock (or is the constructor)."""
+        if not df.empty:
+            self._after[index + 1] = df[self.key_column].iloc[-1]
+        self._pages[index] = _page_rows(df)
+        self._pages.move_to_end(index)
+        while len(self._pages) > self.max_pages:
+            self._pages.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def stats(self):
+        """
+        Return page cache counters.
+
+        :return: Dictionary with hits, misses, fetches, failed fetches, evictions, seeks, fetch time and the
+                 number of cached pages.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["cached_pages"] = len(self._pages)
+        stats["total_rows"] = self.total_rows
+        return stats
+
+    def close(self):
+        """Stop the background fetches."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,69 @@
+import time
+
+import pytest
+
+from db_read_agent.executor_agent import SQLAgent
+from ui_agent.paging import SQLPageSource
+
+
+@pytest.fixture
+def pages(standin):
+    source = SQLPageSource(SQLAgent({}), "booking_origins", key_column="id", page_rows=20, prefetch_pages=0)
+    yield source
+    source.close()
+
+
+def fail_fetches(patch, source):
+    def fetch_page(*args, **kwargs):
+        raise RuntimeError("connection lost")
+
+    patch.setattr(source.sql_agent, "fetch_page", fetch_page)
+
+
+def poll(source, start, stop, timeout=5):
+    """Call rows(wait=False) the way the table viewer's render loop does, until it stops returning None."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        rows = source.rows(start, stop)
+        if rows is not None:
+            return rows
+        time.sleep(0.01)
+    raise AssertionError("rows never arrived")
+
+
+def test_rows_are_paged_by_key(pages):
+    rows = pages.rows(30, 50, wait=True)
+    assert [row[0] for row in rows] == list(range(31, 51))
+    assert [row[0] for row in poll(pages, 190, 200)] == list(range(191, 201))
+
+
+def test_failed_background_fetch_is_raised_instead_of_polled_forever(pages, monkeypatch):
+    with monkeypatch.context() as patch:
+        fail_fetches(patch, pages)
+        with pytest.raises(RuntimeError, match="connection lost"):
+            poll(pages, 100, 120)
+    assert pages.stats()["errors"] == 1
+    assert [row[0] for row in poll(pages, 100, 120)] == list(range(101, 121))
+
+
+def test_failed_blocking_fetch_is_raised_once(pages, monkeypatch):
+    with monkeypatch.context() as patch:
+        fail_fetches(patch, pages)
+        with pytest.raises(RuntimeError):
+            pages.page(3, wait=True)
+    assert [row[0] for row in pages.page(3, wait=True)] == list(range(61, 81))
+
+
+def test_failed_prefetch_is_not_retried_in_a_loop(standin, monkeypatch):
+    source = SQLPageSource(SQLAgent({}), "booking_origins", key_column="id", page_rows=20, prefetch_pages=1)
+    fail_fetches(monkeypatch, source)
+    poll(source, 0, 20)  # page 0 is loaded; the prefetch of page 1 fails
+    deadline = time.monotonic() + 5
+    while source.stats()["errors"] < 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    source.prefetch(0, 1)
+    source._executor.shutdown(wait=True)
+    assert source.stats()["errors"] == 1
+    with pytest.raises(RuntimeError):
+        source.rows(20, 40)
+    source.close()
@@ -0,0 +1,253 @@
+import logging
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import multiprocessing
+
+import pandas as pd
+
+from instrumentation.spans import record_span, span
+
+logger = logging.getLogger(__name__)
+
+IMAGE_FORMATS = ("png", "svg")
+MAX_CELL_CHARS = 40
+
+
+def use_headless_backend():
+    """Switch matplotlib to the non-interactive Agg backend (no display, no blocking show())."""
+    import matplotlib
+    matplotlib.use("Agg", force=True)
+
+
+def safe_filename(name):
+    return re.sub(r"[^\w.-]+", "_", str(name)).strip("_") or "chart"
+
+
+def _cell_text(value, max_chars):
+    if value is None or (pd.api.types.is_scalar(value) and pd.isna(value)):
+        return ""
+    text = str(value)
+    return text if len(text) <= max_chars else text[:max_chars - 1] + "…"
+
+
+def prepare_table(df, max_rows=30, max_cell_chars=MAX_CELL_CHARS):
+    """
+    Reduce a frame to what a table image can show: the first ``max_rows`` rows with long
+    cells truncated, all as strings.
+
+    :return: Tuple (cell_text, column_labels, truncated) where ``truncated`` tells whether rows were dropped.
+    """
+    cells = [[_cell_text(value, max_cell_chars) for value in row]
+             for row in df.head(max_rows).itertuples(index=False, name=None)]
+    return cells, [str(col) for col in df.columns], len(df) > max_rows
+
+
+def prepare_bars(df, label_column=None, value_column=None, top_n=30):
+    """
+    Reduce a (label, value) frame, e.g. a ``group_by_count`` result, to the ``top_n`` largest
+    bars; the remaining values are summed into an "other" bar.
+
+    :return: Tuple (labels, values).
+    """
+    label_column = label_column or df.columns[0]
+    value_column = value_column or df.columns[-1]
+    series = df.set_index(label_column)[value_column]
+    series = series.groupby(level=0, dropna=False, sort=False).sum()
+    top = series.nlargest(top_n)
+    labels = ["(null)" if pd.isna(label) else str(label) for label in top.index]
+    values = [float(value) for value in top.to_numpy()]
+    rest = series.drop(top.index)
+    if len(rest):
+        labels.append(f"other ({len(rest)})")
+        values.append(float(rest.sum()))
+    return labels, values
+
+
+def render_chart(spec):
+    """
+    Draw one prepared chart and write it to disk. Runs in a worker process.
+
+    The figure is built on matplotlib's object API with an Agg canvas, so no pyplot state
+    or window is involved.
+
+    :param spec: Dictionary with ``kind`` ("table" or "bar"), ``title``, ``path``, ``dpi`` and
+                 the prepared data (``cells``/``columns`` or ``labels``/``values``).
+    :return: Dictionary with status, path and render seconds.
+    """
+    started = time.perf_counter()
+    try:
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+        if spec["kind"] == "bar":
+            height = max(3.0, 0.3 * len(spec["labels"]) + 1)
+            fig = Figure(figsize=(8, height))
+            FigureCanvasAgg(fig)
+            ax = fig.add_subplot()
+            ax.barh(spec["labels"][::-1], spec["values"][::-1])
+            ax.set_xlabel(spec.get("value_label", "count"))
+        else:
+            height = max(2.0, 0.25 * (len(spec["cells"]) + 2))
+            fig = Figure(figsize=(max(8, 1.2 * len(spec["columns"])), height))
+            FigureCanvasAgg(fig)
+            ax = fig.add_subplot()
+            ax.axis("off")
+            if spec["cells"]:
+                table = ax.table(cellText=spec["cells"], colLabels=spec["columns"], loc="center", cellLoc="center",
+                                 colLoc="center")
+                table.auto_set_font_size(False)
+                table.set_fontsize(8)
+        title = spec["title"] + (" (first rows)" if spec.get("truncated") else "")
+        ax.set_title(title)
+        fig.savefig(spec["path"], bbox_inches="tight", dpi=spec.get("dpi", 150))
+        return {"status": "success", "path": spec["path"], "render_seconds": time.perf_counter() - started}
+    except Exception as e:
+        return {"status": "error", "path": spec.get("path"), "message": str(e),
+                "render_seconds": time.perf_counter() - started}
+
+
+class BatchChartRenderer:
+    """
+    Render many report charts headlessly, in parallel.
+
+    Items are fetched on a thread pool (one query per item, sharing the SQLAgent's
+    connections) and reduced in the parent process: ``group_by_count`` tasks become bar
+    charts of the top values, everything else becomes a table image of the first rows.
+    Only the reduced data is sent to a pool of worker processes that draw the figures
+    with the Agg backend and write PNG or SVG files.
+
+    :param sql_agent: SQLAgent used to fetch the items (a pooled agent lets fetches run concurrently).
+    :param output_dir: Directory the images are written to.
+    :param image_format: "png" or "svg".
+    :param workers: Number of render processes (defaults to the number of CPUs).
+    :param fetch_workers: Number of concurrent fetches.
+    :param max_rows: Rows shown in table images; table names and task queries drawn as tables
+                     are fetched with this LIMIT.
+    :param top_n: Bars shown in bar charts before the rest is grouped as "other".
+    :param dpi: Resolution of PNG images.
+    """
+
+    def __init__(self, sql_agent=None, output_dir="reports", image_format="png", workers=None, fetch_workers=4,
+                 max_rows=30, top_n=30, dpi=150):
+        if image_format not in IMAGE_FORMATS:
+            raise ValueError(f"Unsupported image format '{image_format}'. Supported: {', '.join(IMAGE_FORMATS)}.")
+        self.sql_agent = sql_agent
+        self.output_dir = output_dir
+        self.image_format = image_format
+        self.workers = workers or os.cpu_count() or 1
+        self.fetch_workers = fetch_workers
+        self.max_rows = max_rows
+        self.top_n = top_n
+        self.dpi = dpi
+
+    def _item_name(self, item):
+        if isinstance(item, str):
+            return item
+        if isinstance(item, tuple):
+            return item[0]
+        args = item.get("args", {})
+        return item.get("name") or "_".join(str(part) for part in (args.get("table_name"), item.get("operation"),
+                                                                   args.get("group_column")) if part)
+
+    def _fetch(self, item):
+        """Return (DataFrame, task or None) for an item."""
+        if isinstance(item, tuple):
+            return item[1], None
+        if isinstance(item, str):
+            df = self.sql_agent.execute_sql(f"SELECT * FROM {item} LIMIT {int(self.max_rows) + 1};")
+            return df, None
+        if item.get("operation") != "group_by_count":
+            # Only the first rows end up in the table image, so only those are read.
+            query = self.sql_agent.generate_sql_query(item).strip().rstrip(";")
+            if query.upper().startswith("SELECT"):
+                limited = f"SELECT * FROM ({query}) AS chart_rows LIMIT {int(self.max_rows) + 1};"
+                return self.sql_agent.execute_sql(limited), item
+        # Bar charts sum the groups past the top ones into "other", so they need every group.
+        result = self.sql_agent.execute_task(item)
+        if result["status"] != "success":
+            raise RuntimeError(result["message"])
+        return result["data"], item
+
+    def _prepare(self, name, df, task, path):
+        spec = {"title": name, "path": path, "dpi": self.dpi}
+        if task is not None and task.get("operation") == "group_by_count" and df.shape[1] >= 2:
+            labels, values = prepare_bars(df, top_n=self.top_n)
+            spec.update(kind="bar", labels=labels, values=values, value_label=str(df.columns[-1]))
+        else:
+            cells, columns, truncated = prepare_table(df, self.max_rows)
+            spec.update(kind="table", cells=cells, columns=columns, truncated=truncated)
+        return spec
+
+    def render(self, items):
+        """
+        Render a chart for every item.
+
+        :param items: List of table names, task dictionaries (as for ``SQLAgent.execute_task``;
+                      an optional "name" key sets the file name) or (name, DataFrame) tuples.
+        :return: List of result dictionaries (name, status, path or message, fetch and render
+                 seconds) in the order of ``items``.
+        """
+        with span("render_batch", items=len(items)) as batch_span:
+            results = self._render(items)
+            batch_span.set(rows=sum(1 for result in results if result["status"] == "success"))
+        failed = sum(1 for result in results if result["status"] != "success")
+        logger.info("Rendered %d charts to %s (%d failed).", len(results) - failed, self.output_dir, failed)
+        return results
+
+    def _render(self, items):
+        os.makedirs(self.output_dir, exist_ok=True)
+        names = self._unique_names([self._item_name(item) for item in items])
+        results = [None] * len(items)
+        render_futures = {}
+
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=context,
+                                 initializer=use_headless_backend) as renderers, \
+                ThreadPoolExecutor(max_workers=self.fetch_workers, thread_name_prefix="chart-fetch") as fetchers:
+            fetch_futures = [fetchers.submit(self._timed_fetch, item) for item in items]
+            for position, future in enumerate(fetch_futures):
+                name = names[position]
+                try:
+                    df, task, fetch_seconds = future.result()
+                    path = os.path.join(self.output_dir, f"{safe_filename(name)}.{self.image_format}")
+                    spec = self._prepare(name, df, task, path)
+                except Exception as e:
+                    results[position] = {"name": name, "status": "error", "message": str(e)}
+                    continue
+                render_futures[position] = (renderers.submit(render_chart, spec), fetch_seconds)
+
+            for position, (future, fetch_seconds) in render_futures.items():
+                result = future.result()
+                result.update(name=names[position], fetch_seconds=fetch_seconds)
+                results[position] = result
+                # Charts are drawn in worker processes; their timings are recorded here.
+                record_span("render", result["render_seconds"], error=result.get("message"), chart=names[position],
+                            bytes=os.path.getsize(result["path"]) if result["status"] == "success" else None)
+        return results
+
+    @staticmethod
+    def _unique_names(names):
+        """
+        Suffix repeated names so that every chart gets its own file. Names are compared by their
+        file name, and suffixes skip the file names of every item in the batch.
+        """
+        taken = {safe_filename(name) for name in names}
+        used, unique = set(), []
+        for name in names:
+            stem = safe_filename(name)
+            if stem in used:
+                suffix = 2
+                while f"{stem}_{suffix}" in taken:
+                    suffix += 1
+                name, stem = f"{name}_{suffix}", f"{stem}_{suffix}"
+                taken.add(stem)
+            used.add(stem)
+            unique.append(name)
+        return unique
+
+    def _timed_fetch(self, item):
+        started = time.perf_counter()
+        df, task = self._fetch(item)
+        return df, task, time.perf_counter() - started
@@ -1,5 +1,9 @@
-import matplotlib.pyplot as plt
+import logging
 import pandas as pd
+from visualizer_agent.batch import BatchChartRenderer, prepare_table
+from instrumentation.spans import span
+
+logger = logging.getLogger(__name__)
 
 class SQLVisualizerAgent:
     def __init__(self, sql_agent):
@@ -11,21 +15,47 @@ class SQLVisualizerAgent:
         """
         self.sql_agent = sql_agent
 
-    def plot_table(self, df, title="Table Visualization"):
+    def plot_table(self, df, title="Table Visualization", path=None, show=True, max_rows=30):
         """
         Visualize the DataFrame as a table using matplotlib.
-        
+
         :param df: Pandas DataFrame to be visualized.
         :param title: Title of the plot window.
+        :param path: File the figure is saved to (defaults to "<title>.png").
+        :param show: Open the figure in a window after saving it.
+        :param max_rows: Only the first rows are drawn; matplotlib draws every cell as a separate artist.
+        """
+        import matplotlib.pyplot as plt
+        path = path or f"{title}.png"
+        with span("render", kind="table", path=path) as render_span:
+            cells, columns, truncated = prepare_table(df, max_rows)
+            fig, ax = plt.subplots(figsize=(8, 6))
+            ax.axis('tight')
+            ax.axis('off')
+            ax.table(cellText=cells or None, colLabels=columns, loc='center', cellLoc='center', colLoc='center')
+            plt.title(title + (" (first rows)" if truncated else ""))
+            # Save before showing: show() blocks and the figure is gone once its window is closed.
+            plt.savefig(path, bbox_inches='tight', dpi=300)
+            render_span.set(rows=len(cells))
+        if show:
+            plt.show()
+        plt.close(fig)
+
+    def render_batch(self, items, output_dir="reports", image_format="png", workers=None, **options):
+        """
+        Render charts for many tables or tasks headlessly, in parallel worker processes.
+
+        :param items: Table names, task dictionaries or (name, DataFrame) tuples, see ``BatchChartRenderer.render``.
+        :param output_dir: Directory the images are written to.
+        :param image_format: "png" or "svg".
+        :param workers: Number of render processes (defaults to the number of CPUs).
+        :param options: Further BatchChartRenderer options (max_rows, top_n, dpi, fetch_workers).
+        :return: List of per-item result dictionaries.
         """
-        fig, ax = plt.subplots(figsize=(8, 6))  
-        ax.axis('tight')
-        ax.axis('off')
-        ax.table(cellText=df.values, colLabels=df.columns, loc='center', cellLoc='center', colLoc='center')
-        plt.title(title)
-        plt.show()
-        plt.savefig(f"{title}.png", bbox_inches='tight', dpi=300)
-    
+        renderer = BatchChartRenderer(self.sql_agent, output_dir=output_dir, image_format=image_format,
+                                      workers=workers, **options)
+        return renderer.render(items)
+
     def visualize_table(self, table_name):
         """
         Fetch the table from the database and visualize it.
@@ -45,4 +75,4 @@ class SQLVisualizerAgent:
             df = result["data"]
             self.plot_table(df, title=f"Table: {table_name}")
         else:
-            print(f"Error fetching data for {table_name}: {result['message']}")
+            logger.error("Error fetching data for %s: %s", table_name, result["message"])
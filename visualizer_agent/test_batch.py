@@ -0,0 +1,53 @@
+import os
+
+import pandas as pd
+import pytest
+
+from db_read_agent.executor_agent import SQLAgent
+from visualizer_agent.batch import BatchChartRenderer, safe_filename
+
+
+@pytest.mark.parametrize("names, expected", [
+    (["a", "a", "a"], ["a", "a_2", "a_3"]),
+    (["a", "a", "a_2"], ["a", "a_3", "a_2"]),
+    (["a_2", "a", "a"], ["a_2", "a", "a_3"]),
+    (["a b", "a_b", "b"], ["a b", "a_b_2", "b"]),
+])
+def test_unique_names_never_collide(names, expected):
+    unique = BatchChartRenderer._unique_names(names)
+    assert unique == expected
+    assert len({safe_filename(name) for name in unique}) == len(names)
+
+
+@pytest.fixture
+def renderer(standin, tmp_path):
+    agent = SQLAgent({})
+    queries = []
+    execute_sql = agent.execute_sql
+    agent.execute_sql = lambda query: queries.append(query) or execute_sql(query)
+    renderer = BatchChartRenderer(agent, output_dir=str(tmp_path / "charts"), max_rows=10, workers=1)
+    renderer.queries = queries
+    return renderer
+
+
+def test_table_tasks_are_fetched_with_a_limit(renderer):
+    task = {"operation": "select_with_condition",
+            "args": {"table_name": "booking_origins", "group_column": "id", "condition": "amount > 100"}}
+    df, fetched_task = renderer._fetch(task)
+    assert len(df) == 11 and fetched_task is task
+    assert renderer.queries[-1].endswith("LIMIT 11;")
+
+
+def test_bar_tasks_fetch_every_group(renderer):
+    task = {"operation": "group_by_count",
+            "args": {"table_name": "booking_origins", "group_column": "customer_id", "condition": "1=1",
+                     "sort_column": "count", "sort_order": "DESC"}}
+    df, _ = renderer._fetch(task)
+    assert len(df) > 11 and not renderer.queries
+
+
+def test_render_writes_one_file_per_item(renderer):
+    frame = pd.DataFrame({"label": ["x", "y"], "count": [1, 2]})
+    results = renderer.render([("a", frame), ("a", frame), ("a_2", frame), "channels"])
+    assert [result["status"] for result in results] == ["success"] * 4
+    assert sorted(os.listdir(renderer.output_dir)) == ["a.png", "a_2.png", "a_3.png", "channels.png"]